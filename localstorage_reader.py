@@ -10,9 +10,17 @@ import time
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
+from src.capture.segment_log import CaptureSegmentLog
+
+# 元素数据目录
+DATA_DIR = os.path.join(os.getcwd(), "captured_elements")
+
 class LocalStorageReader(BaseHTTPRequestHandler):
     """localStorage数据读取处理器"""
     
+    # 元素分段日志，所有请求共用
+    segment_log = None
+    
     def do_GET(self):
         """处理GET请求"""
         if self.path == '/get_last_element':
@@ -72,27 +80,18 @@ class LocalStorageReader(BaseHTTPRequestHandler):
             self.send_response(404)
             self.end_headers()
     
+    @classmethod
+    def get_segment_log(cls):
+        """获取元素分段日志，首次使用时创建"""
+        if cls.segment_log is None:
+            cls.segment_log = CaptureSegmentLog(DATA_DIR)
+        return cls.segment_log
+    
     def save_element_to_file(self, element_data):
-        """保存元素数据到文件"""
+        """保存元素数据：追加到分段日志，并原子更新 latest_element.json"""
         try:
-            # 创建数据目录
-            data_dir = os.path.join(os.getcwd(), "captured_elements")
-            if not os.path.exists(data_dir):
-                os.makedirs(data_dir)
-            
-            # 保存最新元素
-            latest_file = os.path.join(data_dir, "latest_element.json")
-            with open(latest_file, 'w', encoding='utf-8') as f:
-                json.dump(element_data, f, ensure_ascii=False, indent=2)
-            
-            # 保存带时间戳的文件
-            timestamp = int(time.time() * 1000)
-            timestamp_file = os.path.join(data_dir, f"element_{timestamp}.json")
-            with open(timestamp_file, 'w', encoding='utf-8') as f:
-                json.dump(element_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"元素数据已保存: {latest_file}")
-            print(f"时间戳文件: {timestamp_file}")
+            segment_path = self.get_segment_log().append(element_data)
+            print(f"元素数据已保存: {segment_path}")
             
         except Exception as e:
             print(f"保存元素数据失败: {e}")
@@ -104,6 +103,9 @@ class LocalStorageReader(BaseHTTPRequestHandler):
 def start_server(port=8080):
     """启动服务器"""
     try:
+        # 合并已写满的分段，并把旧版本的 element_*.json 文件并入日志
+        LocalStorageReader.get_segment_log().compact()
+        
         server = HTTPServer(('localhost', port), LocalStorageReader)
         print(f"localStorage读取服务器已启动，端口: {port}")
         print(f"访问地址: http://localhost:{port}/get_last_element")
@@ -10,7 +10,7 @@ import logging
 import threading
 import json
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QHBoxLayout, QVBoxLayout, QWidget,
@@ -25,10 +25,33 @@ from PyQt6.QtGui import QAction, QDrag, QBrush, QPen, QFont, QColor
 
 # 导入我们的自动化引擎
 from src.core.engine import AutomationEngine
+from src.automation.web.driver_manager import WebDriverManager
+from src.automation.web.locators import ElementLocator
+from src.capture import CaptureFileWatcher, CaptureHub, CaptureStore
 
-# 全局缓存机制
-last_element_cache = None
-cache_timestamp = 0
+# 长轮询接口 /wait_element 的默认与最大等待时间（秒）
+WAIT_ELEMENT_TIMEOUT = 30
+WAIT_ELEMENT_MAX_TIMEOUT = 120
+
+# SSE接口 /events 无事件时发送心跳的间隔（秒）
+EVENTS_KEEPALIVE_INTERVAL = 15
+
+# 开始捕获时，此时间（秒）内已捕获的元素直接使用
+RECENT_CAPTURE_MAX_AGE = 30
+
+# 等待捕获超时后，从记录库中取此时间（秒）内的最近捕获
+STORED_CAPTURE_MAX_AGE = 600
+
+# /elements 接口默认与最多返回的记录数
+ELEMENTS_DEFAULT_LIMIT = 50
+ELEMENTS_MAX_LIMIT = 1000
+
+# 请求体大小上限（字节），超出时返回413
+MAX_CAPTURE_BODY_SIZE = 1024 * 1024
+MAX_BATCH_BODY_SIZE = 16 * 1024 * 1024
+
+# /capture_batch 单次最多接收的元素数量
+MAX_BATCH_ELEMENTS = 1000
 
 # 设置日志
 logging.basicConfig(
@@ -45,8 +68,13 @@ logger = logging.getLogger(__name__)
 class RPARequestHandler(BaseHTTPRequestHandler):
     """RPA应用HTTP请求处理器"""
     
-    def __init__(self, *args, rpa_app=None, **kwargs):
+    # 套接字读写超时（秒），避免迟迟不发送请求体的连接长期占用线程
+    timeout = 30
+    
+    def __init__(self, *args, rpa_app=None, capture_hub=None, capture_store=None, **kwargs):
         self.rpa_app = rpa_app
+        self.capture_hub = capture_hub
+        self.capture_store = capture_store
         super().__init__(*args, **kwargs)
     
     def do_OPTIONS(self):
@@ -58,121 +86,257 @@ class RPARequestHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Max-Age', '86400')  # 24小时缓存
         self.end_headers()
     
+    def _send_json(self, status, payload):
+        """发送JSON响应"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')  # 添加CORS头
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
         """处理GET请求"""
-        if self.path == '/ping':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')  # 添加CORS头
-            self.end_headers()
-            self.wfile.write(json.dumps({'status': 'ok'}).encode())
-        elif self.path == '/get_last_element':
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path == '/ping':
+            self._send_json(200, {'status': 'ok'})
+        elif parsed.path == '/get_last_element':
             # 添加获取最后捕获元素的接口
-            if self.rpa_app and hasattr(self.rpa_app, 'last_captured_element') and self.rpa_app.last_captured_element:
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps(self.rpa_app.last_captured_element).encode())
+            element = self.last_element()
+            if element:
+                self._send_json(200, element)
             else:
-                self.send_response(404)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')  # 添加CORS头
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': 'No element captured'}).encode())
+                self._send_json(404, {'error': 'No element captured'})
+        elif parsed.path == '/elements':
+            self.handle_elements(query)
+        elif parsed.path == '/wait_element':
+            self.handle_wait_element(query)
+        elif parsed.path == '/events':
+            self.handle_events(query)
         else:
             self.send_response(404)
             self.send_header('Access-Control-Allow-Origin', '*')  # 添加CORS头
             self.end_headers()
+
+    def last_element(self):
+        """最近一次捕获的元素，本次运行没有捕获时从记录库中查找"""
+        event = self.capture_hub.latest() if self.capture_hub else None
+        if event:
+            return event.element
+        record = self.capture_store.latest() if self.capture_store else None
+        return record.element if record else None
+
+    def handle_elements(self, query):
+        """
+        捕获历史
+
+        GET /elements?limit=<条数>&url=<页面URL>，按捕获时间从新到旧返回
+        """
+        if not self.capture_store:
+            self._send_json(503, {'error': 'Capture store unavailable'})
+            return
+
+        limit = self._query_number(query, 'limit', ELEMENTS_DEFAULT_LIMIT)
+        limit = min(max(limit, 0), ELEMENTS_MAX_LIMIT)
+        url = query.get('url', [None])[0]
+        records = self.capture_store.history(limit=limit, url=url)
+        self._send_json(200, {'elements': [record.to_dict() for record in records]})
+
+    @staticmethod
+    def _query_number(query, name, default, cast=int):
+        try:
+            return cast(query.get(name, [default])[0])
+        except (TypeError, ValueError):
+            return default
+
+    def handle_wait_element(self, query):
+        """
+        长轮询：等待序号大于 after 的捕获
+
+        GET /wait_element?after=<序号>&timeout=<秒>
+        有新捕获时返回 {"seq", "received_at", "element"}，超时返回204
+        """
+        if not self.capture_hub:
+            self._send_json(503, {'error': 'Capture hub unavailable'})
+            return
+
+        after = self._query_number(query, 'after', self.capture_hub.last_seq)
+        timeout = self._query_number(query, 'timeout', WAIT_ELEMENT_TIMEOUT, float)
+        timeout = min(max(timeout, 0), WAIT_ELEMENT_MAX_TIMEOUT)
+
+        event = self.capture_hub.wait_for(after, timeout)
+        if event:
+            self._send_json(200, event.to_dict())
+        else:
+            self.send_response(204)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+
+    def handle_events(self, query):
+        """
+        Server-Sent Events：持续推送捕获事件
+
+        GET /events?after=<序号>，断线重连时也可以用 Last-Event-ID 请求头指定序号
+        """
+        if not self.capture_hub:
+            self._send_json(503, {'error': 'Capture hub unavailable'})
+            return
+
+        last_seq = self._query_number(query, 'after', self.capture_hub.last_seq)
+        last_event_id = self.headers.get('Last-Event-ID')
+        if last_event_id and last_event_id.isdigit():
+            last_seq = int(last_event_id)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            while not self.capture_hub.closed:
+                event = self.capture_hub.wait_for(last_seq, EVENTS_KEEPALIVE_INTERVAL)
+                if event:
+                    last_seq = event.seq
+                    data = json.dumps(event.to_dict(), ensure_ascii=False)
+                    message = f"id: {event.seq}\nevent: element\ndata: {data}\n\n"
+                else:
+                    message = ": keepalive\n\n"
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("SSE客户端已断开")
     
     def do_POST(self):
         """处理POST请求"""
-        print(f"[DEBUG] 收到POST请求，路径: {self.path}")
-        logger.debug(f"收到POST请求，路径: {self.path}")
-        
-        if self.path in ['/capture_element', '/save_element']:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
-            print(f"[DEBUG] POST数据长度: {content_length}")
-            print(f"[DEBUG] POST原始数据: {post_data}")
-            logger.debug(f"POST数据长度: {content_length}")
-            
-            try:
-                data = json.loads(post_data.decode('utf-8'))
-                print(f"[DEBUG] 解析后的JSON数据: {data}")
-                logger.debug(f"解析后的JSON数据: {data}")
-                
-                if data.get('action') in ['element_captured', 'save_element']:
-                    element_info = data.get('element', {})
-                    
-                    # 添加调试日志
-                    print(f"[DEBUG] HTTP服务器接收到元素: {element_info.get('tagName', 'unknown')}")
-                    logger.info(f"HTTP服务器接收到元素: {element_info.get('tagName', 'unknown')}")
-                    
-                    # 更新全局缓存
-                    global last_element_cache, cache_timestamp
-                    last_element_cache = element_info
-                    cache_timestamp = time.time()
-                    print(f"[DEBUG] 元素已缓存，时间戳: {cache_timestamp}")
-                    
-                    # 直接保存到 rpa_app 的 last_captured_element
-                    if self.rpa_app:
-                        self.rpa_app.last_captured_element = element_info
-                        print(f"[DEBUG] 已保存到 last_captured_element: {bool(self.rpa_app.last_captured_element)}")
-                        logger.debug(f"已保存到 last_captured_element: {bool(self.rpa_app.last_captured_element)}")
-                        
-                        # 添加更多调试信息
-                        print(f"[DEBUG] 准备发送信号到主线程")
-                        logger.debug(f"准备发送信号到主线程")
-                        
-                        # 发送信号到主线程处理元素信息
-                        try:
-                            self.rpa_app.element_captured_signal.emit(element_info)
-                            print(f"[DEBUG] 信号发送成功")
-                            logger.debug(f"信号发送成功")
-                        except Exception as e:
-                            print(f"[ERROR] 信号发送失败: {e}")
-                            logger.error(f"信号发送失败: {e}")
-                    else:
-                        print(f"[ERROR] rpa_app 为空")
-                        logger.error(f"rpa_app 为空")
-                    
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                    self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'status': 'success'}).encode())
-                else:
-                    print(f"[DEBUG] 无效的action: {data.get('action')}")
-                    logger.debug(f"无效的action: {data.get('action')}")
-                    self.send_response(400)
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-            except json.JSONDecodeError as e:
-                print(f"[DEBUG] JSON解析错误: {e}")
-                logger.error(f"JSON解析错误: {e}")
-                self.send_response(400)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
+        path = urlparse(self.path).path
+        if path in ['/capture_element', '/save_element']:
+            self.handle_capture()
+        elif path == '/capture_batch':
+            self.handle_capture_batch()
         else:
             self.send_response(404)
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
     
+    def _read_json_body(self, max_size):
+        """
+        读取并解析JSON请求体，出错时直接发送错误响应
+
+        Returns:
+            解析后的数据；请求无效时返回None
+        """
+        try:
+            content_length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._send_json(411, {'error': 'Content-Length required'})
+            return None
+        if content_length < 0 or content_length > max_size:
+            # 不读取过大的请求体，响应后关闭连接
+            self.close_connection = True
+            self._send_json(413, {'error': f'Request body exceeds {max_size} bytes'})
+            return None
+
+        post_data = self.rfile.read(content_length)
+        if len(post_data) < content_length:
+            # 客户端在发送完请求体前断开
+            self.close_connection = True
+            return None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"收到POST请求，路径: {self.path}，数据长度: {content_length}")
+        try:
+            return json.loads(post_data.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.warning(f"JSON解析错误: {e}")
+            self._send_json(400, {'error': 'Invalid JSON'})
+            return None
+    
+    def _ingest_elements(self, elements):
+        """
+        写入记录库（同一次捕获重复发送时只保存一次），并把新保存的元素发布到捕获事件中心
+
+        所有元素都进入事件历史，/events 和 /wait_element 不会漏掉；界面信号每批只发送一次
+        """
+        if self.capture_store:
+            record_ids = self.capture_store.add_many(elements, source='http')
+            new_elements = [element for element, record_id in zip(elements, record_ids)
+                            if record_id is not None]
+        else:
+            new_elements = elements
+        if not new_elements:
+            return
+
+        # 等待中的对话框和外部订阅者立即收到
+        if not self.capture_hub:
+            logger.error("捕获事件中心未初始化")
+            return
+        self.capture_hub.publish_many(new_elements)
+    
+    def handle_capture(self):
+        """接收插件捕获的单个元素"""
+        data = self._read_json_body(MAX_CAPTURE_BODY_SIZE)
+        if data is None:
+            return
+        
+        if not isinstance(data, dict) or data.get('action') not in ['element_captured', 'save_element']:
+            logger.debug("无效的action")
+            self._send_json(400, {'error': 'Invalid action'})
+            return
+        
+        element_info = data.get('element')
+        if not isinstance(element_info, dict):
+            self._send_json(400, {'error': 'Invalid element'})
+            return
+        
+        logger.info(f"HTTP服务器接收到元素: {element_info.get('tagName', 'unknown')}")
+        self._ingest_elements([element_info])
+        self._send_json(200, {'status': 'success'})
+    
+    def handle_capture_batch(self):
+        """
+        批量接收捕获的元素
+
+        POST /capture_batch，请求体为元素数组，或 {"elements": [...]}
+        """
+        data = self._read_json_body(MAX_BATCH_BODY_SIZE)
+        if data is None:
+            return
+        
+        elements = data.get('elements') if isinstance(data, dict) else data
+        if not isinstance(elements, list) or not all(isinstance(e, dict) for e in elements):
+            self._send_json(400, {'error': 'Expected an array of elements'})
+            return
+        if len(elements) > MAX_BATCH_ELEMENTS:
+            self._send_json(413, {'error': f'At most {MAX_BATCH_ELEMENTS} elements per batch'})
+            return
+        
+        logger.info(f"HTTP服务器批量接收到 {len(elements)} 个元素")
+        self._ingest_elements(elements)
+        self._send_json(200, {'status': 'success', 'received': len(elements)})
+    
     def log_message(self, format, *args):
         """重写日志方法，避免在控制台输出"""
         pass
 
 
+class CaptureHTTPServer(ThreadingHTTPServer):
+    """每个请求使用独立线程的HTTP服务器，多个标签页同时发送捕获时互不排队"""
+    
+    daemon_threads = True
+    request_queue_size = 64
+
+
 class RPAServer:
     """RPA应用HTTP服务器"""
     
-    def __init__(self, rpa_app, port=8888):
+    def __init__(self, rpa_app, port=8888, capture_hub=None, capture_store=None):
         self.rpa_app = rpa_app
         self.port = port
+        self.capture_hub = capture_hub or CaptureHub()
+        self.capture_store = capture_store
         self.server = None
         self.server_thread = None
     
@@ -181,9 +345,16 @@ class RPAServer:
         try:
             # 创建自定义请求处理器
             def handler(*args, **kwargs):
-                return RPARequestHandler(*args, rpa_app=self.rpa_app, **kwargs)
+                return RPARequestHandler(
+                    *args,
+                    rpa_app=self.rpa_app,
+                    capture_hub=self.capture_hub,
+                    capture_store=self.capture_store,
+                    **kwargs
+                )
             
-            self.server = HTTPServer(('localhost', self.port), handler)
+            # 长轮询和SSE连接会长时间占用请求线程，每个请求使用独立线程
+            self.server = CaptureHTTPServer(('localhost', self.port), handler)
             self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.server_thread.start()
             logger.info(f"RPA HTTP服务器已启动，端口: {self.port}")
@@ -192,6 +363,8 @@ class RPAServer:
 
     def stop(self):
         """停止服务器"""
+        # 唤醒长轮询和SSE连接，使其尽快结束
+        self.capture_hub.close()
         if self.server:
             self.server.shutdown()
             self.server.server_close()
@@ -277,7 +450,8 @@ class InstructionConfigDialog(QDialog):
                 widget.setCurrentText(default_value)
             else:
                 widget = QLineEdit()
-                widget.setText(str(default_value))
+                if default_value is not None:
+                    widget.setText(str(default_value))
 
             form_layout.addRow(f"{param}:", widget)
             self.param_widgets[param] = widget
@@ -318,6 +492,7 @@ class ClickElementConfigDialog(QDialog):
         super().__init__(parent)
         self.instruction_info = instruction_info
         self.parameters = {}
+        self.captured_element = None
 
         self.setWindowTitle("配置点击元素指令")
         self.setModal(True)
@@ -536,49 +711,66 @@ class ClickElementConfigDialog(QDialog):
             self.capture_btn.setEnabled(False)
             self.capture_progress.setVisible(True)
             
-            # 创建定时器检查捕获状态
-            self.capture_timer = QTimer()
-            self.capture_timer.timeout.connect(self.check_capture_status)
-            self.capture_timer.start(1000)  # 每秒检查一次
+            # 最近已捕获的元素直接使用
+            capture_hub = getattr(self.parent(), 'capture_hub', None)
+            recent = capture_hub.latest(max_age=RECENT_CAPTURE_MAX_AGE) if capture_hub else None
+            if recent:
+                self.on_element_captured_success(recent.element)
+                return
             
-            # 设置超时
-            self.capture_timeout_timer = QTimer()
-            self.capture_timeout_timer.timeout.connect(self.capture_timeout)
-            self.capture_timeout_timer.setSingleShot(True)
-            self.capture_timeout_timer.start(30000)  # 30秒超时
+            # 订阅主窗口的捕获信号，HTTP服务器收到元素后立即推送过来
+            self.start_waiting_capture()
+    
+    def start_waiting_capture(self):
+        """开始等待捕获推送"""
+        self.stop_waiting_capture()
+        element_captured_signal = getattr(self.parent(), 'element_captured_signal', None)
+        if element_captured_signal is not None:
+            element_captured_signal.connect(self.on_element_pushed)
+            self._capture_signal = element_captured_signal
+        
+        # 设置超时
+        self.capture_timeout_timer = QTimer(self)
+        self.capture_timeout_timer.timeout.connect(self.capture_timeout)
+        self.capture_timeout_timer.setSingleShot(True)
+        self.capture_timeout_timer.start(30000)  # 30秒超时
+    
+    def stop_waiting_capture(self):
+        """停止等待捕获推送"""
+        capture_signal = getattr(self, '_capture_signal', None)
+        if capture_signal is not None:
+            try:
+                capture_signal.disconnect(self.on_element_pushed)
+            except TypeError:
+                pass
+            self._capture_signal = None
+        if getattr(self, 'capture_timeout_timer', None):
+            self.capture_timeout_timer.stop()
+    
+    def on_element_pushed(self, element_info):
+        """收到推送的捕获元素"""
+        if getattr(self, '_capture_signal', None) is None:
+            return
+        self.on_element_captured_success(element_info)
+    
+    def done(self, result):
+        """关闭对话框时停止等待"""
+        self.stop_waiting_capture()
+        super().done(result)
     
     def show_capture_status(self, message):
         """显示捕获状态"""
         self.capture_status_label.setText(message)
     
-    def check_capture_status(self):
-        """检查捕获状态"""
-        # 首先检查全局缓存
-        global last_element_cache, cache_timestamp
-        current_time = time.time()
-        
-        if last_element_cache and (current_time - cache_timestamp) < 30:  # 30秒内的缓存有效
-            self.on_element_captured_success(last_element_cache)
-            return
-        
-        # 尝试从Chrome插件获取捕获的元素
-        captured_selector = self.get_captured_element_from_plugin()
-        
-        if captured_selector:
-            self.on_element_captured_success(captured_selector)
-    
     def on_element_captured_success(self, captured_selector):
         """元素捕获成功处理"""
-        # 停止定时器
-        if hasattr(self, 'capture_timer'):
-            self.capture_timer.stop()
-        if hasattr(self, 'capture_timeout_timer'):
-            self.capture_timeout_timer.stop()
+        self.stop_waiting_capture()
         
         # 恢复UI状态
         self.capture_btn.setEnabled(True)
         self.capture_progress.setVisible(False)
         self.show_capture_status("捕获成功！")
+        self.captured_element = captured_selector
         
         # 根据当前选择器类型设置选择器
         current_type = self.selector_type_combo.currentText()
@@ -608,9 +800,13 @@ class ClickElementConfigDialog(QDialog):
     
     def capture_timeout(self):
         """捕获超时处理"""
-        # 停止定时器
-        if hasattr(self, 'capture_timer'):
-            self.capture_timer.stop()
+        self.stop_waiting_capture()
+        
+        # 等待期间没有新的推送时，使用记录库中最近的捕获
+        captured_selector = self.get_captured_element_from_plugin()
+        if captured_selector:
+            self.on_element_captured_success(captured_selector)
+            return
         
         # 恢复UI状态
         self.capture_btn.setEnabled(True)
@@ -640,356 +836,27 @@ ID: {element_data.get('id', '无')}
         self.show_capture_status(preview_text)
 
     def get_captured_element_from_plugin(self):
-        """从Chrome插件获取捕获的元素信息"""
-        import json
-        import os
-        import time
-        import glob
-        import requests
-        
-        # 首先检查全局缓存
-        global last_element_cache, cache_timestamp
-        current_time = time.time()
-        
-        if last_element_cache and (current_time - cache_timestamp) < 30:  # 30秒内的缓存有效
-            print(f"从全局缓存获取元素: {last_element_cache.get('tagName', 'unknown')}")
-            return last_element_cache
-        
-        # 检查主窗口是否有最近捕获的元素
-        main_window = self.window()
-        if hasattr(main_window, 'last_captured_element') and main_window.last_captured_element:
-            print(f"从主窗口获取最近捕获的元素: {main_window.last_captured_element.get('tagName', 'unknown')}")
-            return main_window.last_captured_element
-        
-        # 尝试从HTTP服务器获取最新元素
-        try:
-            response = requests.get('http://localhost:8888/get_last_element', timeout=3)
-            if response.status_code == 200:
-                element_data = response.json()
-                if self._validate_element_data(element_data):
-                    print(f"从HTTP服务器获取到元素: {element_data.get('tagName', 'unknown')}")
-                    return element_data
-        except Exception as e:
-            print(f"从HTTP服务器获取元素失败: {e}")
-        
-        # 尝试从Chrome扩展的本地存储读取（通过文件系统）
-        print("尝试从Chrome存储读取元素数据...")
-        
-        # 直接从captured_elements目录读取最新文件
-        captured_dir = os.path.join(os.getcwd(), "captured_elements")
-        if os.path.exists(captured_dir):
-            print(f"检查captured_elements目录: {captured_dir}")
-            
-            # 查找所有JSON文件
-            json_files = []
-            for file in os.listdir(captured_dir):
-                if file.endswith('.json'):
-                    file_path = os.path.join(captured_dir, file)
-                    json_files.append((file_path, os.path.getmtime(file_path)))
-            
-            if json_files:
-                # 按修改时间排序，获取最新的文件
-                json_files.sort(key=lambda x: x[1], reverse=True)
-                latest_file, latest_time = json_files[0]
-                
-                # 检查是否在10分钟内
-                current_time = time.time()
-                if current_time - latest_time < 600:  # 10分钟内
-                    try:
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            element_data = json.load(f)
-                        
-                        if self._validate_element_data(element_data):
-                            print(f"从{os.path.basename(latest_file)}找到元素: {element_data.get('tagName', 'unknown')}")
-                            return element_data
-                        else:
-                            print(f"{os.path.basename(latest_file)}中的元素数据无效")
-                    except Exception as e:
-                        print(f"读取{latest_file}失败: {e}")
-                else:
-                    print(f"文件时间过久: {current_time - latest_time}秒前")
-            else:
-                print("captured_elements目录中没有JSON文件")
-        else:
-            print("captured_elements目录不存在")
-        
-        # 如果还是没有找到，尝试从Chrome的localStorage文件读取
-        print("尝试从Chrome localStorage文件读取...")
-        
-        # 检查Chrome扩展的本地存储
-        chrome_storage_paths = [
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Local Extension Settings"),
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Storage/ext"),
-        ]
-        
-        for storage_path in chrome_storage_paths:
-            if os.path.exists(storage_path):
-                print(f"检查Chrome存储路径: {storage_path}")
-                # 查找可能的扩展ID目录
-                for item in os.listdir(storage_path):
-                    item_path = os.path.join(storage_path, item)
-                    if os.path.isdir(item_path):
-                        # 检查是否有local.json文件
-                        local_file = os.path.join(item_path, "local.json")
-                        if os.path.exists(local_file):
-                            try:
-                                with open(local_file, 'r', encoding='utf-8') as f:
-                                    storage_data = json.load(f)
-                                
-                                # 查找lastCapturedElement
-                                if 'lastCapturedElement' in storage_data:
-                                    element = storage_data['lastCapturedElement']
-                                    capture_time = storage_data.get('lastCaptureTime', 0)
-                                    current_time = time.time() * 1000  # 转换为毫秒
-                                    
-                                    # 检查是否在10分钟内
-                                    if current_time - capture_time < 600000:  # 10分钟
-                                        print(f"从Chrome存储中找到元素: {element.get('tagName', 'unknown')}")
-                                        return element
-                            except Exception as e:
-                                print(f"读取Chrome存储失败: {e}")
-                                continue
-        
-        # 检查localStorage数据（通过Chrome存储）
-        chrome_storage_paths = [
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Local Storage"),
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Storage/ext"),
-        ]
-        
-        for storage_path in chrome_storage_paths:
-            if os.path.exists(storage_path):
-                print(f"检查Chrome localStorage路径: {storage_path}")
-                # 查找localStorage文件
-                for root, dirs, files in os.walk(storage_path):
-                    for file in files:
-                        if file.endswith('.localstorage') or file.endswith('.ldb'):
-                            file_path = os.path.join(root, file)
-                            try:
-                                # 尝试读取localStorage文件
-                                with open(file_path, 'rb') as f:
-                                    content = f.read().decode('utf-8', errors='ignore')
-                                
-                                # 查找RPA相关的数据
-                                if 'rpa_last_captured_element' in content:
-                                    print(f"找到localStorage文件: {file_path}")
-                                    # 这里我们找到了localStorage文件，但需要进一步解析
-                                    # 由于localStorage文件格式复杂，我们采用其他方法
-                                    break
-                            except Exception as e:
-                                continue
-        
-        # 首先检查captured_elements目录中的最新文件
-        captured_dir = os.path.join(os.getcwd(), "captured_elements")
-        if os.path.exists(captured_dir):
-            print(f"检查captured_elements目录: {captured_dir}")
-            
-            # 检查latest_element.json文件
-            latest_file = os.path.join(captured_dir, "latest_element.json")
-            if os.path.exists(latest_file):
-                try:
-                    file_time = os.path.getmtime(latest_file)
-                    current_time = time.time()
-                    
-                    # 检查是否在10分钟内
-                    if current_time - file_time < 600:  # 10分钟内
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            element_data = json.load(f)
-                        
-                        if self._validate_element_data(element_data):
-                            print(f"从latest_element.json找到元素: {element_data.get('tagName', 'unknown')}")
-                            return element_data
-                        else:
-                            print("latest_element.json中的元素数据无效")
-                except Exception as e:
-                    print(f"读取latest_element.json失败: {e}")
-            
-            # 查找最新的element_*.json文件
-            pattern = os.path.join(captured_dir, "element_*.json")
-            json_files = glob.glob(pattern)
-            
-            if json_files:
-                # 按修改时间排序，获取最新的文件
-                json_files.sort(key=os.path.getmtime, reverse=True)
-                latest_file = json_files[0]
-                
-                try:
-                    file_time = os.path.getmtime(latest_file)
-                    current_time = time.time()
-                    
-                    # 检查是否在10分钟内
-                    if current_time - file_time < 600:  # 10分钟内
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            element_data = json.load(f)
-                        
-                        if self._validate_element_data(element_data):
-                            print(f"从{os.path.basename(latest_file)}找到元素: {element_data.get('tagName', 'unknown')}")
-                            return element_data
-                        else:
-                            print(f"{os.path.basename(latest_file)}中的元素数据无效")
-                except Exception as e:
-                    print(f"读取{latest_file}失败: {e}")
-        
-        # 查找路径列表 - 扩展更多可能的路径
-        search_paths = [
-            # Chrome插件数据路径
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Local Extension Settings/rpa-element-capture"),
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Storage/ext/rpa-element-capture"),
-            os.path.expanduser("~/AppData/Local/Google/Chrome/User Data/Default/Extensions/rpa-element-capture"),
-            # 下载文件夹
-            os.path.expanduser("~/Downloads"),
-            os.path.expanduser("~/Desktop"),
-            os.path.expanduser("~/Documents"),
-            # 当前项目目录
-            os.path.join(os.getcwd(), "captured_elements"),
-            # 临时目录
-            os.path.join(os.getcwd(), "temp"),
-        ]
+        """从捕获记录库获取最近捕获的元素信息"""
+        main_window = self.parent()
+        
+        # 首先检查捕获事件中心（本次运行中HTTP服务器收到的元素）
+        capture_hub = getattr(main_window, 'capture_hub', None)
+        recent = capture_hub.latest(max_age=RECENT_CAPTURE_MAX_AGE) if capture_hub else None
+        if recent:
+            return recent.element
+        
+        # 记录库按捕获时间建有索引，只取最近的几条校验，不扫描文件系统
+        capture_store = getattr(main_window, 'capture_store', None)
+        if not capture_store:
+            return None
         
-        # 创建captured_elements目录（如果不存在）
-        captured_dir = os.path.join(os.getcwd(), "captured_elements")
-        if not os.path.exists(captured_dir):
-            os.makedirs(captured_dir)
-            print(f"创建目录: {captured_dir}")
-        
-        # 查找最新的捕获数据
-        latest_element = None
-        latest_time = 0
-        
-        # 首先查找下载文件夹中的捕获文件
-        for search_path in search_paths:
-            if os.path.exists(search_path):
-                print(f"搜索路径: {search_path}")
-                # 查找rpa-captured-element-*.json文件，但排除测试文件
-                pattern = os.path.join(search_path, "rpa-captured-element-*.json")
-                json_files = glob.glob(pattern)
-                
-                for json_file in json_files:
-                    # 跳过测试文件
-                    if "test" in os.path.basename(json_file).lower():
-                        print(f"跳过测试文件: {os.path.basename(json_file)}")
-                        continue
-                        
-                    try:
-                        # 检查文件修改时间
-                        file_time = os.path.getmtime(json_file)
-                        current_time = time.time()
-                        
-                        print(f"找到文件: {json_file}, 修改时间: {file_time}, 当前时间: {current_time}")
-                        
-                        # 扩展时间窗口到10分钟
-                        if current_time - file_time < 600:  # 10分钟内
-                            with open(json_file, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                                
-                            if isinstance(data, dict) and 'capturedElements' in data:
-                                elements = data['capturedElements']
-                                if elements and len(elements) > 0:
-                                    element = elements[0]  # 获取第一个元素
-                                    
-                                    # 验证元素数据的有效性
-                                    if self._validate_element_data(element):
-                                        if file_time > latest_time:
-                                            latest_time = file_time
-                                            latest_element = element
-                                            print(f"找到有效元素: {element.get('tagName', 'unknown')}")
-                                    else:
-                                        print(f"元素数据无效: {element.get('tagName', 'unknown')}")
-                                        
-                    except Exception as e:
-                        print(f"读取文件失败 {json_file}: {e}")
-                        continue
-        
-        # 如果没找到下载文件，尝试从Chrome存储中读取
-        if not latest_element:
-            print("未找到下载文件，尝试从Chrome存储读取...")
-            for data_path in search_paths:
-                if os.path.exists(data_path):
-                    # 查找存储文件
-                    for root, dirs, files in os.walk(data_path):
-                        for file in files:
-                            if file.endswith('.json') or file == '000003.log':
-                                file_path = os.path.join(root, file)
-                                try:
-                                    # 尝试读取文件内容
-                                    with open(file_path, 'r', encoding='utf-8') as f:
-                                        content = f.read()
-                                        
-                                    # 尝试解析JSON数据
-                                    try:
-                                        data = json.loads(content)
-                                        if isinstance(data, dict) and 'capturedElements' in data:
-                                            elements = data['capturedElements']
-                                            if elements and len(elements) > 0:
-                                                # 获取最新的元素
-                                                for element in elements:
-                                                    # 验证元素数据的有效性
-                                                    if not self._validate_element_data(element):
-                                                        continue
-                                                        
-                                                    timestamp = element.get('timestamp', '')
-                                                    if timestamp:
-                                                        try:
-                                                            # 解析时间戳
-                                                            if isinstance(timestamp, str):
-                                                                import datetime
-                                                                dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                                                element_time = dt.timestamp()
-                                                            else:
-                                                                element_time = float(timestamp)
-                                                            
-                                                            if element_time > latest_time:
-                                                                latest_time = element_time
-                                                                latest_element = element
-                                                                print(f"从存储中找到元素: {element.get('tagName', 'unknown')}")
-                                                        except:
-                                                            continue
-                                    except json.JSONDecodeError:
-                                        # 如果不是JSON，尝试从日志文件中提取
-                                        if 'capturedElements' in content:
-                                            # 简单的文本解析
-                                            import re
-                                            matches = re.findall(r'\{[^}]+\}', content)
-                                            for match in matches:
-                                                try:
-                                                    element_data = json.loads(match)
-                                                    if 'tagName' in element_data and 'timestamp' in element_data:
-                                                        # 验证元素数据的有效性
-                                                        if not self._validate_element_data(element_data):
-                                                            continue
-                                                            
-                                                        timestamp = element_data.get('timestamp', '')
-                                                        if timestamp:
-                                                            try:
-                                                                if isinstance(timestamp, str):
-                                                                    import datetime
-                                                                    dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                                                    element_time = dt.timestamp()
-                                                                else:
-                                                                    element_time = float(timestamp)
-                                                                
-                                                                if element_time > latest_time:
-                                                                    latest_time = element_time
-                                                                    latest_element = element_data
-                                                                    print(f"从日志中解析到元素: {element_data.get('tagName', 'unknown')}")
-                                                            except:
-                                                                continue
-                                                except:
-                                                    continue
-                                                        
-                                except Exception as e:
-                                    continue
-        
-        # 如果找到了元素，检查是否在最近10分钟内捕获的
-        if latest_element and latest_time > 0:
-            current_time = time.time()
-            if current_time - latest_time < 600:  # 10分钟内
-                print(f"返回捕获的元素: {latest_element.get('tagName', 'unknown')}")
-                return latest_element
-            else:
-                print(f"元素捕获时间过久: {current_time - latest_time}秒前")
-        else:
-            print("未找到任何捕获的元素")
+        since = time.time() - STORED_CAPTURE_MAX_AGE
+        for record in capture_store.history(limit=10, since=since):
+            if self._validate_element_data(record.element):
+                logger.info(f"从捕获记录库找到元素: {record.element.get('tagName', 'unknown')}")
+                return record.element
         
+        logger.info("未找到任何捕获的元素")
         return None
 
     def _validate_element_data(self, element):
@@ -1028,8 +895,15 @@ ID: {element_data.get('id', '无')}
 
     def get_parameters(self) -> dict:
         """获取参数"""
+        selector = self.selector_input.text().strip()
+        if self.captured_element:
+            # 捕获的元素带有多种定位方式，保存为候选列表，主选择器失效时依次尝试
+            primary = f"{self.selector_type_combo.currentText()}:{selector}"
+            fallbacks = ElementLocator.selectors_from_capture(self.captured_element)
+            selector = [primary] + [s for s in fallbacks if s != primary]
+
         parameters = {
-            "selector": self.selector_input.text().strip(),
+            "selector": selector,
             "selector_type": self.selector_type_combo.currentText(),
             "timeout": self.timeout_spin.value(),
             "wait_visible": self.wait_visible_check.isChecked(),
@@ -1865,6 +1739,11 @@ class MainWindow(QMainWindow):
         self.automation_engine.set_status_callback(self.update_status)
         self.automation_engine.set_log_callback(self.add_log_message)
 
+        # 按环境变量 RPA_STANDBY_BROWSERS 在后台预启动浏览器，首次执行无需等待启动
+        standby_count = WebDriverManager.standby_count_from_env()
+        if standby_count:
+            WebDriverManager.start_standby(standby_count)
+
         # 当前工作流
         self.current_workflow = []
         self.execution_thread = None
@@ -1874,15 +1753,28 @@ class MainWindow(QMainWindow):
         self.create_central_widget()
         self.create_status_bar()
 
-        # 初始化HTTP服务器
-        self.rpa_server = RPAServer(self, port=8888)
-        self.rpa_server.start()
+        # 存储最近捕获的元素信息
+        self.last_captured_element = None
         
         # 连接元素捕获信号
         self.element_captured_signal.connect(self.on_element_captured)
         
-        # 存储最近捕获的元素信息
-        self.last_captured_element = None
+        # 捕获事件中心：发布的元素通过信号转到主线程
+        self.capture_hub = CaptureHub()
+        self.capture_hub.subscribe(self.element_captured_signal.emit)
+        
+        # 捕获记录库：保存所有捕获的元素，供查询最近捕获和历史
+        self.capture_store = CaptureStore()
+        
+        # 在后台监视插件导出的捕获文件，新文件出现时立即导入
+        self.capture_watcher = CaptureFileWatcher(self.capture_store, self.capture_hub)
+        self.capture_watcher.start()
+        
+        # 初始化HTTP服务器
+        self.rpa_server = RPAServer(
+            self, port=8888, capture_hub=self.capture_hub, capture_store=self.capture_store
+        )
+        self.rpa_server.start()
     
     def _process_instruction(self, instruction_name: str, position=None):
         """处理指令的公共逻辑"""
@@ -1981,6 +1873,14 @@ class MainWindow(QMainWindow):
         stop_action.triggered.connect(self.stop_workflow)
         run_menu.addAction(stop_action)
 
+        run_menu.addSeparator()
+
+        reuse_action = QAction("保持浏览器会话", self)
+        reuse_action.setStatusTip("多次执行之间复用已打开的浏览器，跳过冷启动")
+        reuse_action.setCheckable(True)
+        reuse_action.toggled.connect(self.automation_engine.set_session_reuse)
+        run_menu.addAction(reuse_action)
+
         # 帮助菜单
         help_menu = menubar.addMenu("帮助")
 
@@ -2158,11 +2058,6 @@ class MainWindow(QMainWindow):
 
     def on_element_captured(self, element_info: dict):
         """处理元素捕获信号"""
-        # 更新全局缓存
-        global last_element_cache, cache_timestamp
-        last_element_cache = element_info
-        cache_timestamp = time.time()
-        
         self.last_captured_element = element_info
         self.add_log_message(f"✅ 捕获到元素: {element_info.get('tagName', 'unknown')} - {element_info.get('text', '')[:30]}...")
         
@@ -2180,9 +2075,18 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'rpa_server'):
             self.rpa_server.stop()
         
+        # 停止捕获文件监视并关闭捕获记录库
+        if hasattr(self, 'capture_watcher'):
+            self.capture_watcher.stop()
+        if hasattr(self, 'capture_store'):
+            self.capture_store.close()
+        
         # 清理自动化引擎
         if self.automation_engine:
             self.automation_engine.cleanup()
+
+        # 关闭备用浏览器
+        WebDriverManager.stop_standby()
         
         event.accept()
 
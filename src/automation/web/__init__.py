@@ -3,5 +3,7 @@
 """
 
 from .driver_manager import WebDriverManager
+from .driver_pool import WebDriverPool
 from .instructions import *
 from .locators import ElementLocator
+from .snapshot import DomSnapshot
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器与驱动路径发现
+
+Chrome可执行文件和ChromeDriver的路径只在首次使用时探测，结果连同版本号写入缓存文件，
+之后按文件修改时间校验，路径未变时不再逐个检查候选路径或调用Selenium Manager。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 缓存文件路径的环境变量，默认 ~/.rpa/browser_discovery.json
+CACHE_PATH_ENV_VAR = "RPA_DISCOVERY_CACHE"
+
+# 指定Chrome可执行文件的环境变量，优先于候选路径
+CHROME_BINARY_ENV_VAR = "RPA_CHROME_BINARY"
+
+# 项目根目录，可放置本地ChromeDriver
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+
+VERSION_PATTERN = re.compile(r"\d+(?:\.\d+){1,3}")
+
+
+@dataclass
+class BrowserInstallation:
+    """发现的浏览器安装信息"""
+
+    browser_path: Optional[str] = None
+    browser_version: Optional[str] = None
+    driver_path: Optional[str] = None
+    driver_version: Optional[str] = None
+    browser_mtime: Optional[float] = None
+    driver_mtime: Optional[float] = None
+
+    def is_valid(self) -> bool:
+        """缓存的路径仍存在且文件未被替换（修改时间一致）"""
+        if not self.browser_path or _mtime(self.browser_path) != self.browser_mtime:
+            return False
+        if self.driver_path and _mtime(self.driver_path) != self.driver_mtime:
+            return False
+        return True
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def chrome_candidates() -> List[str]:
+    """当前平台上Chrome可执行文件的候选路径，按优先级排列"""
+    candidates = []
+    env_binary = os.getenv(CHROME_BINARY_ENV_VAR)
+    if env_binary:
+        candidates.append(env_binary)
+
+    if sys.platform == "win32":
+        candidates += [
+            r"D:\Chrome\App\chrome.exe",
+            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+            r"C:\Users\{}\AppData\Local\Google\Chrome\Application\chrome.exe".format(
+                os.getenv("USERNAME", "Default")
+            ),
+        ]
+    elif sys.platform == "darwin":
+        candidates += [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            "/Applications/Chromium.app/Contents/MacOS/Chromium",
+        ]
+    else:
+        for name in (
+            "google-chrome",
+            "google-chrome-stable",
+            "chromium",
+            "chromium-browser",
+        ):
+            path = shutil.which(name)
+            if path:
+                candidates.append(path)
+        candidates += [
+            "/usr/bin/google-chrome",
+            "/opt/google/chrome/chrome",
+            "/usr/bin/chromium",
+            "/usr/bin/chromium-browser",
+            "/snap/bin/chromium",
+        ]
+    return candidates
+
+
+def chromedriver_candidates() -> List[str]:
+    """ChromeDriver候选路径：项目根目录优先，其次系统PATH"""
+    name = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+    candidates = [str(PROJECT_ROOT / name)]
+    path = shutil.which("chromedriver")
+    if path:
+        candidates.append(path)
+    return candidates
+
+
+def _first_existing(paths: List[str]) -> Optional[str]:
+    for path in paths:
+        if path and os.path.isfile(path):
+            return os.path.realpath(path)
+    return None
+
+
+def read_version(path: str) -> Optional[str]:
+    """
+    读取可执行文件的版本号
+
+    Windows上的chrome.exe不支持 --version（会启动浏览器），从同级的版本号目录读取
+    """
+    if sys.platform == "win32" and os.path.basename(path).lower() == "chrome.exe":
+        try:
+            versions = [
+                entry
+                for entry in os.listdir(os.path.dirname(path))
+                if VERSION_PATTERN.fullmatch(entry)
+            ]
+        except OSError:
+            return None
+        if not versions:
+            return None
+        return max(versions, key=lambda v: [int(p) for p in v.split(".")])
+
+    try:
+        output = subprocess.run(
+            [path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"读取版本号失败: {path}, 错误: {e}")
+        return None
+    match = VERSION_PATTERN.search(output or "")
+    return match.group(0) if match else None
+
+
+def _resolve_driver_with_selenium_manager(browser_path: str) -> Optional[str]:
+    """用Selenium Manager解析（必要时下载）匹配的ChromeDriver，失败时返回None"""
+    try:
+        from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+        result = SeleniumManager().binary_paths(
+            ["--browser", "chrome", "--browser-path", browser_path]
+        )
+        return result.get("driver_path") or None
+    except Exception as e:  # 旧版selenium没有binary_paths，或离线时解析失败
+        logger.debug(f"Selenium Manager解析ChromeDriver失败: {e}")
+        return None
+
+
+def probe_chrome() -> BrowserInstallation:
+    """探测Chrome与ChromeDriver（不使用缓存）"""
+    browser_path = _first_existing(chrome_candidates())
+    if not browser_path:
+        return BrowserInstallation()
+
+    driver_path = _first_existing(chromedriver_candidates())
+    if not driver_path:
+        driver_path = _resolve_driver_with_selenium_manager(browser_path)
+
+    return BrowserInstallation(
+        browser_path=browser_path,
+        browser_version=read_version(browser_path),
+        driver_path=driver_path,
+        driver_version=read_version(driver_path) if driver_path else None,
+        browser_mtime=_mtime(browser_path),
+        driver_mtime=_mtime(driver_path) if driver_path else None,
+    )
+
+
+def cache_path() -> Path:
+    """发现结果缓存文件路径"""
+    env_path = os.getenv(CACHE_PATH_ENV_VAR)
+    if env_path:
+        return Path(env_path)
+    return Path.home() / ".rpa" / "browser_discovery.json"
+
+
+def _load_cache(path: Path) -> Dict[str, Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: Path, data: Dict[str, Dict]):
+    """原子写入缓存文件，失败时只记录日志"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"写入浏览器发现缓存失败: {e}")
+
+
+# 候选路径取决于这些环境变量，值不变时缓存键不变
+KEY_ENV_VARS = ("PATH", CHROME_BINARY_ENV_VAR, "USERNAME")
+
+_key_memo: Dict[Tuple[Optional[str], ...], str] = {}
+
+
+def discovery_key() -> str:
+    """
+    缓存键：平台加上所有候选路径（含 RPA_CHROME_BINARY 指定的路径）
+
+    修改环境变量或PATH后候选路径变化，不会沿用按旧候选路径探测的结果。候选路径的计算
+    需要多次扫描PATH，按相关环境变量的值在进程内缓存
+    """
+    env = tuple(os.environ.get(name) for name in KEY_ENV_VARS)
+    key = _key_memo.get(env)
+    if key is None:
+        candidates = chrome_candidates() + ["|"] + chromedriver_candidates()
+        digest = hashlib.sha1(
+            json.dumps(candidates, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        key = _key_memo[env] = f"chrome:{sys.platform}:{digest}"
+    return key
+
+
+def _reusable(installation: Optional[BrowserInstallation]) -> bool:
+    """
+    缓存结果可以直接使用：浏览器文件未变，找到的ChromeDriver也未变
+
+    未找到ChromeDriver的结果同样沿用，浏览器更新（修改时间变化）或 refresh 时才重新探测
+    """
+    return bool(installation and installation.is_valid())
+
+
+_memo: Dict[str, BrowserInstallation] = {}
+_memo_lock = threading.Lock()
+
+
+def discover_chrome(refresh: bool = False) -> BrowserInstallation:
+    """
+    获取Chrome与ChromeDriver的安装信息
+
+    同一组候选路径在进程内只探测一次；缓存文件中的结果在路径和修改时间未变时直接使用，
+    包括未找到ChromeDriver的结果
+
+    Args:
+        refresh: 忽略缓存重新探测
+
+    Returns:
+        BrowserInstallation: 安装信息，未找到Chrome时 browser_path 为None
+    """
+    key = discovery_key()
+    with _memo_lock:
+        installation = _memo.get(key)
+        if not refresh and _reusable(installation):
+            return installation
+
+        path = cache_path()
+        cache = _load_cache(path)
+        if not refresh and key in cache:
+            try:
+                installation = BrowserInstallation(**cache[key])
+            except TypeError:
+                installation = None
+            if _reusable(installation):
+                logger.debug(f"使用缓存的浏览器路径: {installation.browser_path}")
+                _memo[key] = installation
+                return installation
+
+        installation = probe_chrome()
+        if installation.browser_path:
+            logger.info(
+                f"发现Chrome {installation.browser_version}: {installation.browser_path}，"
+                f"ChromeDriver {installation.driver_version}: {installation.driver_path}"
+            )
+            cache[key] = asdict(installation)
+            _save_cache(path, cache)
+            _memo[key] = installation
+        return installation
+
+
+def clear_discovery_cache():
+    """清除进程内与文件中的发现结果"""
+    with _memo_lock:
+        _memo.clear()
+        _key_memo.clear()
+        try:
+            cache_path().unlink()
+        except OSError:
+            pass
@@ -4,9 +4,13 @@
 WebDriver管理器
 """
 
+import atexit
 import logging
 import os
-from typing import Optional, Dict, Any
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
@@ -14,29 +18,112 @@ from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.options import Options as EdgeOptions
-import undetected_chromedriver as uc
-from pathlib import Path
+
+from .browser_discovery import discover_chrome
+from .locators import OBSERVER_SCRIPT_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class BrowserProfile:
+    """浏览器性能配置"""
+
+    name: str
+    # 页面加载策略: normal 等待全部资源, eager 在DOMContentLoaded后返回, none 立即返回
+    page_load_strategy: str = "normal"
+    # 禁止加载图片
+    block_images: bool = False
+    # 按URL通配符拦截的请求（仅Chromium内核，通过CDP设置，可在已有会话上切换）
+    blocked_url_patterns: Tuple[str, ...] = ()
+    # 打开网页后是否等待 document.readyState 为 complete
+    wait_ready_state: bool = True
+
+
+# 图片、字体和音视频资源的URL通配符
+IMAGE_URL_PATTERNS = (
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    "*.bmp",
+)
+FONT_URL_PATTERNS = ("*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot")
+MEDIA_URL_PATTERNS = ("*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.wav", "*.m3u8")
+
+# 内置性能配置
+BROWSER_PROFILES: Dict[str, BrowserProfile] = {
+    "default": BrowserProfile("default"),
+    # 只拦截字体和音视频，页面仍完整加载
+    "lite": BrowserProfile(
+        "lite", blocked_url_patterns=FONT_URL_PATTERNS + MEDIA_URL_PATTERNS
+    ),
+    # 数据采集：DOM就绪即返回，不加载图片、字体和音视频
+    "scrape-fast": BrowserProfile(
+        "scrape-fast",
+        page_load_strategy="eager",
+        block_images=True,
+        blocked_url_patterns=IMAGE_URL_PATTERNS
+        + FONT_URL_PATTERNS
+        + MEDIA_URL_PATTERNS,
+        wait_ready_state=False,
+    ),
+}
+
+
+def get_browser_profile(name: Optional[str]) -> BrowserProfile:
+    """
+    按名称获取性能配置
+
+    Args:
+        name: 配置名称，为空时返回默认配置
+
+    Returns:
+        BrowserProfile: 性能配置
+    """
+    profile = BROWSER_PROFILES.get(name or "default")
+    if profile is None:
+        raise ValueError(f"未知的浏览器配置: {name}")
+    return profile
+
+
+# 预启动备用浏览器数量的环境变量
+STANDBY_ENV_VAR = "RPA_STANDBY_BROWSERS"
+
+
 class WebDriverManager:
     """
     WebDriver管理器
     负责创建、配置和管理浏览器驱动实例
+
+    可通过 start_standby 在后台预启动若干备用浏览器，配置相同的 create_driver
+    调用直接取用备用浏览器，并在后台补充新的备用浏览器。
     """
 
+    # 备用浏览器，所有实例共享
+    _standby_lock = threading.Lock()
+    _standby_drivers: List[Any] = []
+    _standby_spec: Optional[Tuple] = None
+    _standby_size = 0
+    _standby_launching = 0
+    _standby_atexit_registered = False
+
     def __init__(self):
         self.driver: Optional[webdriver.Remote] = None
         self.browser_type: str = "chrome"
         self.headless: bool = False
         self.user_data_dir: Optional[str] = None
+        self.profile: BrowserProfile = BROWSER_PROFILES["default"]
 
     def create_driver(
         self,
         browser: str = "chrome",
         headless: bool = False,
         user_data_dir: Optional[str] = None,
+        profile: Optional[str] = None,
         **kwargs,
     ) -> webdriver.Remote:
         """
@@ -46,6 +133,7 @@ class WebDriverManager:
             browser: 浏览器类型 (chrome, firefox, edge)
             headless: 是否无头模式
             user_data_dir: 用户数据目录
+            profile: 性能配置名称，见 BROWSER_PROFILES
             **kwargs: 其他配置参数
 
         Returns:
@@ -54,7 +142,27 @@ class WebDriverManager:
         self.browser_type = browser.lower()
         self.headless = headless
         self.user_data_dir = user_data_dir
+        self.profile = get_browser_profile(profile)
+
+        if not user_data_dir:
+            driver = self._take_standby(
+                self._standby_key(
+                    self.browser_type,
+                    headless,
+                    self.profile.name,
+                    kwargs.get("window_size"),
+                )
+            )
+            if driver:
+                self.driver = driver
+                logger.info(f"使用预启动的 {browser} WebDriver")
+                return driver
+
+        return self._launch_driver(**kwargs)
 
+    def _launch_driver(self, **kwargs) -> webdriver.Remote:
+        """按当前配置启动新的浏览器"""
+        browser = self.browser_type
         try:
             if self.browser_type == "chrome":
                 self.driver = self._create_chrome_driver(**kwargs)
@@ -65,7 +173,10 @@ class WebDriverManager:
             else:
                 raise ValueError(f"不支持的浏览器类型: {browser}")
 
-            logger.info(f"成功创建 {browser} WebDriver")
+            self.apply_profile(self.driver, self.profile)
+            # 页面内等待的异步脚本超时只在创建时设置一次，每次等待不再额外往返
+            self.driver.set_script_timeout(OBSERVER_SCRIPT_TIMEOUT)
+            logger.info(f"成功创建 {browser} WebDriver（配置: {self.profile.name}）")
             return self.driver
 
         except Exception as e:
@@ -95,57 +206,38 @@ class WebDriverManager:
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option("useAutomationExtension", False)
 
+        # 性能配置
+        options.page_load_strategy = self.profile.page_load_strategy
+        if self.profile.block_images:
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+
         # 添加更稳定的配置
         options.add_argument("--disable-web-security")
         options.add_argument("--allow-running-insecure-content")
         options.add_argument("--disable-features=VizDisplayCompositor")
 
         # 窗口大小
-        window_size = kwargs.get("window_size", "1920,1080")
+        window_size = kwargs.get("window_size") or "1920,1080"
         options.add_argument(f"--window-size={window_size}")
 
-        # 指定Chrome浏览器的可执行文件路径
-        import os
-
-        # 用户提供的Chrome路径
-        custom_chrome_path = r"D:\Chrome\App\chrome.exe"
-
-        # 常见的Chrome安装路径
-        chrome_paths = [
-            custom_chrome_path,  # 优先使用用户提供的路径
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            r"C:\Users\{}\AppData\Local\Google\Chrome\Application\chrome.exe".format(
-                os.getenv("USERNAME", "Default")
-            ),
-        ]
-
-        chrome_binary = None
-        for path in chrome_paths:
-            if os.path.exists(path):
-                chrome_binary = path
-                logger.info(f"找到Chrome浏览器: {chrome_binary}")
-                break
-
-        if chrome_binary:
-            options.binary_location = chrome_binary
+        # Chrome与ChromeDriver路径（首次探测后缓存，见 browser_discovery）
+        installation = discover_chrome()
+        if installation.browser_path:
+            options.binary_location = installation.browser_path
+            logger.debug(f"使用Chrome浏览器: {installation.browser_path}")
         else:
             logger.error("未找到Chrome浏览器，请检查安装路径")
             raise Exception("Chrome浏览器未找到")
 
-        # 指定ChromeDriver路径
-        project_root = Path(__file__).parent.parent.parent.parent
-        chromedriver_path = project_root / "chromedriver.exe"
-
         try:
-            if chromedriver_path.exists():
-                logger.info(f"使用本地ChromeDriver: {chromedriver_path}")
-                service = ChromeService(executable_path=str(chromedriver_path))
+            if installation.driver_path:
+                logger.debug(f"使用ChromeDriver: {installation.driver_path}")
+                service = ChromeService(executable_path=installation.driver_path)
                 driver = webdriver.Chrome(service=service, options=options)
             else:
-                logger.warning(
-                    f"未找到本地ChromeDriver: {chromedriver_path}，尝试使用系统PATH"
-                )
+                logger.warning("未找到ChromeDriver，交由Selenium自动解析")
                 driver = webdriver.Chrome(options=options)
 
             # 执行反检测脚本
@@ -166,6 +258,10 @@ class WebDriverManager:
         if self.headless:
             options.add_argument("--headless")
 
+        options.page_load_strategy = self.profile.page_load_strategy
+        if self.profile.block_images:
+            options.set_preference("permissions.default.image", 2)
+
         # 用户配置目录
         if self.user_data_dir:
             profile = webdriver.FirefoxProfile(self.user_data_dir)
@@ -187,8 +283,157 @@ class WebDriverManager:
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
 
+        options.page_load_strategy = self.profile.page_load_strategy
+        if self.profile.block_images:
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+
         return webdriver.Edge(options=options)
 
+    @staticmethod
+    def _standby_key(
+        browser: str, headless: bool, profile: str, window_size: Optional[str]
+    ) -> Tuple:
+        """备用浏览器的配置标识，只有配置完全相同的请求才能取用"""
+        return browser, bool(headless), profile, window_size or "1920,1080"
+
+    @classmethod
+    def standby_count_from_env(cls, default: int = 0) -> int:
+        """从环境变量读取备用浏览器数量"""
+        value = os.getenv(STANDBY_ENV_VAR, "").strip()
+        if not value:
+            return default
+        try:
+            return max(int(value), 0)
+        except ValueError:
+            logger.warning(f"{STANDBY_ENV_VAR} 不是有效的整数: {value}")
+            return default
+
+    @classmethod
+    def start_standby(
+        cls,
+        count: int,
+        browser: str = "chrome",
+        headless: bool = False,
+        profile: Optional[str] = None,
+        window_size: Optional[str] = None,
+    ):
+        """
+        在后台预启动备用浏览器
+
+        每次取用后自动补充，直到调用 stop_standby。再次调用会替换原有配置，
+        与新配置不符的空闲备用浏览器会被关闭。
+
+        Args:
+            count: 保持的备用浏览器数量，0表示停用
+            browser: 浏览器类型
+            headless: 是否无头模式
+            profile: 性能配置名称
+            window_size: 窗口大小
+        """
+        key = cls._standby_key(
+            browser.lower(), headless, get_browser_profile(profile).name, window_size
+        )
+        stale: List[Any] = []
+        with cls._standby_lock:
+            if cls._standby_spec != key:
+                stale = cls._standby_drivers
+                cls._standby_drivers = []
+            cls._standby_spec = key if count > 0 else None
+            cls._standby_size = max(count, 0)
+            if not cls._standby_atexit_registered:
+                atexit.register(cls.stop_standby)
+                cls._standby_atexit_registered = True
+
+        cls._quit_drivers(stale)
+        if count > 0:
+            logger.info(f"预启动 {count} 个备用浏览器: {browser}（无头: {headless}）")
+            cls._replenish_standby()
+
+    @classmethod
+    def stop_standby(cls):
+        """停止补充并关闭所有空闲的备用浏览器"""
+        with cls._standby_lock:
+            drivers = cls._standby_drivers
+            cls._standby_drivers = []
+            cls._standby_spec = None
+            cls._standby_size = 0
+        cls._quit_drivers(drivers)
+
+    @classmethod
+    def standby_count(cls) -> int:
+        """当前空闲的备用浏览器数量"""
+        with cls._standby_lock:
+            return len(cls._standby_drivers)
+
+    @classmethod
+    def _take_standby(cls, key: Tuple) -> Optional[webdriver.Remote]:
+        """取用一个配置相符且存活的备用浏览器，并在后台补充"""
+        while True:
+            with cls._standby_lock:
+                if cls._standby_spec != key or not cls._standby_drivers:
+                    return None
+                driver = cls._standby_drivers.pop(0)
+
+            cls._replenish_standby()
+            if cls.check_driver_alive(driver):
+                return driver
+            cls._quit_drivers([driver])
+
+    @classmethod
+    def _replenish_standby(cls):
+        """启动后台线程补足备用浏览器"""
+        with cls._standby_lock:
+            key = cls._standby_spec
+            missing = (
+                cls._standby_size - len(cls._standby_drivers) - cls._standby_launching
+            )
+            if key is None or missing <= 0:
+                return
+            cls._standby_launching += missing
+
+        for _ in range(missing):
+            threading.Thread(
+                target=cls._launch_standby,
+                args=(key,),
+                name="standby-browser",
+                daemon=True,
+            ).start()
+
+    @classmethod
+    def _launch_standby(cls, key: Tuple):
+        """在后台线程中启动一个备用浏览器，失败时不重试"""
+        browser, headless, profile, window_size = key
+        driver = None
+        try:
+            manager = cls()
+            manager.browser_type = browser
+            manager.headless = headless
+            manager.profile = get_browser_profile(profile)
+            driver = manager._launch_driver(window_size=window_size)
+        except Exception as e:
+            logger.warning(f"预启动备用浏览器失败: {e}")
+        finally:
+            with cls._standby_lock:
+                cls._standby_launching -= 1
+                if driver and cls._standby_spec == key:
+                    cls._standby_drivers.append(driver)
+                    driver = None
+
+        # 启动期间配置已变更或已停用
+        if driver:
+            cls._quit_drivers([driver])
+
+    @staticmethod
+    def _quit_drivers(drivers: List[Any]):
+        """关闭一组浏览器"""
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.debug(f"关闭备用浏览器时出错: {e}")
+
     def get_driver(self) -> Optional[webdriver.Remote]:
         """获取当前WebDriver实例"""
         return self.driver
@@ -206,16 +451,170 @@ class WebDriverManager:
 
     def is_driver_alive(self) -> bool:
         """检查WebDriver是否还活着"""
-        if not self.driver:
+        return self.check_driver_alive(self.driver)
+
+    @staticmethod
+    def check_driver_alive(driver) -> bool:
+        """检查任意WebDriver实例是否还活着"""
+        if not driver:
             return False
 
         try:
             # 尝试获取当前URL来检查连接
-            self.driver.current_url
+            driver.current_url
             return True
         except Exception:
             return False
 
+    @staticmethod
+    def apply_profile(driver, profile: BrowserProfile) -> bool:
+        """
+        在已有会话上应用性能配置中可随时切换的部分（URL拦截）
+
+        页面加载策略和图片设置只能在创建浏览器时指定
+
+        Args:
+            driver: WebDriver实例
+            profile: 性能配置
+
+        Returns:
+            bool: 是否已应用URL拦截（非Chromium内核不支持）
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            if profile.blocked_url_patterns:
+                logger.debug(f"当前浏览器不支持按URL拦截请求: {profile.name}")
+            return False
+
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": list(profile.blocked_url_patterns)}
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"设置请求拦截失败: {e}")
+            return False
+
+    @staticmethod
+    def reset_driver_state(driver) -> bool:
+        """
+        重置浏览器会话状态，供下一次执行复用
+
+        清除Cookie和所有访问过的域名的存储（localStorage、IndexedDB、缓存存储等），
+        再换成一个新的空白标签页并关闭其余标签页，sessionStorage随旧标签页一起丢弃
+
+        Args:
+            driver: WebDriver实例
+
+        Returns:
+            bool: 重置是否成功
+        """
+        try:
+            handles = driver.window_handles
+
+            if hasattr(driver, "execute_cdp_cmd"):
+                # Chromium内核通过CDP按域名清除存储，并清除所有域名的Cookie
+                for origin in WebDriverManager._visited_origins(driver, handles):
+                    try:
+                        driver.execute_cdp_cmd(
+                            "Storage.clearDataForOrigin",
+                            {"origin": origin, "storageTypes": "all"},
+                        )
+                    except Exception as e:
+                        logger.debug(f"清除域名存储失败: {origin}, 错误: {e}")
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            else:
+                # 其他浏览器只能逐个标签页清除当前页面的存储
+                for handle in handles:
+                    driver.switch_to.window(handle)
+                    try:
+                        driver.execute_script(
+                            "try { window.localStorage.clear(); } catch (e) {}"
+                            "try { window.sessionStorage.clear(); } catch (e) {}"
+                        )
+                    except Exception as e:
+                        logger.debug(f"清除页面存储失败: {e}")
+                driver.delete_all_cookies()
+
+            driver.switch_to.new_window("tab")
+            fresh_handle = driver.current_window_handle
+            for handle in handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh_handle)
+            return True
+
+        except Exception as e:
+            logger.warning(f"重置浏览器会话失败: {e}")
+            return False
+
+    @staticmethod
+    def _visited_origins(driver, handles: List[str]) -> List[str]:
+        """各标签页导航历史和所有Cookie涉及的域名（仅Chromium内核）"""
+        origins = set()
+        for handle in handles:
+            try:
+                driver.switch_to.window(handle)
+                history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+            except Exception as e:
+                logger.debug(f"读取导航历史失败: {e}")
+                continue
+            for entry in history.get("entries", []):
+                parsed = urlparse(entry.get("url", ""))
+                if parsed.scheme in ("http", "https") and parsed.netloc:
+                    origins.add(f"{parsed.scheme}://{parsed.netloc}")
+
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})
+        except Exception as e:
+            logger.debug(f"读取Cookie失败: {e}")
+            cookies = {}
+        for cookie in cookies.get("cookies", []):
+            domain = cookie.get("domain", "").lstrip(".")
+            if domain:
+                origins.add(f"https://{domain}")
+                origins.add(f"http://{domain}")
+        return sorted(origins)
+
+    @staticmethod
+    def restore_cookies(driver, cookies: List[Dict[str, Any]]) -> int:
+        """
+        恢复 get_cookies() 保存的Cookie
+
+        Chromium内核通过CDP一次写入所有域名的Cookie；其他浏览器只能写入当前页面域名下的Cookie
+
+        Args:
+            driver: WebDriver实例
+            cookies: Cookie列表
+
+        Returns:
+            int: 写入的Cookie数量
+        """
+        if hasattr(driver, "execute_cdp_cmd"):
+            items = []
+            for cookie in cookies:
+                item = {
+                    key: cookie[key]
+                    for key in ("name", "value", "domain", "path", "secure", "httpOnly")
+                    if key in cookie
+                }
+                if "expiry" in cookie:
+                    item["expires"] = cookie["expiry"]
+                if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                    item["sameSite"] = cookie["sameSite"]
+                items.append(item)
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": items})
+            return len(items)
+
+        restored = 0
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+                restored += 1
+            except Exception as e:
+                logger.debug(f"恢复Cookie失败: {cookie.get('name')}, 错误: {e}")
+        return restored
+
     def restart_driver(self, **kwargs):
         """重启WebDriver"""
         logger.info("重启WebDriver")
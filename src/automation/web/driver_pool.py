@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver会话池
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .driver_manager import WebDriverManager
+
+logger = logging.getLogger(__name__)
+
+
+class WebDriverPool:
+    """
+    有界的WebDriver会话池
+
+    多个工作流并发执行时从池中租用浏览器，用完归还后重置状态供下次复用。
+    所有方法都是线程安全的，阻塞调用应通过执行器在事件循环外执行。
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2,
+        browser: str = "chrome",
+        headless: bool = False,
+        **driver_kwargs,
+    ):
+        if max_size < 1:
+            raise ValueError("会话池大小必须大于0")
+
+        self.max_size = max_size
+        self.browser = browser
+        self.headless = headless
+        self.driver_kwargs: Dict[str, Any] = driver_kwargs
+
+        self._idle: List[Any] = []
+        self._in_use: set = set()
+        self._creating = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """当前池中浏览器总数（含正在创建的）"""
+        with self._condition:
+            return len(self._idle) + len(self._in_use) + self._creating
+
+    @property
+    def idle_count(self) -> int:
+        """空闲浏览器数量"""
+        with self._condition:
+            return len(self._idle)
+
+    @property
+    def in_use_count(self) -> int:
+        """已租出浏览器数量"""
+        with self._condition:
+            return len(self._in_use)
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        租用一个WebDriver
+
+        优先复用空闲且存活的浏览器，未达上限时新建，否则等待归还
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            WebDriver实例
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("WebDriver会话池已关闭")
+                    if self._idle:
+                        driver = self._idle.pop()
+                        self._in_use.add(driver)
+                        break
+                    if len(self._in_use) + self._creating < self.max_size:
+                        driver = None
+                        self._creating += 1
+                        break
+
+                    remaining = (
+                        None if deadline is None else deadline - time.monotonic()
+                    )
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("等待WebDriver会话超时")
+                    self._condition.wait(remaining)
+
+            if driver is None:
+                return self._create_leased_driver()
+
+            # 空闲浏览器可能已被关闭，失效则丢弃后重新租用
+            if WebDriverManager.check_driver_alive(driver):
+                logger.debug("复用空闲WebDriver")
+                return driver
+            self.discard(driver)
+
+    def _create_leased_driver(self):
+        """在锁外创建浏览器，并登记为已租出"""
+        try:
+            driver = WebDriverManager().create_driver(
+                browser=self.browser, headless=self.headless, **self.driver_kwargs
+            )
+        except Exception:
+            with self._condition:
+                self._creating -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._creating -= 1
+            self._in_use.add(driver)
+        logger.info(f"会话池新建WebDriver，当前数量: {self.size}/{self.max_size}")
+        return driver
+
+    def release(self, driver, reset: bool = True):
+        """
+        归还WebDriver
+
+        Args:
+            driver: 租用的WebDriver实例
+            reset: 是否重置浏览器状态（Cookie、存储、多余标签页）
+        """
+        if reset and not WebDriverManager.reset_driver_state(driver):
+            self.discard(driver)
+            return
+
+        with self._condition:
+            self._in_use.discard(driver)
+            if self._closed:
+                close_now = True
+            else:
+                close_now = False
+                self._idle.append(driver)
+                self._condition.notify()
+
+        if close_now:
+            self._quit(driver)
+
+    def discard(self, driver):
+        """丢弃失效的WebDriver并释放其名额"""
+        with self._condition:
+            self._in_use.discard(driver)
+            if driver in self._idle:
+                self._idle.remove(driver)
+            self._condition.notify()
+        self._quit(driver)
+
+    def close(self):
+        """关闭会话池及所有空闲浏览器，已租出的浏览器在归还时关闭"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+
+        for driver in idle:
+            self._quit(driver)
+        logger.info("WebDriver会话池已关闭")
+
+    @staticmethod
+    def _quit(driver):
+        """关闭单个浏览器"""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"关闭WebDriver时出错: {e}")
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量数据提取
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from .locators import ElementLocator
+
+logger = logging.getLogger(__name__)
+
+# 页面内按 [策略, 值] 查找全部元素的函数，供下面的脚本共用
+FIND_ELEMENTS_FUNCTION = """
+function findRows(strategy, v) {
+    switch (strategy) {
+        case 'xpath':
+            var snapshot = document.evaluate(v, document, null,
+                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) {
+                nodes.push(snapshot.snapshotItem(i));
+            }
+            return nodes;
+        case 'id':
+            var el = document.getElementById(v);
+            return el ? [el] : [];
+        case 'name': return Array.prototype.slice.call(document.getElementsByName(v));
+        case 'class name':
+            return Array.prototype.slice.call(document.getElementsByClassName(v));
+        case 'tag name':
+            return Array.prototype.slice.call(document.getElementsByTagName(v));
+        case 'auto':
+            // 裸选择器：与等待时的判定顺序一致，依次按ID、name和CSS查找
+            var byId = document.getElementById(v);
+            if (byId) { return [byId]; }
+            var byName = document.getElementsByName(v);
+            if (byName.length) { return Array.prototype.slice.call(byName); }
+            try {
+                return Array.prototype.slice.call(document.querySelectorAll(v));
+            } catch (e) { return []; }
+        default:
+            return Array.prototype.slice.call(document.querySelectorAll(v));
+    }
+}
+function cellText(el) {
+    var text = el.innerText;
+    if (text === undefined || text === null) { text = el.textContent || ''; }
+    return text.trim();
+}
+"""
+
+# 批量提取脚本：一次调用读取所有行元素及其字段
+# arguments: [策略, 值], [[字段名, 子选择器, 属性], ...], 最大行数
+BULK_EXTRACT_SCRIPT = FIND_ELEMENTS_FUNCTION + """
+var rowLocator = arguments[0], fields = arguments[1], limit = arguments[2];
+
+function readValue(el, attribute) {
+    if (!el) { return null; }
+    if (!attribute) { return cellText(el); }
+    // 与WebElement.get_attribute一致：优先取DOM属性（如完整的href），否则取HTML属性
+    var value = el[attribute];
+    if (value === undefined || value === null ||
+            typeof value === 'object' || typeof value === 'function') {
+        value = el.getAttribute(attribute);
+    }
+    return value;
+}
+
+var rows = findRows(rowLocator[0], rowLocator[1]);
+if (limit > 0) { rows = rows.slice(0, limit); }
+var records = [];
+for (var r = 0; r < rows.length; r++) {
+    var record = {};
+    for (var f = 0; f < fields.length; f++) {
+        var target = rows[r];
+        if (fields[f][1]) {
+            try { target = rows[r].querySelector(fields[f][1]); } catch (e) { target = null; }
+        }
+        record[fields[f][0]] = readValue(target, fields[f][2]);
+    }
+    records.push(record);
+}
+return records;
+"""
+
+# 表格提取脚本：表头取自thead最后一行（没有thead时取第一行），其余每行一条记录
+# arguments: [策略, 值], 是否有表头行, 最大行数
+TABLE_EXTRACT_SCRIPT = FIND_ELEMENTS_FUNCTION + """
+var tableLocator = arguments[0], hasHeader = arguments[1], limit = arguments[2];
+var table = findRows(tableLocator[0], tableLocator[1])[0];
+if (!table || !table.rows) { return null; }
+
+var rows = Array.prototype.slice.call(table.rows);
+var headerRow = null;
+if (hasHeader) {
+    headerRow = (table.tHead && table.tHead.rows.length)
+        ? table.tHead.rows[table.tHead.rows.length - 1] : rows[0];
+}
+var headers = [], used = {};
+if (headerRow) {
+    for (var h = 0; h < headerRow.cells.length; h++) {
+        var key = cellText(headerRow.cells[h]) || ('column_' + (h + 1));
+        var unique = key, n = 2;
+        while (used[unique]) { unique = key + '_' + n++; }
+        used[unique] = true;
+        headers.push(unique);
+    }
+}
+
+var records = [];
+for (var r = 0; r < rows.length; r++) {
+    var row = rows[r];
+    if (row === headerRow || (table.tHead && row.parentNode === table.tHead)) { continue; }
+    if (!row.cells.length) { continue; }
+    var record = {};
+    for (var c = 0; c < row.cells.length; c++) {
+        record[headers[c] || ('column_' + (c + 1))] = cellText(row.cells[c]);
+    }
+    records.push(record);
+    if (limit > 0 && records.length >= limit) { break; }
+}
+return records;
+"""
+
+# 翻页标记脚本：给当前页第一条数据行打标记，翻页后标记消失或内容变化即视为新页面
+# arguments: [策略, 值], 模式（rows/table）, 动作（mark/check）
+PAGE_MARKER_SCRIPT = FIND_ELEMENTS_FUNCTION + """
+var locator = arguments[0], mode = arguments[1], action = arguments[2];
+var el = findRows(locator[0], locator[1])[0] || null;
+if (el && mode === 'table') {
+    var dataRow = null;
+    for (var i = 0; el.rows && i < el.rows.length; i++) {
+        if (el.rows[i].getElementsByTagName('td').length) { dataRow = el.rows[i]; break; }
+    }
+    el = dataRow;
+}
+if (action === 'mark') {
+    if (!el) { return false; }
+    el.__rpaPageMarker = true;
+    el.__rpaPageText = el.textContent;
+    return true;
+}
+// 新的第一条数据行出现且与标记的行不同时才算翻页完成，数据行暂时缺失（加载中）时继续等待
+return !!el && (!el.__rpaPageMarker || el.textContent !== el.__rpaPageText);
+"""
+
+# 翻页点击脚本：下一页控件被禁用（disabled、aria-disabled或带disabled类）时返回false，否则点击
+NEXT_PAGE_SCRIPT = """
+var el = arguments[0];
+function hasDisabledClass(node) {
+    return !!node && /(^|\\s)disabled(\\s|$)/.test(
+        typeof node.className === 'string' ? node.className : '');
+}
+if (el.disabled || el.getAttribute('aria-disabled') === 'true' ||
+        hasDisabledClass(el) || hasDisabledClass(el.parentElement)) {
+    return false;
+}
+el.click();
+return true;
+"""
+
+
+def normalize_fields(
+    fields: Dict[str, Union[str, Dict[str, Any], None]],
+) -> List[List[Any]]:
+    """
+    把字段映射规范化为 [字段名, 子选择器, 属性] 列表
+
+    支持的字段写法:
+    - "" 或 "." : 行元素自身的文本
+    - "span.price" : 子元素文本（CSS选择器）
+    - "a@href" : 子元素属性；"@data-id" 为行元素自身属性
+    - {"selector": "a", "attribute": "href"}
+
+    映射本身也可以是JSON字符串（界面中以文本形式填写时）
+
+    Args:
+        fields: 字段名到提取规则的映射
+
+    Returns:
+        List[List[Any]]: 规范化后的字段列表
+    """
+    if isinstance(fields, str):
+        try:
+            fields = json.loads(fields)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"fields 不是有效的JSON: {e}")
+
+    if not isinstance(fields, dict) or not fields:
+        raise ValueError("fields 必须是非空的字段映射")
+
+    normalized = []
+    for name, spec in fields.items():
+        if isinstance(spec, dict):
+            selector = spec.get("selector") or ""
+            attribute = spec.get("attribute") or None
+        else:
+            spec = (spec or "").strip()
+            selector, _, attribute = spec.partition("@")
+            attribute = attribute.strip() or None
+        selector = selector.strip()
+        if selector == ".":
+            selector = ""
+        normalized.append([name, selector, attribute])
+    return normalized
+
+
+def row_script_locator(selector: str) -> List[str]:
+    """
+    把行选择器转换为脚本使用的 [策略, 值]
+
+    无前缀的裸选择器交给脚本按ID、name、CSS的顺序判定，与等待元素时的判定一致
+    """
+    parsed = ElementLocator._parse_explicit(selector.strip())
+    if parsed:
+        return [parsed[0], parsed[1]]
+    return ["auto", selector.strip()]
+
+
+def extract_records(
+    driver, row_selector: str, fields: Dict[str, Any], limit: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    用一次脚本调用提取所有行的字段
+
+    Args:
+        driver: WebDriver实例
+        row_selector: 行元素选择器
+        fields: 字段映射，见 normalize_fields
+        limit: 最大行数，0表示不限
+
+    Returns:
+        List[Dict[str, Any]]: 每行一条记录
+    """
+    records = driver.execute_script(
+        BULK_EXTRACT_SCRIPT,
+        row_script_locator(row_selector),
+        normalize_fields(fields),
+        int(limit or 0),
+    )
+    logger.debug(f"批量提取 {len(records)} 条记录: {row_selector}")
+    return records
+
+
+def extract_table_records(
+    driver, table_selector: str, header_row: bool = True, limit: int = 0
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    用一次脚本调用提取表格，每行一条以表头为键的记录
+
+    Args:
+        driver: WebDriver实例
+        table_selector: 表格元素选择器
+        header_row: 是否有表头行，False时键为 column_1、column_2...
+        limit: 最大行数，0表示不限
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: 记录列表，未找到表格时返回None
+    """
+    return driver.execute_script(
+        TABLE_EXTRACT_SCRIPT,
+        row_script_locator(table_selector),
+        bool(header_row),
+        int(limit or 0),
+    )
+
+
+def mark_page(driver, selector: str, mode: str = "rows") -> bool:
+    """标记当前页第一条数据行，没有数据行时返回False"""
+    return driver.execute_script(
+        PAGE_MARKER_SCRIPT, row_script_locator(selector), mode, "mark"
+    )
+
+
+def click_next_page(driver, element) -> bool:
+    """点击下一页控件，控件已禁用时返回False"""
+    return driver.execute_script(NEXT_PAGE_SCRIPT, element)
+
+
+def is_page_changed(driver, selector: str, mode: str = "rows") -> bool:
+    """检查标记过的数据行是否已被新页面替换"""
+    return driver.execute_script(
+        PAGE_MARKER_SCRIPT, row_script_locator(selector), mode, "check"
+    )
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP页面获取
+
+服务端渲染的静态页面不需要启动浏览器：用 requests.Session 获取HTML，再交给DOM快照在本地解析。
+连接池适配器和响应缓存在进程内共享，多次运行、并发执行的上下文都复用同一批keep-alive连接；
+客户端（Session）属于执行上下文，Cookie和登录状态不会带到下一次运行，也不会在上下文之间共享。
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# 默认请求头，部分站点会拒绝没有浏览器UA的请求
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+}
+
+
+@dataclass
+class FetchedPage:
+    """获取到的页面"""
+
+    url: str
+    status_code: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+
+class ResponseCache:
+    """线程安全的LRU响应缓存，条目按各自的有效期过期"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Tuple[float, FetchedPage]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, headers: Optional[Dict[str, str]]) -> Tuple:
+        return url, tuple(sorted((headers or {}).items()))
+
+    def get(self, key: Tuple) -> Optional[FetchedPage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, page = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return page
+
+    def put(self, key: Tuple, page: FetchedPage, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, page)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def create_adapter(pool_size: int = 10, max_retries: int = 2) -> HTTPAdapter:
+    """创建带重试的连接池适配器"""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+    )
+    return HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+
+
+_shared_lock = threading.Lock()
+_shared_pid: Optional[int] = None
+_shared_adapter: Optional[HTTPAdapter] = None
+
+# 进程内共享的响应缓存
+response_cache = ResponseCache()
+
+
+def shared_adapter() -> HTTPAdapter:
+    """
+    进程内共享的连接池适配器，首次使用时创建
+
+    fork出的子进程不复用父进程的连接（套接字不能跨进程共用），会重新创建适配器和缓存
+    """
+    global _shared_pid, _shared_adapter
+    with _shared_lock:
+        if _shared_adapter is None or _shared_pid != os.getpid():
+            if _shared_adapter is not None:
+                response_cache.clear()
+            _shared_adapter = create_adapter()
+            _shared_pid = os.getpid()
+        return _shared_adapter
+
+
+class HttpClient:
+    """
+    HTTP客户端
+
+    请求经由共享的连接池适配器，同一主机复用keep-alive连接；cache_ttl大于0的请求会把成功响应
+    放入共享缓存，有效期内重复获取同一URL（包括之后的运行）不再发起请求。缓存不区分Cookie，
+    需要登录后才能看到的页面不要开启缓存。
+
+    Args:
+        adapter: 连接池适配器，默认使用进程内共享的适配器
+        cache: 响应缓存，默认使用进程内共享的缓存
+    """
+
+    def __init__(
+        self,
+        adapter: Optional[HTTPAdapter] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        adapter = adapter or shared_adapter()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.cache = response_cache if cache is None else cache
+
+    def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+        cache_ttl: float = 0,
+        encoding: Optional[str] = None,
+        verify: bool = True,
+    ) -> FetchedPage:
+        """
+        获取页面
+
+        Args:
+            url: 页面URL
+            headers: 附加请求头
+            timeout: 超时时间（秒）
+            cache_ttl: 缓存有效期（秒），0表示不使用缓存
+            encoding: 指定页面编码，默认按响应头或内容推断
+            verify: 是否校验HTTPS证书
+
+        Returns:
+            FetchedPage: 页面内容，HTTP错误状态也会正常返回
+        """
+        key = self.cache.key(url, headers)
+        if cache_ttl > 0:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug(f"命中页面缓存: {url}")
+                return FetchedPage(
+                    cached.url,
+                    cached.status_code,
+                    cached.text,
+                    cached.headers,
+                    from_cache=True,
+                )
+
+        response = self.session.get(
+            url, headers=headers, timeout=timeout, verify=verify
+        )
+        if encoding:
+            response.encoding = encoding
+        elif "charset" not in response.headers.get("Content-Type", "").lower():
+            # 响应头未声明编码时requests默认按ISO-8859-1解码，中文页面会乱码
+            response.encoding = response.apparent_encoding
+
+        page = FetchedPage(
+            url=response.url,
+            status_code=response.status_code,
+            text=response.text,
+            headers=dict(response.headers),
+        )
+        logger.debug(f"获取页面: {url} -> {page.status_code}, {len(page.text)} 字符")
+
+        if cache_ttl > 0 and response.ok:
+            self.cache.put(key, page, cache_ttl)
+        return page
+
+    def close(self):
+        """
+        丢弃会话的Cookie
+
+        不调用 Session.close()：它会关闭挂载的适配器，清空共享连接池
+        """
+        self.session.cookies.clear()
+
+
+def get_http_client(context) -> HttpClient:
+    """
+    获取执行上下文的HTTP客户端，没有时创建
+
+    同一上下文中的步骤顺序执行，客户端不会被并发使用；上下文在运行开始和清理时关闭客户端，
+    连接池和响应缓存不随之丢弃
+    """
+    if context.http_client is None:
+        context.http_client = HttpClient()
+        logger.debug("已创建HTTP客户端")
+    return context.http_client
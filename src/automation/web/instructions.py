@@ -4,20 +4,50 @@
 网页自动化指令实现
 """
 
+import asyncio
+import functools
 import logging
-import time
-from typing import Dict, Any, Optional, List
+from abc import abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from ...core.instruction_base import InstructionExecutor, InstructionResult
-from .driver_manager import WebDriverManager
-from .locators import ElementLocator
+from .driver_manager import WebDriverManager, get_browser_profile
+from .locators import ElementLocator, WAIT_ENGINE_POLLING
+from .extraction import (
+    click_next_page,
+    extract_records,
+    extract_table_records,
+    is_page_changed,
+    mark_page,
+    normalize_fields,
+)
+from .http_client import get_http_client
+from .sinks import create_sink
+from .snapshot import DomSnapshot, SnapshotUnsupportedError
+from .tabs import OPEN_TAB_SCRIPT, TabRouter
 
 logger = logging.getLogger(__name__)
 
+# 等待被停止请求打断时的提示
+INTERRUPTED_MESSAGE = "执行被用户中断"
+
+
+def create_locator(
+    context, driver, timeout: float, wait_engine: Optional[str] = None
+) -> ElementLocator:
+    """创建定位器，页面URL取自执行上下文，定位器读取到的URL也记录回上下文"""
+    return ElementLocator(
+        driver,
+        timeout,
+        wait_engine or WAIT_ENGINE_POLLING,
+        page_url=context.page_url,
+        on_page_url=lambda url: setattr(context, "page_url", url),
+    )
+
 
 class OpenWebPageInstruction(InstructionExecutor):
     """打开网页指令"""
@@ -40,6 +70,7 @@ class OpenWebPageInstruction(InstructionExecutor):
             "headless": False,
             "timeout": 30,
             "window_size": "1920,1080",
+            "profile": "default",  # 性能配置，如 scrape-fast（不加载图片、DOM就绪即返回）
         }
 
     def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
@@ -47,6 +78,11 @@ class OpenWebPageInstruction(InstructionExecutor):
         if "url" not in parameters:
             return False
 
+        try:
+            get_browser_profile(parameters.get("profile"))
+        except ValueError:
+            return False
+
         url = parameters["url"]
         if not isinstance(url, str) or not url.strip():
             return False
@@ -65,48 +101,62 @@ class OpenWebPageInstruction(InstructionExecutor):
             headless = parameters.get("headless", False)
             timeout = parameters.get("timeout", 30)
             window_size = parameters.get("window_size", "1920,1080")
+            profile = get_browser_profile(parameters.get("profile"))
 
             logger.info(f"打开网页: {url}")
 
             # 获取或创建WebDriver，并自动重启已关闭的driver
             driver = context.get_web_driver()
+            created = False
             if not driver:
                 logger.info("创建新的WebDriver")
-                driver_manager = WebDriverManager()
-                driver = driver_manager.create_driver(
-                    browser=browser, headless=headless, window_size=window_size
+                driver = await self._create_driver(
+                    context, browser, headless, window_size, profile.name
                 )
                 context.set_web_driver(driver)
+                created = True
             else:
                 # 检查driver是否还活着
                 logger.info("检查现有WebDriver连接状态")
                 try:
                     # 尝试获取当前URL来检查连接
-                    test_url = driver.current_url
+                    test_url = await context.run_blocking(lambda: driver.current_url)
                     logger.info(f"WebDriver连接正常，当前URL: {test_url}")
                 except Exception as e:
                     logger.warning(f"WebDriver连接已断开: {e}")
                     logger.info("重新创建WebDriver")
-                    # 创建新的WebDriverManager实例
-                    driver_manager = WebDriverManager()
-                    driver = driver_manager.create_driver(
-                        browser=browser, headless=headless, window_size=window_size
+                    if context.driver_pool:
+                        await context.run_blocking(context.driver_pool.discard, driver)
+                    driver = await self._create_driver(
+                        context, browser, headless, window_size, profile.name
                     )
                     context.set_web_driver(driver)
+                    created = True
+
+            # 已有会话（或从会话池租用）按本步骤的配置切换请求拦截
+            if not created or context.driver_pool:
+                await context.run_blocking(
+                    WebDriverManager.apply_profile, driver, profile
+                )
 
             # 设置页面加载超时
-            driver.set_page_load_timeout(timeout)
+            await context.run_blocking(driver.set_page_load_timeout, timeout)
 
             # 打开网页
-            driver.get(url)
+            await context.run_blocking(driver.get, url)
 
             # 等待页面加载完成
-            WebDriverWait(driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+            if profile.wait_ready_state:
+                await context.run_blocking(
+                    WebDriverWait(driver, timeout).until,
+                    lambda d: d.execute_script("return document.readyState")
+                    == "complete",
+                )
 
-            current_url = driver.current_url
-            title = driver.title
+            current_url, title = await context.run_blocking(
+                lambda: (driver.current_url, driver.title)
+            )
+            context.page_url = current_url
 
             logger.info(f"成功打开网页: {title} ({current_url})")
 
@@ -126,6 +176,108 @@ class OpenWebPageInstruction(InstructionExecutor):
             logger.error(error_msg)
             return InstructionResult(success=False, message=error_msg)
 
+    async def _create_driver(
+        self, context, browser, headless, window_size, profile=None
+    ):
+        """创建WebDriver，配置了会话池时从池中租用（使用池的浏览器配置）"""
+        if context.driver_pool:
+            logger.info("从会话池租用WebDriver")
+            return await context.run_blocking(context.driver_pool.acquire)
+
+        driver_manager = WebDriverManager()
+        return await context.run_blocking(
+            driver_manager.create_driver,
+            browser=browser,
+            headless=headless,
+            window_size=window_size,
+            profile=profile,
+        )
+
+
+class FetchPageInstruction(InstructionExecutor):
+    """HTTP获取网页指令"""
+
+    def __init__(self):
+        super().__init__("fetch_page")
+
+    def get_instruction_name(self) -> str:
+        return "fetch_page"
+
+    def get_instruction_description(self) -> str:
+        return "不启动浏览器，直接请求网页并解析（适用于服务端渲染的静态页面）"
+
+    def get_required_parameters(self) -> List[str]:
+        return ["url"]
+
+    def get_optional_parameters(self) -> Dict[str, Any]:
+        return {
+            "timeout": 30,
+            "headers": None,  # 附加请求头
+            "cache_ttl": 0,  # 响应缓存有效期（秒），0表示不缓存
+            "encoding": None,  # 页面编码，默认自动判断
+            "verify": True,  # 校验HTTPS证书
+            "variable_name": None,  # 保存页面HTML
+        }
+
+    def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
+        """验证参数"""
+        url = parameters.get("url")
+        if not isinstance(url, str) or not url.strip():
+            return False
+
+        if not (url.startswith("http://") or url.startswith("https://")):
+            parameters["url"] = "https://" + url
+
+        headers = parameters.get("headers")
+        return headers is None or isinstance(headers, dict)
+
+    async def execute(self, parameters: Dict[str, Any], context) -> InstructionResult:
+        """执行HTTP获取网页，结果作为DOM快照供后续提取步骤使用"""
+        url = parameters["url"]
+        try:
+            logger.info(f"获取网页: {url}")
+
+            page = await context.run_blocking(
+                get_http_client(context).fetch,
+                url,
+                headers=parameters.get("headers"),
+                timeout=parameters.get("timeout", 30),
+                cache_ttl=float(parameters.get("cache_ttl") or 0),
+                encoding=parameters.get("encoding"),
+                verify=parameters.get("verify", True),
+            )
+            if page.status_code >= 400:
+                return InstructionResult(
+                    success=False,
+                    message=f"获取网页失败: HTTP {page.status_code} ({page.url})",
+                    data={"url": page.url, "status_code": page.status_code},
+                )
+
+            snapshot = await context.run_blocking(DomSnapshot, page.text, page.url)
+            context.dom_snapshot = snapshot
+
+            variable_name = parameters.get("variable_name")
+            if variable_name:
+                context.set_variable(variable_name, page.text)
+
+            logger.info(f"成功获取网页: {snapshot.title} ({page.url})")
+
+            return InstructionResult(
+                success=True,
+                message=f"成功获取网页: {snapshot.title}",
+                data={
+                    "url": page.url,
+                    "title": snapshot.title,
+                    "status_code": page.status_code,
+                    "from_cache": page.from_cache,
+                },
+            )
+
+        except Exception as e:
+            error_msg = f"获取网页失败: {e}"
+            logger.error(error_msg)
+            return InstructionResult(success=False, message=error_msg)
+
 
 class ClickElementInstruction(InstructionExecutor):
     """点击元素指令"""
@@ -143,7 +295,12 @@ class ClickElementInstruction(InstructionExecutor):
         return ["selector"]
 
     def get_optional_parameters(self) -> Dict[str, Any]:
-        return {"timeout": 10, "wait_clickable": True, "scroll_to_element": True}
+        return {
+            "timeout": 10,
+            "wait_clickable": True,
+            "scroll_to_element": True,
+            "wait_engine": WAIT_ENGINE_POLLING,  # polling 或 observer
+        }
 
     def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
         return "selector" in parameters and parameters["selector"]
@@ -160,13 +317,19 @@ class ClickElementInstruction(InstructionExecutor):
             if not driver:
                 return InstructionResult(success=False, message="WebDriver未初始化")
 
-            locator = ElementLocator(driver, timeout)
+            locator = create_locator(
+                context, driver, timeout, parameters.get("wait_engine")
+            )
 
             # 查找元素
             if wait_clickable:
-                element = locator.wait_for_element_clickable(selector, timeout)
+                element = await context.run_locator_wait(
+                    locator.wait_for_element_clickable, selector, timeout
+                )
             else:
-                element = locator.find_element(selector, timeout)
+                element = await context.run_locator_wait(
+                    locator.find_element, selector, timeout
+                )
 
             if not element:
                 return InstructionResult(
@@ -175,11 +338,16 @@ class ClickElementInstruction(InstructionExecutor):
 
             # 滚动到元素
             if scroll_to_element:
-                driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                time.sleep(0.5)
+                await context.run_blocking(
+                    driver.execute_script,
+                    "arguments[0].scrollIntoView(true);",
+                    element,
+                )
+                if not await context.sleep(0.5):
+                    return InstructionResult(success=False, message=INTERRUPTED_MESSAGE)
 
             # 点击元素
-            element.click()
+            await context.run_blocking(element.click)
 
             logger.info(f"成功点击元素: {selector}")
 
@@ -216,6 +384,7 @@ class InputTextInstruction(InstructionExecutor):
             "clear_first": True,
             "simulate_typing": False,
             "typing_delay": 0.1,
+            "wait_engine": WAIT_ENGINE_POLLING,
         }
 
     def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
@@ -235,8 +404,12 @@ class InputTextInstruction(InstructionExecutor):
             if not driver:
                 return InstructionResult(success=False, message="WebDriver未初始化")
 
-            locator = ElementLocator(driver, timeout)
-            element = locator.find_element(selector, timeout)
+            locator = create_locator(
+                context, driver, timeout, parameters.get("wait_engine")
+            )
+            element = await context.run_locator_wait(
+                locator.find_element, selector, timeout
+            )
 
             if not element:
                 return InstructionResult(
@@ -244,21 +417,27 @@ class InputTextInstruction(InstructionExecutor):
                 )
 
             # 滚动到元素
-            driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(0.5)
+            await context.run_blocking(
+                driver.execute_script, "arguments[0].scrollIntoView(true);", element
+            )
+            if not await context.sleep(0.5):
+                return InstructionResult(success=False, message=INTERRUPTED_MESSAGE)
 
             # 清空输入框
             if clear_first:
-                element.clear()
+                await context.run_blocking(element.clear)
 
             # 输入文本
             if simulate_typing:
                 # 模拟逐字输入
                 for char in text:
-                    element.send_keys(char)
-                    time.sleep(typing_delay)
+                    await context.run_blocking(element.send_keys, char)
+                    if not await context.sleep(typing_delay):
+                        return InstructionResult(
+                            success=False, message=INTERRUPTED_MESSAGE
+                        )
             else:
-                element.send_keys(text)
+                await context.run_blocking(element.send_keys, text)
 
             logger.info(f"成功输入文本到 {selector}: {text}")
 
@@ -277,6 +456,8 @@ class InputTextInstruction(InstructionExecutor):
 class ExtractTextInstruction(InstructionExecutor):
     """提取文本指令"""
 
+    read_only = True
+
     def __init__(self):
         super().__init__("extract_text")
 
@@ -294,10 +475,22 @@ class ExtractTextInstruction(InstructionExecutor):
             "timeout": 10,
             "attribute": None,  # 如果指定，提取属性值而不是文本
             "variable_name": None,  # 保存到变量
+            "wait_engine": WAIT_ENGINE_POLLING,
+            "fields": None,  # 批量模式：selector为行选择器，字段名 -> 子选择器[@属性]
+            "limit": 0,  # 批量模式最大行数，0表示不限
+            "use_snapshot": False,  # 从DOM快照中提取，连续的提取步骤只读取一次页面源码
         }
 
     def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
-        return "selector" in parameters
+        if "selector" not in parameters:
+            return False
+
+        if parameters.get("fields"):
+            try:
+                normalize_fields(parameters["fields"])
+            except ValueError:
+                return False
+        return True
 
     async def execute(self, parameters: Dict[str, Any], context) -> InstructionResult:
         """执行提取文本"""
@@ -307,23 +500,42 @@ class ExtractTextInstruction(InstructionExecutor):
             attribute = parameters.get("attribute")
             variable_name = parameters.get("variable_name")
 
+            # 没有浏览器但有快照（如fetch_page获取的页面）时总是从快照提取
+            if parameters.get("use_snapshot") or (
+                context.dom_snapshot is not None and not context.get_web_driver()
+            ):
+                result = await self._extract_from_snapshot(parameters, context)
+                if result:
+                    return result
+
             driver = context.get_web_driver()
             if not driver:
                 return InstructionResult(success=False, message="WebDriver未初始化")
 
-            locator = ElementLocator(driver, timeout)
-            element = locator.find_element(selector, timeout)
+            locator = create_locator(
+                context, driver, timeout, parameters.get("wait_engine")
+            )
+            element = await context.run_locator_wait(
+                locator.find_element, selector, timeout
+            )
 
             if not element:
                 return InstructionResult(
                     success=False, message=f"未找到元素: {selector}"
                 )
 
+            if parameters.get("fields"):
+                return await self._extract_bulk(
+                    parameters, context, driver, locator.matched_selector
+                )
+
             # 提取文本或属性
             if attribute:
-                extracted_value = element.get_attribute(attribute)
+                extracted_value = await context.run_blocking(
+                    element.get_attribute, attribute
+                )
             else:
-                extracted_value = element.text
+                extracted_value = await context.run_blocking(lambda: element.text)
 
             # 保存到变量
             if variable_name:
@@ -346,6 +558,372 @@ class ExtractTextInstruction(InstructionExecutor):
             logger.error(error_msg)
             return InstructionResult(success=False, message=error_msg)
 
+    async def _extract_from_snapshot(
+        self, parameters: Dict[str, Any], context
+    ) -> Optional[InstructionResult]:
+        """
+        从DOM快照中提取，没有快照时读取一次页面源码创建
+
+        快照中找不到元素时（页面可能仍在加载）丢弃快照并返回None，由调用方回退到实时浏览器；
+        快照来自HTTP请求或没有浏览器时直接返回失败结果。
+        """
+        driver = context.get_web_driver()
+        snapshot = context.dom_snapshot
+        if snapshot is None:
+            if not driver:
+                return None
+            snapshot = await context.run_blocking(DomSnapshot.from_driver, driver)
+            context.dom_snapshot = snapshot
+            logger.debug(f"已创建DOM快照: {snapshot.url}")
+        can_fall_back = bool(driver) and snapshot.from_browser
+
+        selector = parameters["selector"]
+        variable_name = parameters.get("variable_name")
+        try:
+            if parameters.get("fields"):
+                # 候选选择器按顺序尝试，记录实际命中的一个
+                candidates = ElementLocator.as_selector_list(selector)
+                row_selector, records = candidates[0], []
+                for candidate in candidates:
+                    records = snapshot.extract_records(
+                        candidate, parameters["fields"], parameters.get("limit", 0)
+                    )
+                    if records:
+                        row_selector = candidate
+                        break
+                value = records
+                data = {"selector": row_selector, "records": records}
+                message = f"成功从快照批量提取 {len(records)} 条记录"
+                found = bool(records)
+            else:
+                node = snapshot.select_one(selector)
+                value = snapshot.read(node, parameters.get("attribute"))
+                data = {"selector": selector, "text": value}
+                message = f"成功从快照提取文本: {value}"
+                found = node is not None
+        except SnapshotUnsupportedError as e:
+            logger.debug(f"快照无法处理选择器，改用浏览器: {e}")
+            if can_fall_back:
+                return None
+            return InstructionResult(success=False, message=str(e))
+
+        if not found:
+            if can_fall_back:
+                context.invalidate_dom_snapshot()
+                return None
+            return InstructionResult(success=False, message=f"未找到元素: {selector}")
+
+        if variable_name:
+            context.set_variable(variable_name, value)
+
+        logger.info(message)
+
+        data["variable_name"] = variable_name
+        data["snapshot"] = True
+        return InstructionResult(success=True, message=message, data=data)
+
+    async def _extract_bulk(
+        self,
+        parameters: Dict[str, Any],
+        context,
+        driver,
+        row_selector: Optional[str] = None,
+    ) -> InstructionResult:
+        """
+        批量模式：一次脚本调用提取所有行的字段，结果为记录列表
+
+        row_selector 为等待时实际命中的候选选择器，未传时使用第一个候选
+        """
+        if not row_selector:
+            row_selector = ElementLocator.as_selector_list(parameters["selector"])[0]
+        variable_name = parameters.get("variable_name")
+
+        records = await context.run_blocking(
+            extract_records,
+            driver,
+            row_selector,
+            parameters["fields"],
+            parameters.get("limit", 0),
+        )
+
+        if variable_name:
+            context.set_variable(variable_name, records)
+
+        logger.info(f"成功批量提取 {len(records)} 条记录: {row_selector}")
+
+        return InstructionResult(
+            success=True,
+            message=f"成功批量提取 {len(records)} 条记录",
+            data={
+                "selector": row_selector,
+                "records": records,
+                "variable_name": variable_name,
+            },
+        )
+
+
+async def iter_page_records(
+    context,
+    driver,
+    extract_page: Callable[[], List[Dict[str, Any]]],
+    marker_selector: str,
+    marker_mode: str = "rows",
+    next_selector: Optional[str] = None,
+    max_pages: int = 0,
+    timeout: float = 10,
+    page_delay: float = 0,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    逐页提取记录的异步生成器
+
+    每提取完一页就产出该页记录，然后点击下一页控件并等待数据行被替换，
+    调用方可以边翻页边写出结果，内存占用与总页数无关。
+
+    Args:
+        context: 执行上下文
+        driver: WebDriver实例
+        extract_page: 提取当前页记录的同步函数
+        marker_selector: 用于判断翻页完成的元素选择器（行选择器或表格选择器）
+        marker_mode: rows 取第一个匹配元素，table 取表格的第一条数据行
+        next_selector: 下一页控件选择器，为空时只提取当前页
+        max_pages: 最大页数，0表示直到没有下一页
+        timeout: 查找下一页控件和等待翻页的超时时间
+        page_delay: 每次翻页后的额外等待时间
+
+    Yields:
+        List[Dict[str, Any]]: 每页的记录
+    """
+    page = 0
+    while True:
+        records = await context.run_blocking(extract_page)
+        page += 1
+        yield records or []
+
+        if not next_selector or (max_pages and page >= max_pages):
+            return
+        if context.is_stop_requested():
+            return
+
+        if not await context.run_blocking(
+            mark_page, driver, marker_selector, marker_mode
+        ):
+            logger.info(f"第 {page} 页没有数据行，停止翻页")
+            return
+
+        locator = create_locator(context, driver, timeout)
+        next_element = await context.run_locator_wait(
+            locator.find_element, next_selector, timeout
+        )
+        if not next_element:
+            logger.info(f"未找到下一页控件，共 {page} 页")
+            return
+        if not await context.run_blocking(click_next_page, driver, next_element):
+            logger.info(f"下一页控件已禁用，共 {page} 页")
+            return
+
+        try:
+            await context.run_locator_wait(
+                WebDriverWait(driver, timeout).until,
+                lambda d: is_page_changed(d, marker_selector, marker_mode),
+            )
+        except TimeoutException:
+            logger.warning(f"点击下一页后 {timeout} 秒内页面未变化，停止翻页")
+            return
+
+        if page_delay and not await context.sleep(page_delay):
+            return
+
+
+class PagedExtractionInstruction(InstructionExecutor):
+    """
+    分页提取指令基类
+
+    子类提供单页提取函数，基类负责翻页，并把每页记录写入输出文件（指定output时）
+    或汇总到变量中。
+    """
+
+    # 翻页标记模式，见 iter_page_records
+    marker_mode = "rows"
+
+    def get_required_parameters(self) -> List[str]:
+        return ["selector"]
+
+    def get_optional_parameters(self) -> Dict[str, Any]:
+        return {
+            "timeout": 10,
+            "next_selector": None,  # 下一页控件，为空时只提取当前页
+            "max_pages": 0,  # 最大页数，0表示直到没有下一页
+            "page_delay": 0,  # 每次翻页后的额外等待（秒）
+            "limit": 0,  # 每页最大行数，0表示不限
+            "output": None,  # 输出文件，逐页写入
+            "output_format": None,  # jsonl 或 csv，默认按扩展名判断
+            "append": False,  # 追加到已有输出文件
+            "variable_name": None,  # 有输出文件时保存记录数，否则保存记录列表
+            "wait_engine": WAIT_ENGINE_POLLING,
+        }
+
+    def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
+        if "selector" not in parameters:
+            return False
+
+        try:
+            int(parameters.get("max_pages") or 0)
+            int(parameters.get("limit") or 0)
+            return True
+        except (ValueError, TypeError):
+            return False
+
+    @abstractmethod
+    def make_page_extractor(
+        self, parameters: Dict[str, Any], driver, selector: str
+    ) -> Callable[[], List[Dict[str, Any]]]:
+        """返回提取当前页记录的同步函数"""
+        pass
+
+    async def execute(self, parameters: Dict[str, Any], context) -> InstructionResult:
+        """执行分页提取"""
+        sink = None
+        try:
+            selector = ElementLocator.as_selector_list(parameters["selector"])[0]
+            timeout = parameters.get("timeout", 10)
+            output = parameters.get("output")
+            variable_name = parameters.get("variable_name")
+
+            driver = context.get_web_driver()
+            if not driver:
+                return InstructionResult(success=False, message="WebDriver未初始化")
+
+            locator = create_locator(
+                context, driver, timeout, parameters.get("wait_engine")
+            )
+            if not await context.run_locator_wait(
+                locator.find_element, selector, timeout
+            ):
+                return InstructionResult(
+                    success=False, message=f"未找到元素: {selector}"
+                )
+
+            if output:
+                sink = create_sink(
+                    output,
+                    parameters.get("output_format"),
+                    append=bool(parameters.get("append")),
+                )
+            records: List[Dict[str, Any]] = []
+            total = 0
+            pages = 0
+
+            async for page_records in iter_page_records(
+                context,
+                driver,
+                self.make_page_extractor(parameters, driver, selector),
+                selector,
+                self.marker_mode,
+                parameters.get("next_selector"),
+                int(parameters.get("max_pages") or 0),
+                timeout,
+                float(parameters.get("page_delay") or 0),
+            ):
+                pages += 1
+                total += len(page_records)
+                if sink:
+                    sink.write_many(page_records)
+                else:
+                    records.extend(page_records)
+                logger.debug(f"第 {pages} 页提取 {len(page_records)} 条记录")
+
+            if context.is_stop_requested():
+                return InstructionResult(success=False, message=INTERRUPTED_MESSAGE)
+
+            if variable_name:
+                context.set_variable(variable_name, total if sink else records)
+
+            logger.info(f"成功提取 {pages} 页，共 {total} 条记录: {selector}")
+
+            data = {
+                "selector": selector,
+                "pages": pages,
+                "count": total,
+                "variable_name": variable_name,
+            }
+            if sink:
+                data["output"] = output
+            else:
+                data["records"] = records
+            return InstructionResult(
+                success=True,
+                message=f"成功提取 {pages} 页，共 {total} 条记录",
+                data=data,
+            )
+
+        except Exception as e:
+            error_msg = f"{self.get_instruction_description()}失败: {e}"
+            logger.error(error_msg)
+            return InstructionResult(success=False, message=error_msg)
+        finally:
+            if sink:
+                sink.close()
+
+
+class ExtractTableInstruction(PagedExtractionInstruction):
+    """提取表格指令"""
+
+    marker_mode = "table"
+
+    def __init__(self):
+        super().__init__("extract_table")
+
+    def get_instruction_name(self) -> str:
+        return "extract_table"
+
+    def get_instruction_description(self) -> str:
+        return "提取表格数据"
+
+    def get_optional_parameters(self) -> Dict[str, Any]:
+        parameters = super().get_optional_parameters()
+        parameters["header_row"] = True  # 第一行（或thead）为表头
+        return parameters
+
+    def make_page_extractor(
+        self, parameters: Dict[str, Any], driver, selector: str
+    ) -> Callable[[], List[Dict[str, Any]]]:
+        header_row = parameters.get("header_row", True)
+        limit = parameters.get("limit", 0)
+        return lambda: extract_table_records(driver, selector, header_row, limit)
+
+
+class PaginateInstruction(PagedExtractionInstruction):
+    """分页采集指令"""
+
+    def __init__(self):
+        super().__init__("paginate")
+
+    def get_instruction_name(self) -> str:
+        return "paginate"
+
+    def get_instruction_description(self) -> str:
+        return "逐页采集列表数据"
+
+    def get_required_parameters(self) -> List[str]:
+        return ["selector", "fields"]
+
+    def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
+        if not super().validate_parameters(parameters):
+            return False
+
+        try:
+            normalize_fields(parameters.get("fields"))
+            return True
+        except ValueError:
+            return False
+
+    def make_page_extractor(
+        self, parameters: Dict[str, Any], driver, selector: str
+    ) -> Callable[[], List[Dict[str, Any]]]:
+        fields = parameters["fields"]
+        limit = parameters.get("limit", 0)
+        return lambda: extract_records(driver, selector, fields, limit)
+
 
 class HoverElementInstruction(InstructionExecutor):
     """鼠标悬停指令"""
@@ -363,7 +941,11 @@ class HoverElementInstruction(InstructionExecutor):
         return ["selector"]
 
     def get_optional_parameters(self) -> Dict[str, Any]:
-        return {"timeout": 10, "duration": 1.0}  # 悬停持续时间
+        return {
+            "timeout": 10,
+            "duration": 1.0,  # 悬停持续时间
+            "wait_engine": WAIT_ENGINE_POLLING,
+        }
 
     def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
         return "selector" in parameters
@@ -379,8 +961,12 @@ class HoverElementInstruction(InstructionExecutor):
             if not driver:
                 return InstructionResult(success=False, message="WebDriver未初始化")
 
-            locator = ElementLocator(driver, timeout)
-            element = locator.find_element(selector, timeout)
+            locator = create_locator(
+                context, driver, timeout, parameters.get("wait_engine")
+            )
+            element = await context.run_locator_wait(
+                locator.find_element, selector, timeout
+            )
 
             if not element:
                 return InstructionResult(
@@ -389,10 +975,11 @@ class HoverElementInstruction(InstructionExecutor):
 
             # 执行悬停
             actions = ActionChains(driver)
-            actions.move_to_element(element).perform()
+            await context.run_blocking(actions.move_to_element(element).perform)
 
             # 等待指定时间
-            time.sleep(duration)
+            if not await context.sleep(duration):
+                return InstructionResult(success=False, message=INTERRUPTED_MESSAGE)
 
             logger.info(f"成功悬停在元素: {selector}")
 
@@ -411,6 +998,8 @@ class HoverElementInstruction(InstructionExecutor):
 class WaitInstruction(InstructionExecutor):
     """等待指令"""
 
+    read_only = True
+
     def __init__(self):
         super().__init__("wait")
 
@@ -442,7 +1031,8 @@ class WaitInstruction(InstructionExecutor):
             duration = float(parameters["duration"])
 
             logger.info(f"等待 {duration} 秒")
-            time.sleep(duration)
+            if not await context.sleep(duration):
+                return InstructionResult(success=False, message=INTERRUPTED_MESSAGE)
 
             return InstructionResult(
                 success=True,
@@ -454,3 +1044,274 @@ class WaitInstruction(InstructionExecutor):
             error_msg = f"等待执行失败: {e}"
             logger.error(error_msg)
             return InstructionResult(success=False, message=error_msg)
+
+
+class FanOutTabsInstruction(InstructionExecutor):
+    """
+    多标签页并行指令
+
+    在同一个浏览器中为每个URL打开一个标签页，页面并行加载，再在各标签页中交替执行子流程。
+    每个标签页使用独立的子上下文：变量从当前上下文复制，另外提供 tab_index、tab_url
+    和 tab_item（urls 来自记录列表时为整条记录），子流程写入的变量汇总到结果中。
+    子流程的WebDriver命令由 TabRouter 逐条切换到所属标签页执行。
+    """
+
+    # 等待标签页加载时的轮询间隔（秒）
+    TAB_POLL_INTERVAL = 0.2
+
+    def __init__(self, engine):
+        super().__init__("fan_out_tabs")
+        self.engine = engine
+
+    def get_instruction_name(self) -> str:
+        return "fan_out_tabs"
+
+    def get_instruction_description(self) -> str:
+        return "在多个标签页中并行打开URL并执行子流程"
+
+    def get_required_parameters(self) -> List[str]:
+        return ["urls", "steps"]
+
+    def get_optional_parameters(self) -> Dict[str, Any]:
+        return {
+            "url_field": "url",  # urls 为记录列表时URL所在的字段
+            "max_tabs": 5,  # 同时打开的标签页数量
+            "timeout": 30,  # 等待标签页加载完成的超时时间
+            "wait_ready_state": True,  # 执行子流程前等待 document.readyState 为 complete
+            "ignore_errors": False,  # 部分标签页失败时指令仍视为成功
+            "variable_name": None,  # 保存每个标签页的执行结果列表
+        }
+
+    def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
+        steps = parameters.get("steps")
+        if not isinstance(steps, list) or not steps:
+            return False
+        if not all(isinstance(step, dict) and step.get("type") for step in steps):
+            return False
+
+        urls = parameters.get("urls")
+        if not isinstance(urls, (list, str)):
+            return False
+
+        try:
+            return int(parameters.get("max_tabs", 5)) > 0
+        except (ValueError, TypeError):
+            return False
+
+    def _resolve_items(self, parameters: Dict[str, Any], context) -> List[Any]:
+        """urls 可以是URL列表、记录列表，或保存了这类列表的变量名"""
+        urls = parameters["urls"]
+        if isinstance(urls, str):
+            if not context.has_variable(urls):
+                raise ValueError(f"变量不存在: {urls}")
+            urls = context.get_variable(urls)
+        if not isinstance(urls, list):
+            raise ValueError("urls 必须是列表")
+        return urls
+
+    async def execute(self, parameters: Dict[str, Any], context) -> InstructionResult:
+        """执行多标签页并行"""
+        try:
+            driver = context.get_web_driver()
+            if not driver:
+                return InstructionResult(success=False, message="WebDriver未初始化")
+            if TabRouter.is_attached(driver):
+                return InstructionResult(
+                    success=False, message="不支持在标签页子流程中嵌套多标签页并行"
+                )
+
+            items = self._resolve_items(parameters, context)
+            url_field = parameters.get("url_field", "url")
+            urls = [
+                item.get(url_field) if isinstance(item, dict) else item
+                for item in items
+            ]
+            if any(not isinstance(url, str) or not url for url in urls):
+                return InstructionResult(success=False, message="存在无效的URL")
+            if not urls:
+                return InstructionResult(
+                    success=True, message="没有需要打开的URL", data={"results": []}
+                )
+
+            origin_handle = await context.run_blocking(
+                lambda: driver.current_window_handle
+            )
+            slots = asyncio.Semaphore(int(parameters.get("max_tabs", 5)))
+
+            router = TabRouter(driver)
+            router.attach()
+            try:
+                results = await asyncio.gather(
+                    *(
+                        self._run_tab(
+                            i,
+                            url,
+                            item,
+                            parameters,
+                            context,
+                            router,
+                            origin_handle,
+                            slots,
+                        )
+                        for i, (url, item) in enumerate(zip(urls, items))
+                    )
+                )
+            finally:
+                router.detach()
+            await context.run_blocking(driver.switch_to.window, origin_handle)
+
+            variable_name = parameters.get("variable_name")
+            if variable_name:
+                context.set_variable(variable_name, results)
+
+            if context.is_stop_requested():
+                return InstructionResult(success=False, message=INTERRUPTED_MESSAGE)
+
+            failed = sum(1 for result in results if not result["success"])
+            message = f"完成 {len(results)} 个标签页，失败 {failed} 个"
+            logger.info(message)
+            return InstructionResult(
+                success=failed == 0 or bool(parameters.get("ignore_errors")),
+                message=message,
+                data={"results": results, "failed": failed},
+            )
+
+        except Exception as e:
+            error_msg = f"多标签页执行失败: {e}"
+            logger.error(error_msg)
+            return InstructionResult(success=False, message=error_msg)
+
+    async def _run_tab(
+        self,
+        index: int,
+        url: str,
+        item: Any,
+        parameters: Dict[str, Any],
+        context,
+        router: TabRouter,
+        origin_handle: str,
+        slots: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        """在新标签页中打开URL并执行子流程，返回该标签页的结果"""
+        result = {"index": index, "url": url, "success": False, "message": ""}
+        async with slots:
+            if context.is_stop_requested():
+                result["message"] = INTERRUPTED_MESSAGE
+                return result
+
+            handle = None
+            tab_context = self._fork_tab_context(
+                context, router.driver, index, url, item
+            )
+            # 打开、等待和关闭标签页都在标签页子上下文中执行，耗时记录在该标签页的轨道上
+            try:
+                handle = await self._open_tab(tab_context, router, origin_handle, url)
+                tab_context.call_wrapper = functools.partial(router.bind, handle)
+                if parameters.get("wait_ready_state", True):
+                    await self._wait_tab_loaded(tab_context, router, handle, parameters)
+
+                success, message = await self._run_steps(
+                    parameters["steps"], tab_context
+                )
+                result["success"] = success
+                result["message"] = message
+            except Exception as e:
+                result["message"] = str(e)
+                logger.warning(f"标签页 {index+1} 执行失败: {url}, 错误: {e}")
+            finally:
+                if handle:
+                    await self._close_tab(tab_context, router, handle)
+                tab_context.web_driver = None
+                tab_context.close_http_client()
+
+            result["variables"] = {
+                name: value
+                for name, value in tab_context.variables.items()
+                if name not in context.variables or context.variables[name] is not value
+            }
+            return result
+
+    @staticmethod
+    def _fork_tab_context(context, driver, index: int, url: str, item: Any):
+        """创建标签页子上下文，变量独立，浏览器与父上下文共用，耗时计入当前步骤"""
+        tab_context = context.fork()
+        tab_context.variables = dict(context.variables)
+        tab_context.web_driver = driver
+        tab_context.current_step_index = context.current_step_index
+        tab_context.trace_track = f"{context.trace_track}/tab {index + 1}"
+        tab_context.set_variable("tab_index", index)
+        tab_context.set_variable("tab_url", url)
+        tab_context.set_variable("tab_item", item)
+        return tab_context
+
+    @staticmethod
+    async def _open_tab(
+        context, router: TabRouter, origin_handle: str, url: str
+    ) -> str:
+        """从原标签页用 window.open 打开标签页（不等待加载），返回新标签页句柄"""
+        driver = router.driver
+
+        def open_tab():
+            before = set(driver.window_handles)
+            driver.execute_script(OPEN_TAB_SCRIPT, url)
+            new_handles = [h for h in driver.window_handles if h not in before]
+            if not new_handles:
+                raise RuntimeError(f"打开标签页失败（可能被弹窗拦截）: {url}")
+            return new_handles[0]
+
+        # 前后两次读取窗口列表之间不能有其他标签页打开或关闭
+        return await context.run_blocking(
+            router.bind(origin_handle, open_tab, exclusive=True)
+        )
+
+    async def _wait_tab_loaded(
+        self, context, router: TabRouter, handle: str, parameters: Dict[str, Any]
+    ):
+        """轮询标签页加载状态，两次查询之间不占用浏览器"""
+        ready_state = router.bind(
+            handle,
+            lambda: router.driver.execute_script("return document.readyState"),
+        )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + float(parameters.get("timeout", 30))
+        while True:
+            state = await context.run_blocking(ready_state)
+            if state == "complete":
+                return
+            if loop.time() >= deadline:
+                raise TimeoutError("等待标签页加载超时")
+            if not await context.sleep(self.TAB_POLL_INTERVAL):
+                raise RuntimeError(INTERRUPTED_MESSAGE)
+
+    async def _run_steps(
+        self, steps: List[Dict[str, Any]], tab_context
+    ) -> Tuple[bool, str]:
+        """在标签页中逐步执行子流程"""
+        message = ""
+        for step in steps:
+            if tab_context.is_stop_requested():
+                return False, INTERRUPTED_MESSAGE
+
+            result = await self.engine.execute_instruction(
+                step["type"], dict(step.get("parameters", {})), tab_context
+            )
+
+            message = result.message
+            if not result.success and step.get("stop_on_error", True):
+                return False, message
+        return True, message
+
+    @staticmethod
+    async def _close_tab(context, router: TabRouter, handle: str):
+        """关闭标签页，失败时只记录日志"""
+        driver = router.driver
+
+        def close_tab():
+            if handle in driver.window_handles:
+                driver.close()
+
+        try:
+            await context.run_blocking(router.bind(handle, close_tab, exclusive=True))
+        except Exception as e:
+            logger.debug(f"关闭标签页失败: {e}")
@@ -4,16 +4,148 @@
 元素定位器
 """
 
+import functools
 import logging
-from typing import Optional, List, Union, Tuple
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, List, Union, Tuple
+from urllib.parse import urlsplit
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    WebDriverException,
+)
+
+try:
+    from selenium.common.exceptions import ScriptTimeoutException
+except ImportError:  # 新版selenium中异步脚本超时直接抛出TimeoutException
+    ScriptTimeoutException = TimeoutException
 
 logger = logging.getLogger(__name__)
 
+# 浏览器创建时设置的异步脚本超时（秒）。页面内等待由脚本自己按等待时间结束，
+# 这里只是兜底，等待时间超过它的等待改用轮询
+OBSERVER_SCRIPT_TIMEOUT = 600
+
+# 裸选择器判定脚本：一次往返内依次尝试ID、name和CSS，都未命中时返回null
+PROBE_STRATEGY_SCRIPT = """
+var s = arguments[0];
+if (document.getElementById(s)) { return 'id'; }
+if (document.getElementsByName(s).length) { return 'name'; }
+try { if (document.querySelector(s)) { return 'css'; } } catch (e) {}
+return null;
+"""
+
+# 等待引擎
+WAIT_ENGINE_POLLING = "polling"  # WebDriverWait轮询，每次检查一次远程调用
+WAIT_ENGINE_OBSERVER = "observer"  # 页面内MutationObserver监听，一次异步脚本调用
+
+# 页面内等待脚本：依次检查候选定位器，DOM变化时在下一帧重新检查，
+# 命中即通过回调返回 {index, element}，超时返回null
+OBSERVER_WAIT_SCRIPT = """
+var locators = arguments[0], condition = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+
+function byXPath(v) {
+    return document.evaluate(v, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function byLinkText(v, partial) {
+    var links = document.getElementsByTagName('a');
+    for (var i = 0; i < links.length; i++) {
+        var text = (links[i].innerText || '').trim();
+        if (partial ? text.indexOf(v) !== -1 : text === v) { return links[i]; }
+    }
+    return null;
+}
+function locate(strategy, v) {
+    try {
+        switch (strategy) {
+            case 'id': return document.getElementById(v);
+            case 'name': return document.getElementsByName(v)[0] || null;
+            case 'class name': return document.getElementsByClassName(v)[0] || null;
+            case 'tag name': return document.getElementsByTagName(v)[0] || null;
+            case 'xpath': return byXPath(v);
+            case 'css selector': return document.querySelector(v);
+            case 'link text': return byLinkText(v, false);
+            case 'partial link text': return byLinkText(v, true);
+            case 'auto':
+                return document.getElementById(v) ||
+                    document.getElementsByName(v)[0] || document.querySelector(v);
+        }
+    } catch (e) {}
+    return null;
+}
+function isVisible(el) {
+    var rect = el.getBoundingClientRect();
+    var style = window.getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 &&
+        style.visibility !== 'hidden' && style.display !== 'none';
+}
+function isReady(el) {
+    if (!el) { return false; }
+    if (condition === 'present') { return true; }
+    if (!isVisible(el)) { return false; }
+    return condition !== 'clickable' || !el.disabled;
+}
+function check() {
+    for (var i = 0; i < locators.length; i++) {
+        var el = locate(locators[i][0], locators[i][1]);
+        if (isReady(el)) { return {index: i, element: el}; }
+    }
+    return null;
+}
+
+var finished = false, observer = null, frame = null, interval = null, timer = null;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    if (frame) { cancelAnimationFrame(frame); }
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(result);
+}
+function schedule() {
+    if (frame || finished) { return; }
+    frame = requestAnimationFrame(function () {
+        frame = null;
+        var result = check();
+        if (result) { finish(result); }
+    });
+}
+
+var first = check();
+if (first) {
+    finish(first);
+} else {
+    observer = new MutationObserver(schedule);
+    observer.observe(document.documentElement || document,
+        {childList: true, subtree: true, attributes: true});
+    // 样式表或动画导致的可见性变化不会产生DOM变更，页面内低频兜底检查
+    interval = setInterval(function () {
+        var result = check();
+        if (result) { finish(result); }
+    }, 100);
+    timer = setTimeout(function () { finish(null); }, timeoutMs);
+}
+"""
+
+# 等待条件对应的轮询判定
+POLLING_CONDITIONS = {
+    "present": EC.presence_of_element_located,
+    "visible": EC.visibility_of_element_located,
+    "clickable": EC.element_to_be_clickable,
+}
+
+# 路径中的纯数字片段视为同一页面模板，如 /item/123 与 /item/456
+_NUMERIC_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)")
+
 
 class ElementLocator:
     """元素定位器"""
@@ -30,10 +162,38 @@ class ElementLocator:
         "partial_link_text": By.PARTIAL_LINK_TEXT,
     }
 
-    def __init__(self, driver, wait_timeout: int = 10):
+    # 探测结果映射
+    PROBE_RESULT_MAP = {"id": By.ID, "name": By.NAME, "css": By.CSS_SELECTOR}
+
+    # 裸选择器策略缓存: (页面URL模式, 选择器) -> By，所有定位器实例共享
+    STRATEGY_CACHE_SIZE = 1024
+    _strategy_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+    _strategy_cache_lock = threading.Lock()
+
+    def __init__(
+        self,
+        driver,
+        wait_timeout: int = 10,
+        wait_engine: str = WAIT_ENGINE_POLLING,
+        page_url: Optional[str] = None,
+        on_page_url: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Args:
+            driver: WebDriver实例
+            wait_timeout: 默认等待超时时间
+            wait_engine: 等待引擎
+            page_url: 当前页面URL，用于裸选择器策略缓存；不传时在首次需要时读取一次
+            on_page_url: 读取到页面URL后的回调，调用方可以记录下来供后续定位器使用
+        """
         self.driver = driver
         self.wait_timeout = wait_timeout
         self.wait = WebDriverWait(driver, wait_timeout)
+        self.wait_engine = wait_engine or WAIT_ENGINE_POLLING
+        self._page_url = page_url
+        self._on_page_url = on_page_url
+        # 最近一次等待命中的候选选择器
+        self.matched_selector: Optional[str] = None
 
     def parse_selector(self, selector: str) -> Tuple[By, str]:
         """
@@ -55,55 +215,214 @@ class ElementLocator:
 
         selector = selector.strip()
 
+        parsed = self._parse_explicit(selector)
+        if parsed:
+            return parsed
+
+        # 默认尝试ID，然后Name，最后CSS
+        return self._resolve_bare_selector(selector), selector
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def _parse_explicit(cls, selector: str) -> Optional[Tuple[By, str]]:
+        """解析带策略前缀或可直接判断类型的选择器，无法判断时返回None"""
         # 如果包含冒号，按格式解析
         if ":" in selector and not selector.startswith("//"):
             parts = selector.split(":", 1)
             if len(parts) == 2:
                 strategy, value = parts[0].strip().lower(), parts[1].strip()
-                if strategy in self.LOCATOR_MAP:
-                    return self.LOCATOR_MAP[strategy], value
+                if strategy in cls.LOCATOR_MAP:
+                    return cls.LOCATOR_MAP[strategy], value
 
         # 自动判断选择器类型
         if selector.startswith("//"):
             return By.XPATH, selector
-        elif selector.startswith("#"):
-            return By.CSS_SELECTOR, selector
-        elif selector.startswith("."):
-            return By.CSS_SELECTOR, selector
-        elif selector.startswith("["):
+        elif selector.startswith(("#", ".", "[")):
             return By.CSS_SELECTOR, selector
+        return None
+
+    def _resolve_bare_selector(self, selector: str) -> str:
+        """
+        判定裸选择器的定位策略
+
+        结果按（页面URL模式, 选择器）缓存；未命中时用一次脚本调用完成探测，
+        元素尚未出现时按CSS处理且不缓存，避免把临时结果固定下来。
+        页面URL由调用方传入（执行上下文在导航后记录）时缓存命中不访问浏览器；
+        未传入时读取一次并通过 on_page_url 交给调用方
+        """
+        if self._page_url is None:
+            self._page_url = self.driver.current_url or ""
+            if self._on_page_url:
+                self._on_page_url(self._page_url)
+        page_key = self._page_key(self._page_url)
+        cache_key = (page_key, selector)
+
+        with self._strategy_cache_lock:
+            by = self._strategy_cache.get(cache_key)
+            if by is not None:
+                self._strategy_cache.move_to_end(cache_key)
+                return by
+
+        result = self.driver.execute_script(PROBE_STRATEGY_SCRIPT, selector)
+        by = self.PROBE_RESULT_MAP.get(result)
+        if by is None:
+            return By.CSS_SELECTOR
+
+        with self._strategy_cache_lock:
+            self._strategy_cache[cache_key] = by
+            if len(self._strategy_cache) > self.STRATEGY_CACHE_SIZE:
+                self._strategy_cache.popitem(last=False)
+        logger.debug(f"选择器策略已缓存: {selector} -> {by} ({page_key})")
+        return by
+
+    @staticmethod
+    def _page_key(url: str) -> str:
+        """把页面URL归一化为模式：去掉查询参数和锚点，数字路径片段替换为*"""
+        parts = urlsplit(url or "")
+        path = _NUMERIC_SEGMENT.sub("*", parts.path)
+        return f"{parts.scheme}://{parts.netloc}{path}"
+
+    def _to_script_locator(self, selector: str) -> List[str]:
+        """转换为页面内等待脚本使用的 [策略, 值]，裸选择器交给脚本自行判定"""
+        selector = selector.strip()
+        parsed = self._parse_explicit(selector)
+        if parsed:
+            return [parsed[0], parsed[1]]
+        return ["auto", selector]
+
+    @staticmethod
+    def as_selector_list(selector: Union[str, List[str]]) -> List[str]:
+        """把单个选择器或候选列表统一为去空后的列表"""
+        if isinstance(selector, str):
+            selectors = [selector]
         else:
-            # 默认尝试ID，然后Name，最后CSS
+            selectors = list(selector or [])
+        return [s.strip() for s in selectors if isinstance(s, str) and s.strip()]
+
+    @staticmethod
+    def selectors_from_capture(element_data: dict) -> List[str]:
+        """
+        从捕获的元素数据生成按优先级排列的候选选择器
+
+        Args:
+            element_data: 插件捕获的元素信息（id、cssSelector、xpath、attributes）
+
+        Returns:
+            List[str]: 带策略前缀的候选选择器
+        """
+        attributes = element_data.get("attributes") or {}
+        candidates = [
+            ("id", element_data.get("id") or attributes.get("id")),
+            ("css", element_data.get("cssSelector")),
+            ("xpath", element_data.get("xpath")),
+            ("name", element_data.get("name") or attributes.get("name")),
+        ]
+
+        selectors = []
+        for strategy, value in candidates:
+            if value and f"{strategy}:{value}" not in selectors:
+                selectors.append(f"{strategy}:{value}")
+        return selectors
+
+    def _wait_until(
+        self, selector: Union[str, List[str]], condition: str, timeout: float
+    ) -> Optional[WebElement]:
+        """
+        按当前等待引擎等待元素满足条件，超时抛出TimeoutException
+
+        多个候选选择器总是在一次页面内脚本中同时判定，按列表顺序取第一个命中的，
+        命中的选择器记录在 matched_selector 中
+        """
+        selectors = self.as_selector_list(selector)
+        if not selectors:
+            raise ValueError("选择器不能为空")
+        self.matched_selector = None
+
+        use_observer = self.wait_engine == WAIT_ENGINE_OBSERVER or len(selectors) > 1
+        if use_observer and timeout < OBSERVER_SCRIPT_TIMEOUT:
             try:
-                self.driver.find_element(By.ID, selector)
-                return By.ID, selector
-            except NoSuchElementException:
-                try:
-                    self.driver.find_element(By.NAME, selector)
-                    return By.NAME, selector
-                except NoSuchElementException:
-                    return By.CSS_SELECTOR, selector
+                return self._wait_in_page(selectors, condition, timeout)
+            except TimeoutException:
+                raise
+            except WebDriverException as e:
+                # 页面跳转等情况会中断异步脚本，退回轮询等待
+                logger.debug(f"页面内等待失败，改用轮询: {selectors}, 错误: {e}")
+
+        conditions = [
+            self._recording_condition(
+                s, POLLING_CONDITIONS[condition](self.parse_selector(s))
+            )
+            for s in selectors
+        ]
+        if len(conditions) == 1:
+            return WebDriverWait(self.driver, timeout).until(conditions[0])
+        return WebDriverWait(self.driver, timeout).until(EC.any_of(*conditions))
+
+    def _recording_condition(self, selector: str, condition):
+        """包装等待条件，满足时记录命中的选择器"""
+
+        def check(driver):
+            result = condition(driver)
+            if result:
+                self.matched_selector = selector
+            return result
+
+        return check
+
+    def _wait_in_page(
+        self, selectors: List[str], condition: str, timeout: float
+    ) -> WebElement:
+        """
+        在页面内用MutationObserver等待候选元素之一满足条件
+
+        整个等待只有一次异步脚本调用，元素已存在时也只需这一次往返。
+        异步脚本超时在浏览器创建时设置一次（OBSERVER_SCRIPT_TIMEOUT），这里不再读取或修改
+
+        Args:
+            selectors: 候选选择器，按优先级排列
+            condition: present / visible / clickable
+            timeout: 超时时间（秒）
+
+        Returns:
+            WebElement: 第一个满足条件的元素
+        """
+        locators = [self._to_script_locator(selector) for selector in selectors]
+        try:
+            result = self.driver.execute_async_script(
+                OBSERVER_WAIT_SCRIPT, locators, condition, int(timeout * 1000)
+            )
+        except ScriptTimeoutException:
+            # 脚本超时即等待超时，不再退回轮询重新等待一遍
+            raise TimeoutException(f"等待元素超时: {selectors}")
+        if not result:
+            raise TimeoutException(f"等待元素超时: {selectors}")
+        self.matched_selector = selectors[result["index"]]
+        if result["index"] > 0:
+            logger.info(f"使用候选选择器命中元素: {selectors[result['index']]}")
+        return result["element"]
+
+    @classmethod
+    def clear_strategy_cache(cls):
+        """清空选择器策略缓存"""
+        with cls._strategy_cache_lock:
+            cls._strategy_cache.clear()
 
     def find_element(
-        self, selector: str, timeout: Optional[int] = None
+        self, selector: Union[str, List[str]], timeout: Optional[int] = None
     ) -> Optional[WebElement]:
         """
         查找单个元素
 
         Args:
-            selector: 元素选择器
+            selector: 元素选择器，或按优先级排列的候选选择器列表
             timeout: 等待超时时间
 
         Returns:
             WebElement: 找到的元素，未找到返回None
         """
         try:
-            by, value = self.parse_selector(selector)
             wait_time = timeout if timeout is not None else self.wait_timeout
-
-            element = WebDriverWait(self.driver, wait_time).until(
-                EC.presence_of_element_located((by, value))
-            )
+            element = self._wait_until(selector, "present", wait_time)
 
             logger.debug(f"找到元素: {selector}")
             return element
@@ -149,16 +468,12 @@ class ElementLocator:
             return []
 
     def wait_for_element_clickable(
-        self, selector: str, timeout: Optional[int] = None
+        self, selector: Union[str, List[str]], timeout: Optional[int] = None
     ) -> Optional[WebElement]:
         """等待元素可点击"""
         try:
-            by, value = self.parse_selector(selector)
             wait_time = timeout if timeout is not None else self.wait_timeout
-
-            element = WebDriverWait(self.driver, wait_time).until(
-                EC.element_to_be_clickable((by, value))
-            )
+            element = self._wait_until(selector, "clickable", wait_time)
 
             logger.debug(f"元素可点击: {selector}")
             return element
@@ -171,16 +486,12 @@ class ElementLocator:
             return None
 
     def wait_for_element_visible(
-        self, selector: str, timeout: Optional[int] = None
+        self, selector: Union[str, List[str]], timeout: Optional[int] = None
     ) -> Optional[WebElement]:
         """等待元素可见"""
         try:
-            by, value = self.parse_selector(selector)
             wait_time = timeout if timeout is not None else self.wait_timeout
-
-            element = WebDriverWait(self.driver, wait_time).until(
-                EC.visibility_of_element_located((by, value))
-            )
+            element = self._wait_until(selector, "visible", wait_time)
 
             logger.debug(f"元素可见: {selector}")
             return element
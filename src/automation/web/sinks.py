@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据输出
+"""
+
+import csv
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RecordSink(ABC):
+    """记录输出基类，逐条写入并及时落盘"""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.append = append
+        self.count = 0
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]):
+        """写入一条记录"""
+        pass
+
+    def write_many(self, records: List[Dict[str, Any]]):
+        """写入多条记录"""
+        for record in records:
+            self.write(record)
+        self.flush()
+
+    def flush(self):
+        """刷新缓冲区"""
+
+    def close(self):
+        """关闭输出"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlSink(RecordSink):
+    """JSON Lines输出，每行一条记录"""
+
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path, append)
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class CsvSink(RecordSink):
+    """
+    CSV输出，表头取自第一条记录，之后出现的新字段会被忽略
+
+    追加到已有文件时沿用文件原有的表头，记录中有表头之外的字段时报错，避免列错位
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path, append)
+        self._existing_header: Optional[List[str]] = None
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._existing_header = self._read_header(path)
+        self._file = open(
+            path, "a" if append else "w", encoding="utf-8-sig", newline=""
+        )
+        self._writer: Optional[csv.DictWriter] = None
+
+    @staticmethod
+    def _read_header(path: str) -> List[str]:
+        """读取已有文件的表头"""
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return next(csv.reader(f), [])
+
+    def write(self, record: Dict[str, Any]):
+        if self._writer is None:
+            if self._existing_header is not None:
+                extra = [key for key in record if key not in self._existing_header]
+                if extra:
+                    raise ValueError(
+                        f"记录字段与已有CSV表头不一致: {', '.join(map(str, extra))}，"
+                        f"表头: {', '.join(self._existing_header)}"
+                    )
+                self._writer = csv.DictWriter(
+                    self._file, fieldnames=self._existing_header, extrasaction="ignore"
+                )
+            else:
+                self._writer = csv.DictWriter(
+                    self._file, fieldnames=list(record.keys()), extrasaction="ignore"
+                )
+                self._writer.writeheader()
+        self._writer.writerow(record)
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+# 输出格式映射
+SINK_TYPES = {"jsonl": JsonlSink, "csv": CsvSink}
+
+
+def create_sink(
+    path: str, output_format: Optional[str] = None, append: bool = False
+) -> RecordSink:
+    """
+    按格式创建输出
+
+    Args:
+        path: 输出文件路径
+        output_format: jsonl 或 csv，默认按扩展名判断
+        append: 是否追加到已有文件
+
+    Returns:
+        RecordSink: 输出实例
+
+    Raises:
+        ValueError: 不支持的输出格式；逐条写入的JSON Lines不能写到 .json 文件
+    """
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if not output_format:
+        output_format = extension or "jsonl"
+    output_format = output_format.lower()
+    if output_format == "json" or (output_format == "jsonl" and extension == "json"):
+        raise ValueError(f"逐页输出为JSON Lines格式，请使用 .jsonl 扩展名: {path}")
+
+    sink_type = SINK_TYPES.get(output_format)
+    if not sink_type:
+        raise ValueError(f"不支持的输出格式: {output_format}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    return sink_type(path, append=append)
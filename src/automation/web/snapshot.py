@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面DOM快照
+
+读取一次 page_source 后在本地解析，只读的提取步骤直接查询快照，
+不再逐个元素远程调用浏览器。
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from .extraction import normalize_fields
+from .locators import ElementLocator
+
+try:
+    import lxml.html
+
+    HTML_PARSER = "lxml"
+except ImportError:  # lxml 为可选依赖，缺失时使用标准库解析器，且不支持XPath
+    lxml = None
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+# 取值时按DOM属性返回完整URL的HTML属性，与WebElement.get_attribute一致
+URL_ATTRIBUTES = {"href", "src", "action"}
+
+# 视为元素文本的属性名
+TEXT_ATTRIBUTES = {"innerText", "textContent", "text"}
+
+
+class SnapshotUnsupportedError(ValueError):
+    """快照无法处理该选择器（如缺少lxml时的XPath），应改用实时浏览器"""
+
+
+class DomSnapshot:
+    """
+    页面DOM快照
+
+    支持与 ElementLocator 相同的选择器写法；XPath需要安装lxml。
+    文本取自解析后的节点文本（空白折叠），不区分元素是否可见。
+    """
+
+    def __init__(
+        self, html: str, url: Optional[str] = None, from_browser: bool = False
+    ):
+        self.url = url
+        self.html = html
+        # 快照是否读取自当前浏览器页面；HTTP获取的快照与浏览器中的页面无关
+        self.from_browser = from_browser
+        self.soup = BeautifulSoup(html, HTML_PARSER)
+        self._lxml_root = None
+
+    @classmethod
+    def from_driver(cls, driver) -> "DomSnapshot":
+        """读取当前页面源码创建快照"""
+        return cls(driver.page_source, driver.current_url, from_browser=True)
+
+    def _xpath_root(self):
+        """XPath查询用的lxml文档树，首次使用时解析"""
+        if lxml is None:
+            raise SnapshotUnsupportedError("快照模式的XPath选择器需要安装lxml")
+        if self._lxml_root is None:
+            self._lxml_root = lxml.html.fromstring(self.html)
+        return self._lxml_root
+
+    @property
+    def title(self) -> str:
+        """页面标题"""
+        return self.text_of(self.soup.title) if self.soup.title else ""
+
+    def select(self, selector: str, limit: int = 0) -> List[Any]:
+        """
+        查找所有匹配的节点
+
+        Args:
+            selector: 元素选择器
+            limit: 最大数量，0表示不限
+
+        Returns:
+            List[Any]: 匹配的节点
+        """
+        selector = selector.strip()
+        if not selector:
+            raise ValueError("选择器不能为空")
+
+        parsed = ElementLocator._parse_explicit(selector)
+        if parsed:
+            strategy, value = parsed
+        else:
+            strategy, value = self._resolve_bare_selector(selector), selector
+
+        nodes = self._select_by(strategy, value)
+        return nodes[:limit] if limit > 0 else nodes
+
+    def select_one(self, selector: Union[str, List[str]]) -> Optional[Any]:
+        """查找第一个匹配的节点，候选选择器列表按顺序尝试"""
+        for candidate in ElementLocator.as_selector_list(selector):
+            nodes = self.select(candidate, limit=1)
+            if nodes:
+                return nodes[0]
+        return None
+
+    def _resolve_bare_selector(self, selector: str) -> str:
+        """与页面内探测一致：依次按ID、Name判断，否则按CSS处理"""
+        if self.soup.find(id=selector):
+            return "id"
+        if self.soup.find(attrs={"name": selector}):
+            return "name"
+        return "css selector"
+
+    def _select_by(self, strategy: str, value: str) -> List[Any]:
+        """按定位策略查找节点"""
+        soup = self.soup
+        if strategy == "xpath":
+            return [
+                node for node in self._xpath_root().xpath(value) if hasattr(node, "tag")
+            ]
+        if strategy == "id":
+            node = soup.find(id=value)
+            return [node] if node else []
+        if strategy == "name":
+            return soup.find_all(attrs={"name": value})
+        if strategy == "class name":
+            return soup.find_all(class_=value)
+        if strategy == "tag name":
+            return soup.find_all(value)
+        if strategy == "link text":
+            return [a for a in soup.find_all("a") if self.text_of(a) == value]
+        if strategy == "partial link text":
+            return [a for a in soup.find_all("a") if value in self.text_of(a)]
+
+        try:
+            return soup.select(value)
+        except Exception as e:
+            logger.debug(f"快照CSS选择器无效: {value}, 错误: {e}")
+            return []
+
+    @staticmethod
+    def _select_within(node, selector: str) -> Optional[Any]:
+        """在节点内按CSS选择器查找第一个子节点"""
+        if isinstance(node, Tag):
+            try:
+                return node.select_one(selector)
+            except Exception:
+                return None
+        try:
+            matches = node.cssselect(selector)
+        except ImportError:
+            raise SnapshotUnsupportedError("XPath行元素的子选择器需要安装cssselect")
+        return matches[0] if matches else None
+
+    @staticmethod
+    def text_of(node) -> str:
+        """节点文本，连续空白折叠为一个空格"""
+        if isinstance(node, Tag):
+            text = node.get_text(" ")
+        else:
+            text = node.text_content()
+        return " ".join(text.split())
+
+    def attribute_of(self, node, attribute: str) -> Optional[str]:
+        """节点属性值，链接类属性按页面URL补全"""
+        if attribute in TEXT_ATTRIBUTES:
+            return self.text_of(node)
+
+        value = node.get(attribute)
+        if isinstance(value, list):
+            value = " ".join(value)
+        if value is not None and attribute in URL_ATTRIBUTES and self.url:
+            value = urljoin(self.url, value)
+        return value
+
+    def read(self, node, attribute: Optional[str] = None) -> Optional[str]:
+        """读取节点文本或属性"""
+        if node is None:
+            return None
+        if attribute:
+            return self.attribute_of(node, attribute)
+        return self.text_of(node)
+
+    def extract_records(
+        self, row_selector: str, fields: Dict[str, Any], limit: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        提取所有行的字段，规则同 extraction.extract_records
+
+        Args:
+            row_selector: 行元素选择器
+            fields: 字段映射，见 normalize_fields
+            limit: 最大行数，0表示不限
+
+        Returns:
+            List[Dict[str, Any]]: 每行一条记录
+        """
+        normalized = normalize_fields(fields)
+        records = []
+        for row in self.select(row_selector, int(limit or 0)):
+            record = {}
+            for name, selector, attribute in normalized:
+                target = self._select_within(row, selector) if selector else row
+                record[name] = self.read(target, attribute)
+            records.append(record)
+        return records
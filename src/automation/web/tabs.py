@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标签页命令路由
+
+多个标签页共用一个浏览器会话时，WebDriver命令总是作用于当前窗口。路由器接管驱动实例的
+execute 方法：绑定了标签页的线程发出的每条命令，先切换到该标签页再执行，切换和命令在同一把锁内
+完成。锁只在单条命令期间持有，各标签页的定位等待、滚动后的等待等可以交替进行。
+
+注意：切换标签页会回到页面的顶层文档，子流程中切换进iframe的状态不会跨命令保留。
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from selenium.webdriver.remote.command import Command
+
+logger = logging.getLogger(__name__)
+
+OPEN_TAB_SCRIPT = "window.open(arguments[0], '_blank');"
+
+# 执行后当前窗口不再确定的命令
+WINDOW_CHANGING_COMMANDS = {Command.CLOSE, Command.NEW_WINDOW, Command.QUIT}
+
+
+class TabRouter:
+    """
+    把WebDriver命令路由到标签页
+
+    attach 后驱动的所有命令都经过路由器串行执行；bind 返回的函数在调用线程上绑定标签页，
+    其中发出的命令（包括元素操作和等待中的每次轮询）都在该标签页中执行。
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._execute = driver.execute
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._current_handle: Optional[str] = None
+
+    @staticmethod
+    def is_attached(driver) -> bool:
+        """驱动是否已被路由器接管"""
+        return "execute" in vars(driver)
+
+    def attach(self):
+        """接管驱动的 execute 方法"""
+        self.driver.execute = self._route
+
+    def detach(self):
+        """恢复驱动原来的 execute 方法"""
+        if vars(self.driver).get("execute") == self._route:
+            del self.driver.execute
+
+    def bind(
+        self, handle: str, func: Callable, exclusive: bool = False
+    ) -> Callable[..., Any]:
+        """
+        返回在标签页中执行 func 的函数
+
+        Args:
+            handle: 标签页句柄
+            func: 同步函数，其中的WebDriver命令都发往该标签页
+            exclusive: 整个函数执行期间独占浏览器（如需要前后两次读取窗口列表的操作）
+        """
+
+        def call(*args, **kwargs):
+            previous = getattr(self._local, "handle", None)
+            self._local.handle = handle
+            try:
+                if exclusive:
+                    with self._lock:
+                        return func(*args, **kwargs)
+                return func(*args, **kwargs)
+            finally:
+                self._local.handle = previous
+
+        return call
+
+    def _route(self, driver_command: str, params: Optional[Dict[str, Any]] = None):
+        handle = getattr(self._local, "handle", None)
+        with self._lock:
+            if (
+                handle
+                and handle != self._current_handle
+                and driver_command != Command.SWITCH_TO_WINDOW
+            ):
+                self._switch(handle)
+            try:
+                result = self._execute(driver_command, params)
+            except Exception:
+                if driver_command == Command.SWITCH_TO_WINDOW:
+                    self._current_handle = None
+                raise
+            if driver_command == Command.SWITCH_TO_WINDOW:
+                self._current_handle = (params or {}).get("handle")
+            elif driver_command in WINDOW_CHANGING_COMMANDS:
+                self._current_handle = None
+            return result
+
+    def _switch(self, handle: str):
+        """切换到标签页（调用方持有锁）"""
+        self._current_handle = None
+        self._execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+        self._current_handle = handle
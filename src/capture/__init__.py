@@ -0,0 +1,8 @@
+"""
+元素捕获模块
+"""
+
+from .hub import CaptureEvent, CaptureHub
+from .segment_log import CaptureSegmentLog
+from .store import CaptureStore, StoredCapture
+from .watcher import CaptureFileWatcher
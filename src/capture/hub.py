@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元素捕获事件中心
+
+HTTP服务器收到浏览器插件发来的元素后发布到事件中心，等待捕获的对话框通过订阅回调、
+外部程序通过长轮询或SSE接口立即拿到结果，不再定时扫描磁盘。
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 内存中保留的最近捕获事件数量
+DEFAULT_HISTORY_SIZE = 100
+
+
+@dataclass
+class CaptureEvent:
+    """一次元素捕获"""
+
+    # 递增序号，等待方据此判断是否有新的捕获
+    seq: int
+    element: Dict[str, Any]
+    received_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "received_at": self.received_at,
+            "element": self.element,
+        }
+
+
+class CaptureHub:
+    """
+    捕获事件中心
+
+    线程安全：publish 可以在任意线程调用，订阅回调在发布线程中执行，
+    GUI中应通过Qt信号转到主线程处理。批量到达的捕获用 publish_many 发布，
+    每个元素都进入历史记录，订阅者只收到一次通知。
+    """
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
+        self._condition = threading.Condition()
+        self._events: deque = deque(maxlen=history_size)
+        self._seq = 0
+        self._closed = False
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+
+    @property
+    def last_seq(self) -> int:
+        """最近一次捕获的序号，没有捕获时为0"""
+        with self._condition:
+            return self._seq
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, element: Dict[str, Any]) -> CaptureEvent:
+        """
+        发布捕获的元素，唤醒所有等待方并通知订阅者
+
+        Returns:
+            CaptureEvent: 捕获事件
+        """
+        with self._condition:
+            self._seq += 1
+            event = CaptureEvent(seq=self._seq, element=element)
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+            self._condition.notify_all()
+
+        for callback in subscribers:
+            try:
+                callback(element)
+            except Exception as e:
+                logger.error(f"捕获事件回调失败: {e}")
+        return event
+
+    def publish_many(self, elements: List[Dict[str, Any]]) -> List[CaptureEvent]:
+        """
+        批量发布捕获的元素
+
+        所有元素按顺序进入历史记录，长轮询和SSE等待方能逐个读到；订阅者只以最后一个元素
+        调用一次，避免逐个回调占满界面线程
+
+        Returns:
+            List[CaptureEvent]: 捕获事件，elements 为空时为空列表
+        """
+        if not elements:
+            return []
+
+        with self._condition:
+            events = []
+            for element in elements:
+                self._seq += 1
+                event = CaptureEvent(seq=self._seq, element=element)
+                self._events.append(event)
+                events.append(event)
+            subscribers = list(self._subscribers)
+            self._condition.notify_all()
+
+        for callback in subscribers:
+            try:
+                callback(elements[-1])
+            except Exception as e:
+                logger.error(f"捕获事件回调失败: {e}")
+        return events
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """订阅捕获事件，每次发布时以元素信息调用回调"""
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """取消订阅"""
+        with self._condition:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[CaptureEvent]:
+        """
+        最近一次捕获
+
+        Args:
+            max_age: 最大时效（秒），超过时返回None
+        """
+        with self._condition:
+            if not self._events:
+                return None
+            event = self._events[-1]
+        if max_age is not None and time.time() - event.received_at > max_age:
+            return None
+        return event
+
+    def events_since(self, after_seq: int) -> List[CaptureEvent]:
+        """序号大于 after_seq 的捕获事件（仅限内存中保留的部分）"""
+        with self._condition:
+            return [event for event in self._events if event.seq > after_seq]
+
+    def wait_for(
+        self, after_seq: int = 0, timeout: Optional[float] = None
+    ) -> Optional[CaptureEvent]:
+        """
+        等待序号大于 after_seq 的捕获
+
+        Args:
+            after_seq: 等待方已经处理过的序号
+            timeout: 超时时间（秒），None表示一直等待
+
+        Returns:
+            Optional[CaptureEvent]: 第一个新的捕获事件；超时或事件中心已关闭时返回None
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._seq > after_seq or self._closed, timeout
+            ):
+                return None
+            for event in self._events:
+                if event.seq > after_seq:
+                    return event
+            return None
+
+    def close(self):
+        """关闭事件中心，唤醒所有等待方"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+捕获元素分段日志
+
+每次保存只向当前分段文件（captures-000001.jsonl）追加一行JSON，并原子替换
+latest_element.json；分段达到大小上限后切换到下一个分段，分段数量过多时合并去重，
+目录中的文件数量和总大小保持有界。
+"""
+
+import glob
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "captures-"
+SEGMENT_SUFFIX = ".jsonl"
+SEGMENT_PATTERN = re.compile(r"^captures-(\d+)\.jsonl$")
+
+# 最新元素文件，内容为最近一次保存的元素
+LATEST_FILE_NAME = "latest_element.json"
+
+# 旧版本为每次保存单独写的文件，合并时并入日志并删除
+LEGACY_FILE_PATTERN = "element_*.json"
+
+# 单个分段的大小上限（字节）
+DEFAULT_MAX_SEGMENT_BYTES = 1024 * 1024
+
+# 已写满的分段超过此数量时自动合并
+DEFAULT_MAX_SEGMENTS = 8
+
+# 合并后保留的最近记录数量
+DEFAULT_MAX_RECORDS = 2000
+
+
+def is_segment_file(path: str) -> bool:
+    """是否为分段日志文件"""
+    return bool(SEGMENT_PATTERN.match(os.path.basename(path)))
+
+
+def segment_name(number: int) -> str:
+    return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+
+def read_segment_lines(path: str, offset: int = 0) -> Tuple[List[Any], int]:
+    """
+    从 offset 处读取分段中完整的记录行
+
+    最后一行尚未写完（没有换行符）时不读取，无法解析的行跳过
+
+    Returns:
+        Tuple[List[Any], int]: 记录列表和下次读取的起始位置
+    """
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line.decode("utf-8")))
+        except (UnicodeDecodeError, ValueError):
+            logger.debug(f"跳过无法解析的记录: {path}")
+    return records, offset + end
+
+
+def _atomic_write_json(path: str, data: Any):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+class CaptureSegmentLog:
+    """
+    分段日志
+
+    文件句柄在两次保存之间保持打开，每次保存是一次缓冲写入加一次flush，
+    其他进程（如RPA应用的文件监视器）可以按偏移量增量读取新写入的行。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        max_records: int = DEFAULT_MAX_RECORDS,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._number = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def latest_path(self) -> str:
+        return os.path.join(self.directory, LATEST_FILE_NAME)
+
+    def segment_numbers(self) -> List[int]:
+        """现有分段的编号，从旧到新排列"""
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, segment_name(number))
+
+    def _open_segment(self, number: int):
+        """打开分段用于追加；上次异常退出留下的半行先用换行符结束"""
+        path = self.segment_path(number)
+        self._file = open(path, "a", encoding="utf-8")
+        self._number = number
+        self._size = self._file.tell()
+        if self._size:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+                    self._size += 1
+
+    def _close_segment(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def append(self, element: Dict[str, Any]) -> str:
+        """
+        保存一个元素：追加到当前分段并更新最新元素文件
+
+        Returns:
+            str: 写入的分段文件路径
+        """
+        line = json.dumps(element, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                numbers = self.segment_numbers()
+                self._open_segment(numbers[-1] if numbers else 1)
+            elif self._size >= self.max_segment_bytes:
+                self._rotate()
+
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line.encode("utf-8"))
+            path = self._file.name
+
+            _atomic_write_json(self.latest_path, element)
+        return path
+
+    def _rotate(self):
+        """切换到新的分段，已写满的分段过多时合并（调用方持有锁）"""
+        self._close_segment()
+        self._open_segment(self._number + 1)
+        logger.debug(f"切换到新的分段: {segment_name(self._number)}")
+
+        closed = [n for n in self.segment_numbers() if n < self._number]
+        if len(closed) > self.max_segments:
+            self._compact(closed)
+
+    def read_all(self) -> Iterator[Any]:
+        """按写入顺序读取所有记录"""
+        for number in self.segment_numbers():
+            records, _ = read_segment_lines(self.segment_path(number))
+            yield from records
+
+    def compact(self) -> int:
+        """
+        合并已写满的分段，并把旧版本的 element_*.json 文件并入日志
+
+        Returns:
+            int: 合并后保留的记录数量
+        """
+        with self._lock:
+            numbers = self.segment_numbers()
+            if self._file is not None:
+                numbers = [n for n in numbers if n < self._number]
+            return self._compact(numbers, include_legacy=True)
+
+    def _compact(self, numbers: List[int], include_legacy: bool = False) -> int:
+        """
+        把指定分段合并为一个分段（调用方持有锁）
+
+        合并后的分段使用最早分段的编号，按内容去重并只保留最近的 max_records 条记录，
+        先写临时文件再原子替换，中途失败不会丢失原有分段
+        """
+        legacy_files = []
+        if include_legacy:
+            legacy_files = sorted(
+                glob.glob(os.path.join(self.directory, LEGACY_FILE_PATTERN)),
+                key=os.path.getmtime,
+            )
+        if not numbers and not legacy_files:
+            return 0
+        if not numbers:
+            # 没有可合并的已写满分段时，旧文件并入编号0的分段，排在所有分段之前
+            numbers = [0]
+
+        records = []
+        for path in legacy_files:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.debug(f"读取旧的元素文件失败: {path}, 错误: {e}")
+        for number in numbers:
+            path = self.segment_path(number)
+            if os.path.exists(path):
+                records.extend(read_segment_lines(path)[0])
+
+        # 按内容去重，保留最后一次出现的位置
+        unique: Dict[str, Any] = {}
+        for record in records:
+            key = json.dumps(record, ensure_ascii=False, sort_keys=True)
+            unique.pop(key, None)
+            unique[key] = record
+        kept = list(unique.values())
+        if self.max_records:
+            kept = kept[-self.max_records :]
+
+        target = self.segment_path(numbers[0])
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in kept:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+        os.replace(tmp_path, target)
+
+        for number in numbers[1:]:
+            os.remove(self.segment_path(number))
+        for path in legacy_files:
+            os.remove(path)
+
+        logger.info(
+            f"合并 {len(numbers)} 个分段和 {len(legacy_files)} 个旧文件，"
+            f"保留 {len(kept)} 条记录"
+        )
+        return len(kept)
+
+    def close(self):
+        """关闭当前分段"""
+        with self._lock:
+            self._close_segment()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元素捕获记录库
+
+所有来源（HTTP接口、导出文件）的捕获元素都写入同一个SQLite库，按捕获时间和页面URL建立索引，
+查询最近一次捕获或某个页面的捕获历史只走索引，不再扫描下载目录和Chrome存储。
+同一个捕获从多个渠道到达时按内容指纹去重。
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认库文件位置（相对当前工作目录）
+DEFAULT_STORE_PATH = os.path.join("captured_elements", "captures.db")
+
+# 默认保留的记录数量，超出后删除最早的记录
+DEFAULT_MAX_RECORDS = 10000
+
+# 每新增多少条记录检查一次是否需要清理
+PRUNE_INTERVAL = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint TEXT NOT NULL UNIQUE,
+    captured_at REAL NOT NULL,
+    received_at REAL NOT NULL,
+    url TEXT,
+    tag_name TEXT,
+    source TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_captures_captured_at ON captures (captured_at);
+CREATE INDEX IF NOT EXISTS idx_captures_url ON captures (url, captured_at);
+"""
+
+
+def element_fingerprint(element: Dict[str, Any]) -> str:
+    """元素内容的指纹（插件为每次捕获记录了时间戳，同一次捕获的指纹相同）"""
+    content = json.dumps(element, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def element_capture_time(element: Dict[str, Any]) -> Optional[float]:
+    """
+    解析元素的捕获时间
+
+    timestamp 可以是ISO格式字符串，或秒/毫秒时间戳，无法解析时返回None
+    """
+    timestamp = element.get("timestamp")
+    if not timestamp:
+        return None
+    try:
+        if isinstance(timestamp, str):
+            try:
+                value = float(timestamp)
+            except ValueError:
+                dt = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+                return dt.timestamp()
+        else:
+            value = float(timestamp)
+    except (TypeError, ValueError):
+        return None
+    # 毫秒时间戳
+    return value / 1000 if value > 1e11 else value
+
+
+@dataclass
+class StoredCapture:
+    """库中的一条捕获记录"""
+
+    id: int
+    element: Dict[str, Any]
+    captured_at: float
+    received_at: float
+    url: Optional[str] = None
+    source: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "captured_at": self.captured_at,
+            "received_at": self.received_at,
+            "url": self.url,
+            "source": self.source,
+            "element": self.element,
+        }
+
+
+class CaptureStore:
+    """
+    捕获记录库
+
+    连接在多个线程（HTTP请求线程、文件监视线程、GUI线程）之间共用，访问由锁串行化。
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STORE_PATH,
+        max_records: int = DEFAULT_MAX_RECORDS,
+    ):
+        self.path = path
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self._added_since_prune = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def add(self, element: Dict[str, Any], source: str = "http") -> Optional[int]:
+        """
+        写入捕获的元素
+
+        Args:
+            element: 元素信息
+            source: 来源，如 http、file
+
+        Returns:
+            Optional[int]: 记录id；库中已有相同的捕获时返回None
+        """
+        return self.add_many([element], source)[0]
+
+    def add_many(
+        self, elements: List[Dict[str, Any]], source: str = "http"
+    ) -> List[Optional[int]]:
+        """
+        在一个事务中写入多个捕获的元素
+
+        Returns:
+            List[Optional[int]]: 与输入顺序对应的记录id，已存在的捕获为None
+        """
+        received_at = time.time()
+        rows = [
+            (
+                element_fingerprint(element),
+                element_capture_time(element) or received_at,
+                received_at,
+                element.get("url"),
+                element.get("tagName"),
+                source,
+                json.dumps(element, ensure_ascii=False, default=str),
+            )
+            for element in elements
+        ]
+
+        record_ids: List[Optional[int]] = []
+        with self._lock:
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO captures "
+                    "(fingerprint, captured_at, received_at, url, tag_name, source, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                record_ids.append(cursor.lastrowid if cursor.rowcount else None)
+            self._conn.commit()
+
+            added = sum(1 for record_id in record_ids if record_id is not None)
+            self._added_since_prune += added
+            if self.max_records and self._added_since_prune >= PRUNE_INTERVAL:
+                self._prune()
+                self._added_since_prune = 0
+
+        logger.debug(f"已保存 {added}/{len(rows)} 条捕获记录")
+        return record_ids
+
+    def _prune(self):
+        """删除超出保留数量的最早记录（调用方持有锁）"""
+        self._conn.execute(
+            "DELETE FROM captures WHERE id NOT IN "
+            "(SELECT id FROM captures ORDER BY captured_at DESC LIMIT ?)",
+            (self.max_records,),
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _to_capture(row: sqlite3.Row) -> StoredCapture:
+        return StoredCapture(
+            id=row["id"],
+            element=json.loads(row["data"]),
+            captured_at=row["captured_at"],
+            received_at=row["received_at"],
+            url=row["url"],
+            source=row["source"],
+        )
+
+    def latest(
+        self, max_age: Optional[float] = None, url: Optional[str] = None
+    ) -> Optional[StoredCapture]:
+        """
+        最近一次捕获
+
+        Args:
+            max_age: 最大时效（秒），超过时返回None
+            url: 只查找该页面的捕获
+        """
+        records = self.history(limit=1, url=url)
+        if not records:
+            return None
+        if max_age is not None and time.time() - records[0].captured_at > max_age:
+            return None
+        return records[0]
+
+    def history(
+        self,
+        limit: int = 50,
+        url: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> List[StoredCapture]:
+        """
+        捕获历史，按捕获时间从新到旧排列
+
+        Args:
+            limit: 最多返回的记录数
+            url: 只查找该页面的捕获
+            since: 只返回此时间（秒）之后的捕获
+        """
+        conditions, params = [], []
+        if url:
+            conditions.append("url = ?")
+            params.append(url)
+        if since is not None:
+            conditions.append("captured_at > ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(max(int(limit), 0))
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM captures {where} ORDER BY captured_at DESC LIMIT ?",
+                params,
+            ).fetchall()
+        return [self._to_capture(row) for row in rows]
+
+    def count(self) -> int:
+        """记录数量"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+    def clear(self):
+        """删除所有记录"""
+        with self._lock:
+            self._conn.execute("DELETE FROM captures")
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+捕获文件监视
+
+监视 captured_elements/ 和下载目录，插件导出的 rpa-captured-element-*.json、
+localStorage读取服务追加到分段日志的元素一出现就在后台线程中解析并写入捕获记录库，
+新的捕获同时发布到事件中心。空闲时没有任何扫描开销。
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .hub import CaptureHub
+from .segment_log import is_segment_file, read_segment_lines
+from .store import CaptureStore
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 为可选依赖，缺失时在后台线程中定时扫描目录
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+# 捕获文件的文件名模式（latest_element.json 的内容总是分段日志最后一行的副本，不再重复导入）
+CAPTURE_FILE_PATTERNS = (
+    "rpa-captured-element-*.json",
+    "element_*.json",
+)
+
+# 测试文件（如 rpa-captured-element-test-1753683478.json），导入时跳过
+TEST_FILE_PATTERN = re.compile(r"(^|[-_.])test([-_.]|$)", re.IGNORECASE)
+
+# 未安装watchdog时的扫描间隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def default_watch_directories() -> List[str]:
+    """默认监视的目录：项目的 captured_elements/ 和下载目录"""
+    return [
+        os.path.join(os.getcwd(), "captured_elements"),
+        os.path.expanduser("~/Downloads"),
+    ]
+
+
+def is_capture_file(path: str) -> bool:
+    """是否为捕获文件（跳过测试文件）"""
+    name = os.path.basename(path)
+    if TEST_FILE_PATTERN.search(name):
+        return False
+    return any(fnmatch.fnmatch(name, pattern) for pattern in CAPTURE_FILE_PATTERNS)
+
+
+def parse_capture_file(path: str) -> List[Dict[str, Any]]:
+    """
+    解析捕获文件
+
+    Raises:
+        OSError: 读取失败
+        ValueError: 不是有效的JSON（文件可能尚未写完）
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return elements_from_data(json.load(f))
+
+
+def elements_from_data(data: Any) -> List[Dict[str, Any]]:
+    """从单个元素，或插件导出的 {"capturedElements": [...]} 中取出元素"""
+    if isinstance(data, dict) and "capturedElements" in data:
+        elements = data["capturedElements"] or []
+    else:
+        elements = [data]
+    return [
+        element
+        for element in elements
+        if isinstance(element, dict) and element.get("tagName")
+    ]
+
+
+class _EventHandler(FileSystemEventHandler):
+    """把watchdog事件转给监视器"""
+
+    def __init__(self, watcher: "CaptureFileWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.ingest_file(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.ingest_file(event.src_path)
+
+    def on_moved(self, event):
+        # 浏览器下载完成时把临时文件重命名为最终文件名；分段合并时也以替换方式写入
+        if not event.is_directory:
+            self.watcher.ingest_file(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.watcher.forget_file(event.src_path)
+
+
+class CaptureFileWatcher:
+    """
+    捕获文件监视器
+
+    启动时先导入目录中已有的文件（只写入记录库，不作为新捕获发布），之后增量导入新文件。
+    同一文件只在修改时间或大小变化后重新解析；分段日志按偏移量只读取新追加的行。
+    同一次捕获由记录库按指纹去重。
+    """
+
+    def __init__(
+        self,
+        store: CaptureStore,
+        hub: Optional[CaptureHub] = None,
+        directories: Optional[Iterable[str]] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.store = store
+        self.hub = hub
+        self.directories = list(directories or default_watch_directories())
+        self.poll_interval = poll_interval
+        self._file_states: Dict[str, Tuple[float, int]] = {}
+        # 分段日志的 (文件标识, 已读取位置)
+        self._segment_offsets: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def uses_watchdog(self) -> bool:
+        return Observer is not None
+
+    def start(self):
+        """启动监视（不阻塞调用线程）"""
+        if self._thread:
+            return
+        self._stop_event.clear()
+
+        directories = []
+        for directory in self.directories:
+            if os.path.isdir(directory):
+                directories.append(directory)
+            else:
+                logger.debug(f"监视目录不存在，已跳过: {directory}")
+        self.directories = directories
+
+        # 先开始监听再导入已有文件，导入期间新写入的文件不会遗漏
+        if self.uses_watchdog:
+            self._observer = Observer()
+            handler = _EventHandler(self)
+            for directory in self.directories:
+                self._observer.schedule(handler, directory, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            logger.info("未安装watchdog，按间隔扫描捕获文件目录")
+
+        self._thread = threading.Thread(
+            target=self._run, name="capture-file-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"开始监视捕获文件: {', '.join(self.directories)}")
+
+    def stop(self):
+        """停止监视"""
+        self._stop_event.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        self.scan(publish=False)
+        if self.uses_watchdog:
+            return
+        while not self._stop_event.wait(self.poll_interval):
+            self.scan()
+
+    def scan(self, publish: bool = True) -> int:
+        """
+        扫描监视目录，导入新的或有变化的捕获文件
+
+        Returns:
+            int: 新导入的元素数量
+        """
+        added = 0
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError as e:
+                logger.debug(f"扫描目录失败: {directory}, 错误: {e}")
+                continue
+            for entry in entries:
+                if entry.is_file():
+                    added += self.ingest_file(entry.path, publish=publish)
+        return added
+
+    def forget_file(self, path: str):
+        """文件被删除后清除其状态"""
+        with self._lock:
+            self._file_states.pop(path, None)
+            self._segment_offsets.pop(path, None)
+
+    def _file_changed(self, path: str) -> bool:
+        """文件自上次导入后是否有变化，同时记录当前状态"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        state = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            if self._file_states.get(path) == state:
+                return False
+            self._file_states[path] = state
+        return True
+
+    def ingest_file(self, path: str, publish: bool = True) -> int:
+        """
+        导入一个捕获文件
+
+        Args:
+            path: 文件路径
+            publish: 是否把新的捕获发布到事件中心
+
+        Returns:
+            int: 新导入的元素数量
+        """
+        if is_segment_file(path):
+            elements = self._read_segment(path)
+        elif is_capture_file(path) and self._file_changed(path):
+            try:
+                elements = parse_capture_file(path)
+            except (OSError, ValueError) as e:
+                # 文件可能尚未写完，写完后的修改事件会再次触发导入
+                with self._lock:
+                    self._file_states.pop(path, None)
+                logger.debug(f"解析捕获文件失败: {path}, 错误: {e}")
+                return 0
+        else:
+            return 0
+
+        new_elements = [
+            element
+            for element in elements
+            if self.store.add(element, source="file") is not None
+        ]
+        added = len(new_elements)
+        if publish and self.hub:
+            self.hub.publish_many(new_elements)
+
+        if added:
+            logger.info(f"从文件导入 {added} 个捕获元素: {os.path.basename(path)}")
+        return added
+
+    def _read_segment(self, path: str) -> List[Dict[str, Any]]:
+        """读取分段日志中上次读取位置之后新追加的完整行"""
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return []
+            inode, offset = self._segment_offsets.get(path, (stat.st_ino, 0))
+            if inode != stat.st_ino or stat.st_size < offset:
+                # 分段被合并重写，从头读取（已导入的记录由记录库去重）
+                offset = 0
+            if stat.st_size == offset:
+                return []
+            try:
+                records, offset = read_segment_lines(path, offset)
+            except OSError as e:
+                logger.debug(f"读取分段日志失败: {path}, 错误: {e}")
+                return []
+            self._segment_offsets[path] = (stat.st_ino, offset)
+
+        elements = []
+        for record in records:
+            elements.extend(elements_from_data(record))
+        return elements
@@ -5,3 +5,8 @@
 from .engine import AutomationEngine
 from .instruction_base import InstructionExecutor, InstructionResult
 from .context import ExecutionContext
+from .workflow_pool import WorkflowPoolExecutor, WorkflowRun
+from .batch import BatchRunner, iter_rows, render_workflow
+from .workflow_file import load_workflow, save_workflow
+from .profiler import ExecutionProfiler
+from .process_pool import ProcessPoolRunner
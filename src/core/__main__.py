@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行工作流执行器
+
+不依赖PyQt6与HTTP服务，适合在cron或容器中无界面运行:
+
+    python -m src.core workflow.json
+    python -m src.core workflow.json --data rows.csv --output results.jsonl --workers 4
+    python -m src.core workflow.json --data rows.csv --output results.jsonl --processes 16
+
+设置 --standby 或环境变量 RPA_STANDBY_BROWSERS 后会在读取工作流的同时预启动浏览器
+（多进程模式下浏览器由各工作进程自己启动，不预启动）。
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from .batch import BatchRunner, iter_rows
+from .dag import is_dag_workflow
+from .engine import AutomationEngine
+from .process_pool import ProcessPoolRunner
+from .workflow_file import load_workflow
+from ..automation.web.driver_manager import WebDriverManager
+from ..automation.web.driver_pool import WebDriverPool
+
+logger = logging.getLogger(__name__)
+
+# 退出码
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core", description="无界面执行RPA工作流"
+    )
+    parser.add_argument("workflow", help="工作流JSON文件路径")
+    parser.add_argument(
+        "--headed", action="store_true", help="显示浏览器窗口（默认无头模式）"
+    )
+    parser.add_argument("--data", help="批量模式的数据集（.csv/.jsonl/.json）")
+    parser.add_argument("--output", help="批量模式的结果文件（JSONL）")
+    parser.add_argument("--workers", type=int, default=1, help="批量模式的并发数")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="批量模式的工作进程数，每个进程使用独立的引擎和浏览器（不能与 --workers 同时使用）",
+    )
+    parser.add_argument(
+        "--no-resume", action="store_true", help="批量模式下忽略检查点，从头执行"
+    )
+    parser.add_argument(
+        "--trace",
+        help="导出步骤耗时（Chrome Trace JSON）并打印最慢步骤汇总（仅单次执行）",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="单次执行时每个步骤成功后保存检查点到该文件，执行成功后删除",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从 --checkpoint 指定的检查点继续执行，并恢复变量、页面和Cookie",
+    )
+    parser.add_argument(
+        "--standby",
+        type=int,
+        default=None,
+        help="预启动的备用浏览器数量（默认取环境变量 RPA_STANDBY_BROWSERS）",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出执行日志")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    return parser
+
+
+def apply_headless(workflow: List[Dict[str, Any]], headless: bool):
+    """覆盖所有打开网页步骤的无头模式设置"""
+    for step in workflow:
+        if step.get("type") == "open_webpage":
+            step.setdefault("parameters", {})["headless"] = headless
+
+
+def _browser_options(workflow: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """取工作流中第一个打开网页步骤的浏览器配置"""
+    for step in workflow:
+        if step.get("type") == "open_webpage":
+            parameters = step.get("parameters", {})
+            return {
+                "browser": parameters.get("browser", "chrome"),
+                "headless": parameters.get("headless", False),
+                "profile": parameters.get("profile"),
+                "window_size": parameters.get("window_size"),
+            }
+    return {"browser": "chrome", "headless": True, "profile": None, "window_size": None}
+
+
+async def run_single(
+    workflow: List[Dict[str, Any]],
+    quiet: bool,
+    trace_path: Optional[str] = None,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+) -> bool:
+    """执行单个工作流"""
+    engine = AutomationEngine()
+    if not quiet:
+        engine.set_log_callback(print)
+    profiler = engine.enable_profiling() if trace_path else None
+    engine.enable_checkpoints(checkpoint_path)
+
+    try:
+        return await engine.execute_workflow(workflow, resume=resume)
+    finally:
+        engine.cleanup()
+        if profiler:
+            profiler.export_chrome_trace(trace_path)
+            print(profiler.format_summary(), file=sys.stderr)
+
+
+async def run_batch(args, workflow: List[Dict[str, Any]]) -> bool:
+    """执行批量任务，全部行成功才算成功"""
+    options = _browser_options(workflow)
+    driver_pool = WebDriverPool(
+        max_size=args.workers,
+        browser=options["browser"],
+        headless=not args.headed,
+        profile=options["profile"],
+        window_size=options["window_size"],
+    )
+    log_callback = (
+        None if args.quiet else (lambda run_id, msg: print(f"[{run_id}] {msg}"))
+    )
+    runner = BatchRunner(
+        workflow,
+        args.output,
+        workers=args.workers,
+        driver_pool=driver_pool,
+        log_callback=log_callback,
+    )
+
+    try:
+        stats = await runner.run(iter_rows(args.data), resume=not args.no_resume)
+    finally:
+        driver_pool.close()
+
+    print(
+        f"批量执行结束: 共 {stats['total']} 行，成功 {stats['succeeded']}，"
+        f"失败 {stats['failed']}，跳过 {stats['skipped']}"
+    )
+    return stats["failed"] == 0
+
+
+def run_batch_processes(args, workflow: List[Dict[str, Any]], log_level: int) -> bool:
+    """多进程执行批量任务，全部行成功才算成功"""
+    log_callback = (
+        None if args.quiet else (lambda row_id, msg: print(f"[row-{row_id}] {msg}"))
+    )
+    runner = ProcessPoolRunner(
+        processes=args.processes, log_callback=log_callback, log_level=log_level
+    )
+    stats = runner.run_batch(
+        workflow, iter_rows(args.data), args.output, resume=not args.no_resume
+    )
+
+    print(
+        f"批量执行结束: 共 {stats['total']} 行，成功 {stats['succeeded']}，"
+        f"失败 {stats['failed']}，跳过 {stats['skipped']}"
+    )
+    return stats["failed"] == 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，返回退出码"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    log_level = logging.DEBUG if args.verbose else logging.WARNING
+    logging.basicConfig(
+        level=log_level, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    if args.data and not args.output:
+        parser.error("批量模式需要同时指定 --output")
+    if args.workers < 1:
+        parser.error("--workers 必须大于0")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume 需要同时指定 --checkpoint")
+    if args.checkpoint and args.data:
+        parser.error("批量模式使用结果文件旁的检查点，不支持 --checkpoint")
+    if args.trace and args.data:
+        parser.error("批量模式不支持 --trace，请对单个工作流使用")
+    if args.processes < 1:
+        parser.error("--processes 必须大于0")
+    if args.processes > 1 and not args.data:
+        parser.error("--processes 需要配合 --data 使用")
+    if args.processes > 1 and args.workers > 1:
+        parser.error("--processes 不能与 --workers 同时使用")
+    if args.standby is not None and args.standby < 0:
+        parser.error("--standby 不能小于0")
+
+    try:
+        workflow = load_workflow(args.workflow)
+    except (OSError, ValueError) as e:
+        print(f"读取工作流失败: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.checkpoint and is_dag_workflow(workflow):
+        parser.error("按依赖图执行的工作流不支持 --checkpoint 和 --resume")
+
+    apply_headless(workflow, not args.headed)
+
+    use_processes = bool(args.data) and args.processes > 1
+    standby = (
+        args.standby
+        if args.standby is not None
+        else WebDriverManager.standby_count_from_env()
+    )
+    if standby and use_processes:
+        logger.info("多进程模式下不预启动备用浏览器")
+    elif standby:
+        WebDriverManager.start_standby(standby, **_browser_options(workflow))
+
+    try:
+        if use_processes:
+            success = run_batch_processes(args, workflow, log_level)
+        elif args.data:
+            success = asyncio.run(run_batch(args, workflow))
+        else:
+            success = asyncio.run(
+                run_single(
+                    workflow, args.quiet, args.trace, args.checkpoint, args.resume
+                )
+            )
+    except KeyboardInterrupt:
+        print("执行被中断", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        WebDriverManager.stop_standby()
+
+    return EXIT_SUCCESS if success else EXIT_FAILURE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
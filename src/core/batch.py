@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据驱动的批量执行
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from .workflow_pool import WorkflowPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ${column} 占位符
+PLACEHOLDER_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+
+def render_value(value: Any, row: Dict[str, Any]) -> Any:
+    """
+    用数据行替换值中的 ${column} 占位符
+
+    字符串恰好是单个占位符时保留原始数据类型，列表和字典递归处理
+
+    Args:
+        value: 参数值
+        row: 数据行
+
+    Returns:
+        替换后的值
+    """
+    if isinstance(value, str):
+        full_match = PLACEHOLDER_PATTERN.fullmatch(value)
+        if full_match:
+            return _lookup_column(row, full_match.group(1))
+        return PLACEHOLDER_PATTERN.sub(
+            lambda m: str(_lookup_column(row, m.group(1))), value
+        )
+    if isinstance(value, list):
+        return [render_value(item, row) for item in value]
+    if isinstance(value, dict):
+        return {key: render_value(item, row) for key, item in value.items()}
+    return value
+
+
+def _lookup_column(row: Dict[str, Any], column: str) -> Any:
+    """读取数据行中的列，缺失时报错"""
+    column = column.strip()
+    if column not in row:
+        raise KeyError(f"数据行缺少列: {column}")
+    return row[column]
+
+
+def render_workflow(
+    workflow: List[Dict[str, Any]], row: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """用数据行生成一份参数已替换的工作流副本"""
+    rendered = []
+    for step in workflow:
+        step = dict(step)
+        step["parameters"] = render_value(step.get("parameters", {}), row)
+        rendered.append(step)
+    return rendered
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取数据集
+
+    支持 .csv、.jsonl（每行一个JSON对象）和 .json（对象数组），
+    CSV与JSONL按行流式读取，不会一次性载入内存
+
+    Args:
+        path: 数据文件路径
+
+    Yields:
+        Dict[str, Any]: 数据行
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+    elif ext == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    elif ext == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("JSON数据集必须是对象数组")
+        yield from data
+    else:
+        raise ValueError(f"不支持的数据集格式: {ext}")
+
+
+class BatchCheckpoint:
+    """
+    批量执行检查点
+
+    以追加方式记录已完成的行号，崩溃后重新运行时跳过这些行；
+    所有行都完成后删除，下次运行从头开始
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[int] = set()
+        self._file = None
+
+    def exists(self) -> bool:
+        """是否有未完成的批量执行留下的检查点"""
+        return os.path.exists(self.path)
+
+    def covers(self, total: int) -> bool:
+        """前 total 行是否都已完成"""
+        return all(index in self.completed for index in range(total))
+
+    def load(self) -> Set[int]:
+        """读取已完成的行号"""
+        self.completed.clear()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.isdigit():
+                        self.completed.add(int(line))
+        return self.completed
+
+    def open(self):
+        """打开检查点文件准备追加"""
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def mark_done(self, index: int):
+        """记录一行已完成"""
+        self.completed.add(index)
+        self._file.write(f"{index}\n")
+        self._file.flush()
+
+    def close(self):
+        """关闭检查点文件"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """删除检查点文件"""
+        self.close()
+        self.completed.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class BatchRunner:
+    """
+    批量执行器
+
+    对数据集的每一行渲染一次工作流，按配置的并发数执行，
+    每行结束后立即以JSONL追加写入输出文件并记录检查点。
+    输出先于检查点写入，崩溃恢复时最多重复输出一行，不会遗漏。
+    """
+
+    def __init__(
+        self,
+        workflow: List[Dict[str, Any]],
+        output_path: str,
+        workers: int = 2,
+        driver_pool=None,
+        checkpoint_path: Optional[str] = None,
+        log_callback: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.workflow = workflow
+        self.output_path = output_path
+        self.workers = workers
+        self.driver_pool = driver_pool
+        self.log_callback = log_callback
+        self.checkpoint = BatchCheckpoint(
+            checkpoint_path or f"{output_path}.checkpoint"
+        )
+        self.executor: Optional[WorkflowPoolExecutor] = None
+        self.stats = {"total": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+        self._stopped = False
+        self._output = None
+
+    async def run(
+        self, rows: Iterable[Dict[str, Any]], resume: bool = True
+    ) -> Dict[str, int]:
+        """
+        执行批量任务
+
+        Args:
+            rows: 数据行迭代器，通常来自 iter_rows
+            resume: 是否从检查点继续，False时清空之前的输出与检查点；
+                上次执行已全部完成（没有检查点）时总是从头开始
+
+        Returns:
+            Dict[str, int]: 统计信息
+        """
+        if resume and self.checkpoint.exists():
+            completed = self.checkpoint.load()
+            if completed:
+                logger.info(f"从检查点恢复，已完成 {len(completed)} 行")
+            mode = "a"
+        else:
+            self.checkpoint.remove()
+            completed = set()
+            mode = "w"
+
+        self._stopped = False
+        self.stats = {"total": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        self.executor = WorkflowPoolExecutor(
+            max_workers=self.workers,
+            driver_pool=self.driver_pool,
+            log_callback=self.log_callback,
+        )
+
+        self.checkpoint.open()
+        self._output = open(self.output_path, mode, encoding="utf-8")
+        workers = []
+        finished = False
+        try:
+            workers = [
+                asyncio.create_task(self._worker(queue)) for _ in range(self.workers)
+            ]
+
+            for index, row in enumerate(rows):
+                if self._stopped:
+                    break
+                self.stats["total"] += 1
+                if index in completed:
+                    self.stats["skipped"] += 1
+                    continue
+                await self._put(queue, (index, row), workers)
+
+            for _ in workers:
+                await self._put(queue, None, workers)
+            await asyncio.gather(*workers)
+            finished = not self._stopped and self.checkpoint.covers(self.stats["total"])
+
+        finally:
+            for task in workers:
+                task.cancel()
+            self._output.close()
+            self._output = None
+            self.checkpoint.close()
+            self.executor.shutdown()
+
+        if finished:
+            self.checkpoint.remove()
+
+        logger.info(f"批量执行结束: {self.stats}")
+        return self.stats
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item, workers: List[asyncio.Task]):
+        """
+        放入队列，等待期间检查工作协程
+
+        所有工作协程都已异常退出时不再等待（否则队列满后会永久阻塞），抛出其异常
+        """
+        put = asyncio.create_task(queue.put(item))
+        try:
+            while True:
+                alive = [task for task in workers if not task.done()]
+                if not alive:
+                    put.cancel()
+                    for task in workers:
+                        if not task.cancelled() and task.exception():
+                            raise task.exception()
+                    raise RuntimeError("所有工作协程已退出")
+                done, _ = await asyncio.wait(
+                    [put, *alive], return_when=asyncio.FIRST_COMPLETED
+                )
+                if put in done:
+                    return
+        except BaseException:
+            put.cancel()
+            raise
+
+    async def _worker(self, queue: asyncio.Queue):
+        """从队列中取出数据行并执行"""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            index, row = item
+            if self._stopped:
+                continue
+            record = await self._run_row(index, row)
+
+            # 被停止的行不写入结果，下次恢复时重新执行
+            if record["status"] == "cancelled":
+                continue
+
+            self._output.write(
+                json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            )
+            self._output.flush()
+            self.checkpoint.mark_done(index)
+
+            if record["success"]:
+                self.stats["succeeded"] += 1
+            else:
+                self.stats["failed"] += 1
+
+    async def _run_row(self, index: int, row: Dict[str, Any]) -> Dict[str, Any]:
+        """执行单行数据"""
+        record = {"row": index, "input": row, "success": False}
+
+        try:
+            workflow = render_workflow(self.workflow, row)
+        except KeyError as e:
+            record.update(status="failed", error=str(e.args[0]))
+            return record
+
+        run = await self.executor.execute(workflow, run_id=f"row-{index}")
+        self.executor.forget_run(run.run_id)
+
+        record.update(
+            success=bool(run.success), status=run.status, variables=run.variables
+        )
+        if not run.success:
+            record["logs"] = list(run.logs)[-5:]
+        return record
+
+    def stop(self):
+        """停止批量执行，未完成的行留待下次恢复"""
+        self._stopped = True
+        if self.executor:
+            self.executor.stop_all()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作流断点续跑
+
+每个步骤成功后记录检查点：步骤序号、变量、当前URL和Cookie。
+工作流中途失败时，下次可以从最后一个成功的步骤之后继续，并恢复浏览器状态，
+不必重新登录和导航。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def workflow_hash(workflow: List[Dict[str, Any]]) -> str:
+    """工作流内容的哈希，用于确认检查点属于同一个工作流"""
+    content = json.dumps(workflow, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class WorkflowCheckpoint:
+    """检查点"""
+
+    workflow_hash: str
+    # 最后一个成功执行的步骤序号（从0开始）
+    step_index: int
+    variables: Dict[str, Any] = field(default_factory=dict)
+    url: Optional[str] = None
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+    saved_at: float = field(default_factory=time.time)
+
+
+class CheckpointStore:
+    """
+    检查点文件
+
+    先写临时文件再原子替换，进程在写入中途崩溃也不会留下损坏的检查点。
+    变量按JSON保存，无法序列化的值保存为字符串。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(self, checkpoint: WorkflowCheckpoint):
+        """保存检查点"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(checkpoint), f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        logger.debug(f"已保存检查点: 步骤 {checkpoint.step_index + 1}")
+
+    def load(self) -> Optional[WorkflowCheckpoint]:
+        """读取检查点，不存在或已损坏时返回None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return WorkflowCheckpoint(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"读取检查点失败: {self.path}, 错误: {e}")
+            return None
+
+    def clear(self):
+        """删除检查点"""
+        for path in (self.path, f"{self.path}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
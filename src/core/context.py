@@ -4,9 +4,20 @@
 执行上下文管理
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import asyncio
+import functools
+import itertools
 import logging
+import threading
+import time
+
+from .profiler import (
+    CATEGORY_DRIVER,
+    CATEGORY_LOCATOR,
+    CATEGORY_SLEEP,
+    DEFAULT_TRACK,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +25,53 @@ logger = logging.getLogger(__name__)
 class ExecutionContext:
     """执行上下文"""
 
+    # 可中断等待的轮询粒度（秒）
+    SLEEP_SLICE = 0.1
+
+    # 子上下文编号，用于默认的耗时轨道名
+    _fork_ids = itertools.count(1)
+
     def __init__(self):
         self.variables: Dict[str, Any] = {}
         self.web_driver = None
+        # 可选的WebDriver会话池，设置后浏览器从池中租用并在清理时归还
+        self.driver_pool = None
+        # 可选的线程池，run_blocking默认使用事件循环的默认执行器
+        self.executor = None
+        # 可选的阻塞调用包装，多标签页并行时把调用中的WebDriver命令绑定到标签页
+        self.call_wrapper: Optional[Callable[[Callable], Callable]] = None
         self.is_running = False
         self.current_instruction = None
+        self.current_step_index: Optional[int] = None
+        # 可选的耗时分析器，设置后记录休眠、定位等待和WebDriver调用耗时
+        self.profiler = None
+        # 耗时记录所在的轨道，并发执行的子上下文使用各自的轨道
+        self.trace_track = DEFAULT_TRACK
+        # 当前页面的DOM快照，只读步骤可直接查询，页面可能变化的步骤执行前失效
+        self.dom_snapshot = None
+        # 当前页面URL，用于选择器策略缓存，可能导航的步骤执行前清除
+        self.page_url: Optional[str] = None
+        # 本次运行的HTTP客户端（连接池、Cookie和响应缓存），按需创建，运行开始和清理时关闭
+        self.http_client = None
+        self._stop_event = threading.Event()
         self._logger = logging.getLogger(__name__)
 
+    def fork(self) -> "ExecutionContext":
+        """
+        创建子上下文，用于并发执行的独立浏览器会话
+
+        子上下文共享变量、停止信号、会话池、线程池和耗时分析器，使用自己的浏览器和HTTP客户端
+        """
+        child = ExecutionContext()
+        child.variables = self.variables
+        child.driver_pool = self.driver_pool
+        child.executor = self.executor
+        child.profiler = self.profiler
+        child.trace_track = f"{self.trace_track}/{next(self._fork_ids)}"
+        child.is_running = self.is_running
+        child._stop_event = self._stop_event
+        return child
+
     def set_variable(self, name: str, value: Any):
         """设置变量"""
         self.variables[name] = value
@@ -50,30 +101,157 @@ class ExecutionContext:
         """获取WebDriver"""
         return self.web_driver
 
+    def invalidate_dom_snapshot(self):
+        """丢弃DOM快照"""
+        if self.dom_snapshot is not None:
+            self.dom_snapshot = None
+            self._logger.debug("DOM快照已失效")
+
+    def invalidate_page_state(self):
+        """页面可能变化：丢弃DOM快照和记录的页面URL"""
+        self.invalidate_dom_snapshot()
+        self.page_url = None
+
+    def close_http_client(self):
+        """关闭HTTP客户端，丢弃其Cookie（共享的连接池和响应缓存保留）"""
+        if self.http_client is None:
+            return
+        try:
+            self.http_client.close()
+        except Exception as e:
+            self._logger.error(f"关闭HTTP客户端时出错: {e}")
+        finally:
+            self.http_client = None
+
     def start_execution(self):
         """开始执行"""
+        self._stop_event.clear()
+        self.invalidate_page_state()
+        self.close_http_client()
         self.is_running = True
         self._logger.info("开始执行流程")
 
     def stop_execution(self):
         """停止执行"""
         self.is_running = False
+        self._stop_event.set()
         self._logger.info("停止执行流程")
 
     def is_execution_running(self) -> bool:
         """检查是否正在执行"""
         return self.is_running
 
-    def cleanup(self):
-        """清理资源"""
-        if self.web_driver:
-            try:
+    def is_stop_requested(self) -> bool:
+        """检查是否已请求停止"""
+        return self._stop_event.is_set()
+
+    async def sleep(self, seconds: float) -> bool:
+        """
+        在事件循环上等待指定时间，停止请求到达时提前返回
+
+        Args:
+            seconds: 等待时间（秒）
+
+        Returns:
+            bool: 完整等待结束返回True，被停止请求中断返回False
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(float(seconds), 0.0)
+        start = time.perf_counter()
+
+        try:
+            while True:
+                if self._stop_event.is_set():
+                    return False
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return True
+                await asyncio.sleep(min(self.SLEEP_SLICE, remaining))
+        finally:
+            if self.profiler:
+                self.profiler.record(
+                    "sleep",
+                    CATEGORY_SLEEP,
+                    start,
+                    time.perf_counter(),
+                    self.current_step_index,
+                    self.trace_track,
+                )
+
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在线程池中执行阻塞调用（如Selenium命令），避免阻塞事件循环
+
+        Args:
+            func: 阻塞函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        return await self._run_in_executor(CATEGORY_DRIVER, func, args, kwargs)
+
+    async def run_locator_wait(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在线程池中执行元素定位等待，与run_blocking相同，但耗时单独计入定位等待
+
+        Args:
+            func: 定位函数（如ElementLocator.find_element）
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        return await self._run_in_executor(CATEGORY_LOCATOR, func, args, kwargs)
+
+    async def _run_in_executor(
+        self, category: str, func: Callable, args: tuple, kwargs: dict
+    ) -> Any:
+        """在执行器中运行阻塞函数，启用耗时分析时记录耗时"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        if self.call_wrapper:
+            call = self.call_wrapper(call)
+        if not self.profiler:
+            return await loop.run_in_executor(self.executor, call)
+
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.executor, call)
+        finally:
+            self.profiler.record(
+                getattr(func, "__qualname__", None)
+                or getattr(func, "__name__", "call"),
+                category,
+                start,
+                time.perf_counter(),
+                self.current_step_index,
+                self.trace_track,
+            )
+
+    def close_web_driver(self):
+        """关闭WebDriver，配置了会话池时归还到池中"""
+        if not self.web_driver:
+            return
+
+        try:
+            if self.driver_pool:
+                self.driver_pool.release(self.web_driver)
+                self._logger.info("WebDriver已归还会话池")
+            else:
                 self.web_driver.quit()
                 self._logger.info("WebDriver已关闭")
-            except Exception as e:
-                self._logger.error(f"关闭WebDriver时出错: {e}")
-            finally:
-                self.web_driver = None
+        except Exception as e:
+            self._logger.error(f"关闭WebDriver时出错: {e}")
+        finally:
+            self.web_driver = None
+
+    def cleanup(self):
+        """清理资源"""
+        self.close_web_driver()
+        self.close_http_client()
 
         self.is_running = False
         self._logger.info("执行上下文已清理")
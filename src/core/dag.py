@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+依赖图工作流
+
+步骤可以声明 id、depends_on 和 session，互不依赖的分支由引擎并发执行:
+
+    [
+        {"id": "a", "session": "s1", "type": "open_webpage", "parameters": {...}},
+        {"id": "b", "session": "s2", "type": "open_webpage", "parameters": {...}},
+        {"id": "a2", "session": "s1", "type": "extract_text", "parameters": {...}},
+        {"id": "merge", "depends_on": ["a2", "b"], "type": "wait", "parameters": {...}}
+    ]
+
+- session: 步骤使用的浏览器会话，默认 main；不同会话各自使用独立的浏览器，
+  同一会话内的步骤串行执行，所有会话共享变量
+- depends_on: 依赖的步骤id列表；未声明时依赖同一会话中的上一个步骤，
+  因此每个会话内按列表顺序执行，显式声明（包括空列表）时只依赖所列步骤
+- id: 步骤标识，默认为 step1、step2...
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# 未指定会话的步骤使用的会话名
+DEFAULT_SESSION = "main"
+
+
+def is_dag_workflow(workflow: List[Dict[str, Any]]) -> bool:
+    """工作流中有步骤声明了依赖或会话时按依赖图执行"""
+    return any(
+        isinstance(step, dict) and ("depends_on" in step or "session" in step)
+        for step in workflow
+    )
+
+
+@dataclass
+class WorkflowGraph:
+    """工作流依赖图，步骤以在列表中的位置表示"""
+
+    ids: List[str] = field(default_factory=list)
+    sessions: List[str] = field(default_factory=list)
+    dependencies: List[List[int]] = field(default_factory=list)
+    dependents: List[List[int]] = field(default_factory=list)
+
+    @property
+    def session_names(self) -> List[str]:
+        """按首次出现顺序排列的会话名"""
+        return list(dict.fromkeys(self.sessions))
+
+
+def build_workflow_graph(workflow: List[Dict[str, Any]]) -> WorkflowGraph:
+    """
+    构建并校验依赖图
+
+    Args:
+        workflow: 工作流步骤列表
+
+    Returns:
+        WorkflowGraph: 依赖图
+
+    Raises:
+        ValueError: 步骤id重复、依赖不存在或存在循环依赖
+    """
+    graph = WorkflowGraph()
+    index_of: Dict[str, int] = {}
+
+    for i, step in enumerate(workflow):
+        step_id = str(step.get("id") or f"step{i+1}")
+        if step_id in index_of:
+            raise ValueError(f"步骤id重复: {step_id}")
+        index_of[step_id] = i
+        graph.ids.append(step_id)
+        graph.sessions.append(str(step.get("session") or DEFAULT_SESSION))
+
+    last_in_session: Dict[str, int] = {}
+    for i, step in enumerate(workflow):
+        session = graph.sessions[i]
+        if "depends_on" in step:
+            depends_on = step["depends_on"] or []
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            dependencies = []
+            for dependency in depends_on:
+                if dependency not in index_of:
+                    raise ValueError(
+                        f"步骤 {graph.ids[i]} 依赖的步骤不存在: {dependency}"
+                    )
+                dependencies.append(index_of[dependency])
+        else:
+            previous = last_in_session.get(session)
+            dependencies = [] if previous is None else [previous]
+        last_in_session[session] = i
+        graph.dependencies.append(sorted(set(dependencies)))
+
+    graph.dependents = [[] for _ in workflow]
+    for i, dependencies in enumerate(graph.dependencies):
+        for dependency in dependencies:
+            graph.dependents[dependency].append(i)
+
+    # 拓扑排序检查循环依赖
+    remaining = [len(d) for d in graph.dependencies]
+    ready = [i for i, count in enumerate(remaining) if count == 0]
+    visited = 0
+    while ready:
+        i = ready.pop()
+        visited += 1
+        for dependent in graph.dependents[i]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    if visited != len(workflow):
+        cyclic = [graph.ids[i] for i, count in enumerate(remaining) if count > 0]
+        raise ValueError(f"存在循环依赖: {', '.join(cyclic)}")
+
+    return graph
@@ -7,15 +7,23 @@
 import asyncio
 import logging
 from typing import Dict, Any, List, Optional, Callable
+from .checkpoint import CheckpointStore, WorkflowCheckpoint, workflow_hash
 from .context import ExecutionContext
+from .dag import DEFAULT_SESSION, build_workflow_graph, is_dag_workflow, WorkflowGraph
 from .instruction_base import InstructionExecutor, InstructionResult
+from .profiler import CATEGORY_STEP, ExecutionProfiler
+from ..automation.web.driver_manager import WebDriverManager
 from ..automation.web.instructions import (
     OpenWebPageInstruction,
+    FetchPageInstruction,
     ClickElementInstruction,
     InputTextInstruction,
     ExtractTextInstruction,
+    ExtractTableInstruction,
+    PaginateInstruction,
     HoverElementInstruction,
     WaitInstruction,
+    FanOutTabsInstruction,
 )
 
 logger = logging.getLogger(__name__)
@@ -29,6 +37,11 @@ class AutomationEngine:
         self.instructions: Dict[str, InstructionExecutor] = {}
         self.current_workflow: List[Dict[str, Any]] = []
         self.is_running = False
+        # 会话复用模式：执行之间保留浏览器，仅重置状态
+        self.reuse_session = False
+        self.profiler: Optional[ExecutionProfiler] = None
+        # 断点续跑：设置后每个步骤成功都会保存检查点
+        self.checkpoint_store: Optional[CheckpointStore] = None
         self.status_callback: Optional[Callable] = None
         self.log_callback: Optional[Callable] = None
 
@@ -39,11 +52,15 @@ class AutomationEngine:
         """注册内置指令"""
         instructions = [
             OpenWebPageInstruction(),
+            FetchPageInstruction(),
             ClickElementInstruction(),
             InputTextInstruction(),
             ExtractTextInstruction(),
+            ExtractTableInstruction(),
+            PaginateInstruction(),
             HoverElementInstruction(),
             WaitInstruction(),
+            FanOutTabsInstruction(self),
         ]
 
         for instruction in instructions:
@@ -56,6 +73,49 @@ class AutomationEngine:
         self.instructions[instruction.instruction_type] = instruction
         logger.debug(f"注册指令: {instruction.instruction_type}")
 
+    def set_session_reuse(self, enabled: bool):
+        """设置是否在多次执行之间复用浏览器会话"""
+        self.reuse_session = enabled
+        logger.info(f"浏览器会话复用: {'开启' if enabled else '关闭'}")
+
+    async def _prepare_web_driver(self):
+        """执行前处理上一次留下的WebDriver：复用模式下重置状态，否则关闭"""
+        driver = self.context.web_driver
+        if not driver:
+            return
+
+        if self.reuse_session and not self.context.driver_pool:
+            alive = await self.context.run_blocking(
+                WebDriverManager.check_driver_alive, driver
+            )
+            if alive and await self.context.run_blocking(
+                WebDriverManager.reset_driver_state, driver
+            ):
+                self._log_message("复用已有浏览器会话")
+                return
+
+        logger.info("清理之前的WebDriver")
+        await self.context.run_blocking(self.context.close_web_driver)
+
+    def enable_profiling(self, enabled: bool = True) -> Optional[ExecutionProfiler]:
+        """开启或关闭步骤耗时分析，每次执行工作流时重新计时"""
+        self.profiler = ExecutionProfiler() if enabled else None
+        self.context.profiler = self.profiler
+        return self.profiler
+
+    def enable_checkpoints(self, path: Optional[str]) -> Optional[CheckpointStore]:
+        """
+        开启或关闭断点续跑
+
+        Args:
+            path: 检查点文件路径，为空时关闭
+
+        Returns:
+            Optional[CheckpointStore]: 检查点文件
+        """
+        self.checkpoint_store = CheckpointStore(path) if path else None
+        return self.checkpoint_store
+
     def set_status_callback(self, callback: Callable[[str], None]):
         """设置状态回调"""
         self.status_callback = callback
@@ -76,9 +136,13 @@ class AutomationEngine:
             self.log_callback(message)
 
     async def execute_instruction(
-        self, instruction_type: str, parameters: Dict[str, Any]
+        self,
+        instruction_type: str,
+        parameters: Dict[str, Any],
+        context: Optional[ExecutionContext] = None,
     ) -> InstructionResult:
-        """执行单个指令"""
+        """执行单个指令，context 为空时使用引擎的主上下文"""
+        context = context or self.context
         if instruction_type not in self.instructions:
             error_msg = f"未知的指令类型: {instruction_type}"
             logger.error(error_msg)
@@ -93,10 +157,22 @@ class AutomationEngine:
             return InstructionResult.error_result(error_msg)
 
         try:
-            self.context.current_instruction = instruction_type
+            context.current_instruction = instruction_type
+            if not instruction.read_only:
+                context.invalidate_page_state()
             self._log_message(f"执行指令: {instruction_type}")
 
-            result = await instruction.execute(parameters, self.context)
+            if self.profiler:
+                with self.profiler.span(
+                    instruction_type,
+                    CATEGORY_STEP,
+                    context.current_step_index,
+                    context.trace_track,
+                ) as span_args:
+                    result = await instruction.execute(parameters, context)
+                    span_args["success"] = result.success
+            else:
+                result = await instruction.execute(parameters, context)
 
             if result.success:
                 self._log_message(result.message)
@@ -110,59 +186,54 @@ class AutomationEngine:
             logger.error(error_msg, exc_info=True)
             return InstructionResult.error_result(error_msg, e)
         finally:
-            self.context.current_instruction = None
+            context.current_instruction = None
+
+    async def execute_workflow(
+        self, workflow: List[Dict[str, Any]], resume: bool = False
+    ) -> bool:
+        """
+        执行工作流
+
+        Args:
+            workflow: 工作流步骤列表
+            resume: 存在匹配的检查点时，恢复变量与浏览器状态并从中断处继续执行
 
-    async def execute_workflow(self, workflow: List[Dict[str, Any]]) -> bool:
-        """执行工作流"""
+        Returns:
+            bool: 是否全部步骤执行成功
+        """
         self.current_workflow = workflow
         self.is_running = True
 
         try:
-            # 清理之前的WebDriver，确保每次执行都是全新环境
-            if self.context.web_driver:
-                try:
-                    self.context.web_driver.quit()
-                    logger.info("清理之前的WebDriver")
-                except Exception as e:
-                    logger.warning(f"清理WebDriver时出错: {e}")
-                finally:
-                    self.context.web_driver = None
+            # 清理之前的WebDriver，确保每次执行都是全新环境（会话复用模式下仅重置状态）
+            await self._prepare_web_driver()
+
+            if self.profiler:
+                self.profiler.reset()
 
             self.context.start_execution()
             self._update_status("正在执行流程...")
             self._log_message(f"开始执行工作流，共 {len(workflow)} 个步骤")
 
-            success_count = 0
-
-            for i, step in enumerate(workflow):
-                if not self.is_running:
-                    self._log_message("执行被用户中断")
-                    break
-
-                instruction_type = step.get("type")
-                parameters = step.get("parameters", {})
-
-                if not instruction_type:
-                    self._log_message(f"步骤 {i+1}: 缺少指令类型")
-                    continue
-
-                self._log_message(f"步骤 {i+1}/{len(workflow)}: {instruction_type}")
-                self._update_status(
-                    f"执行步骤 {i+1}/{len(workflow)}: {instruction_type}"
-                )
-
-                result = await self.execute_instruction(instruction_type, parameters)
-
-                if not result.success:
-                    self._log_message(f"步骤 {i+1} 执行失败: {result.message}")
-                    # 可以选择继续或停止执行
-                    if step.get("stop_on_error", True):
-                        self._log_message("因错误停止执行")
+            start_index = 0
+            graph_mode = is_dag_workflow(workflow)
+            if graph_mode:
+                if resume or self.checkpoint_store:
+                    # 依赖图中的步骤并发执行，没有可以记录的单一中断位置
+                    self._log_message("按依赖图执行的工作流不支持检查点和恢复，已忽略")
+                success_count = await self._execute_graph(workflow)
+            else:
+                if resume:
+                    start_index = await self._restore_checkpoint(workflow)
+                    if start_index is None:
                         return False
-                else:
-                    success_count += 1
+                success_count = await self._execute_sequence(workflow, start_index)
+            if success_count is None:
+                return False
 
-            execution_success = success_count == len(workflow)
+            execution_success = success_count == len(workflow) - start_index
+            if execution_success and self.checkpoint_store and not graph_mode:
+                self.checkpoint_store.clear()
 
             if execution_success:
                 self._log_message(f"工作流执行完成，成功执行 {success_count} 个步骤")
@@ -183,8 +254,225 @@ class AutomationEngine:
             return False
         finally:
             self.is_running = False
+            self.context.current_step_index = None
             self.context.stop_execution()
 
+    async def _execute_sequence(
+        self, workflow: List[Dict[str, Any]], start_index: int = 0
+    ) -> Optional[int]:
+        """从 start_index 开始按顺序执行步骤，返回成功步骤数，因错误停止时返回None"""
+        success_count = 0
+        digest = workflow_hash(workflow) if self.checkpoint_store else None
+
+        for i, step in enumerate(workflow):
+            if i < start_index:
+                continue
+            if not self.is_running:
+                self._log_message("执行被用户中断")
+                break
+
+            instruction_type = step.get("type")
+            parameters = step.get("parameters", {})
+
+            if not instruction_type:
+                self._log_message(f"步骤 {i+1}: 缺少指令类型")
+                continue
+
+            self._log_message(f"步骤 {i+1}/{len(workflow)}: {instruction_type}")
+            self._update_status(f"执行步骤 {i+1}/{len(workflow)}: {instruction_type}")
+
+            self.context.current_step_index = i
+            result = await self.execute_instruction(instruction_type, parameters)
+
+            if not result.success:
+                self._log_message(f"步骤 {i+1} 执行失败: {result.message}")
+                # 可以选择继续或停止执行
+                if step.get("stop_on_error", True):
+                    self._log_message("因错误停止执行")
+                    return None
+            else:
+                success_count += 1
+                if digest:
+                    await self._save_checkpoint(digest, i)
+
+        return success_count
+
+    async def _save_checkpoint(self, digest: str, step_index: int):
+        """保存检查点，失败时只记录日志，不影响执行"""
+        driver = self.context.get_web_driver()
+        url, cookies = None, []
+        try:
+            if driver:
+                url, cookies = await self.context.run_blocking(
+                    lambda: (driver.current_url, driver.get_cookies())
+                )
+            checkpoint = WorkflowCheckpoint(
+                digest, step_index, dict(self.context.variables), url, cookies
+            )
+            await self.context.run_blocking(self.checkpoint_store.save, checkpoint)
+        except Exception as e:
+            logger.warning(f"保存检查点失败: {e}")
+
+    async def _restore_checkpoint(
+        self, workflow: List[Dict[str, Any]]
+    ) -> Optional[int]:
+        """
+        恢复检查点中的变量、页面和Cookie
+
+        Returns:
+            Optional[int]: 继续执行的步骤序号；没有可用检查点时为0，恢复失败时为None
+        """
+        if not self.checkpoint_store:
+            return 0
+        checkpoint = self.checkpoint_store.load()
+        if not checkpoint:
+            self._log_message("没有检查点，从头执行")
+            return 0
+        if checkpoint.workflow_hash != workflow_hash(workflow):
+            self._log_message("检查点与当前工作流不匹配，从头执行")
+            return 0
+
+        start_index = checkpoint.step_index + 1
+        self._log_message(f"从检查点恢复，跳过前 {start_index} 个步骤")
+        self.context.variables.clear()
+        self.context.variables.update(checkpoint.variables)
+
+        if checkpoint.url and checkpoint.url.startswith(("http://", "https://")):
+            # 使用中断前最后一个打开网页步骤的浏览器设置
+            parameters: Dict[str, Any] = {}
+            for step in workflow[:start_index]:
+                if step.get("type") == "open_webpage":
+                    parameters = dict(step.get("parameters", {}))
+            parameters["url"] = checkpoint.url
+
+            result = await self.execute_instruction("open_webpage", parameters)
+            if not result.success:
+                self._log_message(f"恢复页面失败: {result.message}")
+                return None
+
+            if checkpoint.cookies:
+                driver = self.context.get_web_driver()
+                restored = await self.context.run_blocking(
+                    WebDriverManager.restore_cookies, driver, checkpoint.cookies
+                )
+                await self.context.run_blocking(driver.refresh)
+                self._log_message(f"已恢复 {restored} 个Cookie")
+
+        return start_index
+
+    async def _execute_graph(self, workflow: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        按依赖图并发执行步骤，格式见 dag 模块
+
+        依赖都已完成的步骤立即启动；每个会话使用独立的子上下文和浏览器，
+        同一会话内的步骤通过锁串行执行。返回成功步骤数，因错误停止时返回None
+        （已启动的步骤会执行完毕，不再启动新步骤）。
+        """
+        graph = build_workflow_graph(workflow)
+        contexts: Dict[str, ExecutionContext] = {}
+        locks: Dict[str, asyncio.Lock] = {}
+        # 主会话（默认 main，没有时取第一个会话）使用引擎的上下文，其余会话使用子上下文
+        primary = (
+            DEFAULT_SESSION if DEFAULT_SESSION in graph.sessions else graph.sessions[0]
+        )
+        for session in graph.session_names:
+            if session == primary:
+                contexts[session] = self.context
+            else:
+                contexts[session] = self.context.fork()
+                contexts[session].trace_track = f"session {session}"
+            locks[session] = asyncio.Lock()
+        self._log_message(
+            f"按依赖图执行，{len(contexts)} 个会话: {', '.join(contexts)}"
+        )
+
+        remaining = [len(dependencies) for dependencies in graph.dependencies]
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        running: Dict[asyncio.Task, int] = {}
+        success_count = 0
+        aborted = False
+
+        try:
+            while ready or running:
+                while ready and not aborted and self.is_running:
+                    i = ready.pop(0)
+                    task = asyncio.create_task(
+                        self._execute_graph_step(
+                            i, workflow[i], graph, contexts, locks, len(workflow)
+                        )
+                    )
+                    running[task] = i
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    i = running.pop(task)
+                    result = task.result()
+                    if result.success:
+                        success_count += 1
+                    else:
+                        self._log_message(
+                            f"步骤 {graph.ids[i]} 执行失败: {result.message}"
+                        )
+                        if workflow[i].get("stop_on_error", True):
+                            if not aborted:
+                                self._log_message("因错误停止执行")
+                            aborted = True
+                            continue
+
+                    for dependent in graph.dependents[i]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            ready.append(dependent)
+
+            if not self.is_running:
+                self._log_message("执行被用户中断")
+            return None if aborted else success_count
+
+        finally:
+            for task in running:
+                task.cancel()
+            # 等被取消的步骤真正结束（释放会话锁、退出阻塞调用）后再清理它们使用的上下文
+            await asyncio.gather(*running, return_exceptions=True)
+            for context in contexts.values():
+                if context is not self.context:
+                    await self.context.run_blocking(context.cleanup)
+
+    async def _execute_graph_step(
+        self,
+        index: int,
+        step: Dict[str, Any],
+        graph: WorkflowGraph,
+        contexts: Dict[str, ExecutionContext],
+        locks: Dict[str, asyncio.Lock],
+        total: int,
+    ) -> InstructionResult:
+        """在步骤所属会话中执行一个依赖图步骤"""
+        session = graph.sessions[index]
+        context = contexts[session]
+        instruction_type = step.get("type")
+        if not instruction_type:
+            return InstructionResult.error_result("缺少指令类型")
+
+        async with locks[session]:
+            if not self.is_running:
+                return InstructionResult.error_result("执行被用户中断")
+
+            label = f"步骤 {graph.ids[index]} ({index+1}/{total}, 会话 {session})"
+            self._log_message(f"{label}: {instruction_type}")
+            self._update_status(f"执行{label}: {instruction_type}")
+
+            context.current_step_index = index
+            try:
+                return await self.execute_instruction(
+                    instruction_type, step.get("parameters", {}), context
+                )
+            finally:
+                context.current_step_index = None
+
     def stop_execution(self):
         """停止执行"""
         self.is_running = False
@@ -35,6 +35,9 @@ class InstructionResult:
 class InstructionExecutor(ABC):
     """指令执行器基类"""
 
+    # 只读指令不会改变页面，执行前不需要丢弃DOM快照
+    read_only = False
+
     def __init__(self, instruction_type: str):
         self.instruction_type = instruction_type
         self.logger = logging.getLogger(f"{__name__}.{instruction_type}")
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程执行
+
+每个工作进程拥有自己的 AutomationEngine 和浏览器，从任务队列中领取工作流执行，
+日志和结果通过事件队列发回主进程。进程之间不共享GIL，重度的数据处理步骤
+不会拖慢其他进程中驱动浏览器的逻辑，吞吐量随CPU核数扩展。
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import queue
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .batch import BatchCheckpoint, render_workflow
+
+logger = logging.getLogger(__name__)
+
+# 事件类型
+EVENT_STARTED = "started"
+EVENT_LOG = "log"
+EVENT_RESULT = "result"
+
+# 结果中保留的失败日志条数
+FAILURE_LOG_LINES = 5
+
+
+def _json_safe(value: Any) -> Any:
+    """转换为可跨进程传递的JSON兼容值"""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def _worker_main(
+    worker_id: int,
+    task_queue,
+    event_queue,
+    log_level: int,
+    forward_logs: bool,
+):
+    """
+    工作进程入口
+
+    会话复用模式下同一进程的任务共用一个浏览器，任务之间只重置浏览器状态
+    """
+    logging.basicConfig(
+        level=log_level, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    from .engine import AutomationEngine
+
+    engine = AutomationEngine()
+    engine.set_session_reuse(True)
+    current = {"task_id": None}
+    recent_logs: deque = deque(maxlen=FAILURE_LOG_LINES)
+
+    def on_log(message: str):
+        recent_logs.append(message)
+        if forward_logs:
+            event_queue.put((EVENT_LOG, worker_id, current["task_id"], message))
+
+    engine.set_log_callback(on_log)
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            task_id, workflow = task
+            current["task_id"] = task_id
+            recent_logs.clear()
+            event_queue.put((EVENT_STARTED, worker_id, task_id, None))
+
+            try:
+                success = asyncio.run(engine.execute_workflow(workflow))
+                error = None
+            except Exception as e:
+                success, error = False, str(e)
+
+            result = {
+                "success": bool(success),
+                "status": "success" if success else "failed",
+                "variables": _json_safe(engine.context.variables),
+            }
+            if error:
+                result["error"] = error
+            if not success:
+                result["logs"] = list(recent_logs)
+            engine.context.clear_variables()
+            event_queue.put((EVENT_RESULT, worker_id, task_id, result))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.cleanup()
+
+
+class ProcessPoolRunner:
+    """
+    多进程工作流执行器
+
+    使用spawn方式启动进程（Selenium与PyQt在fork出的子进程中不安全）。每个工作进程有自己的
+    任务队列，主进程只在进程空闲时交给它一个任务，因此总能知道每个任务在哪个进程中；
+    工作进程意外退出时，交给它的任务（无论是否已开始）记为失败并启动新的进程补位。
+    """
+
+    def __init__(
+        self,
+        processes: int = 2,
+        log_callback: Optional[Callable[[str, str], None]] = None,
+        log_level: int = logging.WARNING,
+    ):
+        if processes < 1:
+            raise ValueError("进程数必须大于0")
+
+        self.processes = processes
+        self.log_callback = log_callback
+        self.log_level = log_level
+        self._mp = multiprocessing.get_context("spawn")
+        self._event_queue = None
+        self._workers: Dict[int, Any] = {}
+        self._task_queues: Dict[int, Any] = {}
+        # 已交给工作进程、尚未收到结果的任务: 工作进程id -> 任务id
+        self._assigned: Dict[int, Any] = {}
+        self._next_worker_id = 0
+        self._stopped = False
+
+    def _start_worker(self):
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        task_queue = self._mp.Queue()
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(
+                worker_id,
+                task_queue,
+                self._event_queue,
+                self.log_level,
+                self.log_callback is not None,
+            ),
+            name=f"rpa-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._workers[worker_id] = process
+        self._task_queues[worker_id] = task_queue
+
+    def _start(self):
+        self._stopped = False
+        self._event_queue = self._mp.Queue()
+        self._workers = {}
+        self._task_queues = {}
+        self._assigned = {}
+        for _ in range(self.processes):
+            self._start_worker()
+        logger.info(f"启动 {self.processes} 个工作进程")
+
+    def _shutdown(self, graceful: bool):
+        """结束工作进程，graceful为False时直接终止"""
+        if graceful:
+            for task_queue in self._task_queues.values():
+                task_queue.put(None)
+        for process in self._workers.values():
+            if graceful:
+                process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=5)
+        self._workers = {}
+        for task_queue in self._task_queues.values():
+            task_queue.close()
+        self._task_queues = {}
+        self._event_queue.close()
+
+    def _assign(self, worker_id: int, task: Tuple[Any, List[Dict[str, Any]]]):
+        """把任务交给空闲的工作进程"""
+        self._task_queues[worker_id].put(task)
+        self._assigned[worker_id] = task[0]
+
+    def _idle_workers(self) -> List[int]:
+        return [
+            worker_id
+            for worker_id, process in self._workers.items()
+            if worker_id not in self._assigned and process.is_alive()
+        ]
+
+    def _poll_events(self, timeout: float = 0.5) -> List[Tuple]:
+        """
+        读取一个事件，并检查工作进程是否意外退出
+
+        每次调用都检查进程状态：事件队列一直有其他进程的日志或结果时，退出的进程也能及时发现。
+
+        Returns:
+            List[Tuple]: 读到的任务结果（超时时没有），加上退出进程的任务失败结果
+        """
+        events = []
+        try:
+            event = self._event_queue.get(timeout=timeout)
+        except queue.Empty:
+            event = None
+
+        if event is not None:
+            kind, worker_id, task_id, payload = event
+            if kind == EVENT_STARTED:
+                logger.debug(f"工作进程 {worker_id} 开始执行任务 {task_id}")
+            elif kind == EVENT_RESULT:
+                if self._assigned.get(worker_id) == task_id:
+                    del self._assigned[worker_id]
+                    events.append(event)
+                # 否则进程已按退出处理，任务已记为失败
+            elif kind == EVENT_LOG and self.log_callback:
+                self.log_callback(str(task_id), payload)
+
+        return events + self._reap_dead_workers()
+
+    def _reap_dead_workers(self) -> List[Tuple]:
+        """移除意外退出的工作进程并补位，返回交给它们的任务的失败结果"""
+        failures = []
+        for worker_id, process in list(self._workers.items()):
+            if process.is_alive():
+                continue
+            del self._workers[worker_id]
+            self._task_queues.pop(worker_id).close()
+            task_id = self._assigned.pop(worker_id, None)
+            logger.warning(f"工作进程 {worker_id} 意外退出，退出码: {process.exitcode}")
+            if not self._stopped:
+                self._start_worker()
+            if task_id is not None:
+                failures.append(
+                    (
+                        EVENT_RESULT,
+                        worker_id,
+                        task_id,
+                        {
+                            "success": False,
+                            "status": "failed",
+                            "error": f"工作进程退出，退出码: {process.exitcode}",
+                        },
+                    )
+                )
+        return failures
+
+    def _run_tasks(
+        self,
+        tasks: Iterable[Tuple[Any, List[Dict[str, Any]]]],
+        on_result: Callable[[Any, Dict[str, Any]], None],
+    ):
+        """把任务分发到工作进程，每个任务结束时在主进程中回调 on_result"""
+        self._start()
+        graceful = False
+        try:
+            iterator = iter(tasks)
+            exhausted = False
+            while not exhausted or self._assigned:
+                if self._stopped:
+                    exhausted = True
+                for worker_id in self._idle_workers():
+                    if exhausted:
+                        break
+                    task = next(iterator, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    self._assign(worker_id, task)
+
+                if not self._assigned and exhausted:
+                    break
+                for event in self._poll_events():
+                    if event[0] == EVENT_RESULT:
+                        on_result(event[2], event[3])
+            graceful = True
+        finally:
+            self._shutdown(graceful)
+
+    def run_workflows(
+        self, workflows: Iterable[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        在工作进程中执行多个工作流
+
+        Args:
+            workflows: 工作流列表
+
+        Returns:
+            List[Dict[str, Any]]: 按输入顺序排列的执行结果
+        """
+        results: Dict[int, Dict[str, Any]] = {}
+        self._run_tasks(
+            enumerate(workflows),
+            lambda task_id, result: results.update({task_id: result}),
+        )
+        return [results[i] for i in sorted(results)]
+
+    def run_batch(
+        self,
+        workflow: List[Dict[str, Any]],
+        rows: Iterable[Dict[str, Any]],
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        resume: bool = True,
+    ) -> Dict[str, int]:
+        """
+        多进程批量执行，输出与检查点格式同 BatchRunner
+
+        数据行按需分发给空闲的工作进程（动态分片），结果与检查点只由主进程写入
+
+        Args:
+            workflow: 含 ${column} 占位符的工作流
+            rows: 数据行迭代器
+            output_path: 结果文件（JSONL）
+            checkpoint_path: 检查点文件，默认为 输出文件.checkpoint
+            resume: 是否从检查点继续，上次执行已全部完成（没有检查点）时总是从头开始
+
+        Returns:
+            Dict[str, int]: 统计信息
+        """
+        checkpoint = BatchCheckpoint(checkpoint_path or f"{output_path}.checkpoint")
+        if resume and checkpoint.exists():
+            completed = checkpoint.load()
+            mode = "a"
+        else:
+            checkpoint.remove()
+            completed = set()
+            mode = "w"
+
+        stats = {"total": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+        inputs: Dict[int, Dict[str, Any]] = {}
+
+        def write_record(record: Dict[str, Any]):
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            checkpoint.mark_done(record["row"])
+            stats["succeeded" if record["success"] else "failed"] += 1
+
+        def tasks():
+            for index, row in enumerate(rows):
+                stats["total"] += 1
+                if index in completed:
+                    stats["skipped"] += 1
+                    continue
+                try:
+                    rendered = render_workflow(workflow, row)
+                except KeyError as e:
+                    write_record(
+                        {
+                            "row": index,
+                            "input": row,
+                            "success": False,
+                            "status": "failed",
+                            "error": str(e.args[0]),
+                        }
+                    )
+                    continue
+                inputs[index] = row
+                yield index, rendered
+
+        def on_result(index: int, result: Dict[str, Any]):
+            write_record({"row": index, "input": inputs.pop(index), **result})
+
+        checkpoint.open()
+        output = open(output_path, mode, encoding="utf-8")
+        try:
+            self._run_tasks(tasks(), on_result)
+        finally:
+            output.close()
+            checkpoint.close()
+
+        if not self._stopped and checkpoint.covers(stats["total"]):
+            checkpoint.remove()
+
+        logger.info(f"多进程批量执行结束: {stats}")
+        return stats
+
+    def stop(self):
+        """停止分发新任务，已开始的任务执行完毕后结束"""
+        self._stopped = True
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+执行耗时分析
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# 主上下文的轨道名
+DEFAULT_TRACK = "workflow"
+
+# 耗时分类
+CATEGORY_STEP = "step"
+CATEGORY_LOCATOR = "locator"
+CATEGORY_DRIVER = "driver"
+CATEGORY_SLEEP = "sleep"
+
+
+@dataclass
+class Span:
+    """一段计时记录"""
+
+    name: str
+    category: str
+    start: float
+    end: float
+    step_index: Optional[int] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+    # 所属轨道（执行上下文），并发执行的会话、标签页各自一条轨道
+    track: str = DEFAULT_TRACK
+
+    @property
+    def duration(self) -> float:
+        """耗时（秒）"""
+        return self.end - self.start
+
+
+class ExecutionProfiler:
+    """
+    执行耗时分析器
+
+    记录每个步骤的总耗时，以及步骤内元素定位等待、WebDriver调用和休眠的耗时，
+    可导出为Chrome Trace格式（chrome://tracing 或 Perfetto 打开）和最慢步骤汇总表。
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """清空记录"""
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        step_index: Optional[int] = None,
+        track: str = DEFAULT_TRACK,
+        **args,
+    ):
+        """记录一段耗时，start/end为 time.perf_counter() 读数"""
+        span = Span(name, category, start, end, step_index, args, track)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        category: str,
+        step_index: Optional[int] = None,
+        track: str = DEFAULT_TRACK,
+        **args,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        计时上下文，退出时记录耗时
+
+        Yields:
+            Dict[str, Any]: 附加参数，可在上下文中补充（如执行结果）
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(
+                name, category, start, time.perf_counter(), step_index, track, **args
+            )
+
+    def step_summaries(self) -> List[Dict[str, Any]]:
+        """
+        按步骤汇总耗时
+
+        Returns:
+            List[Dict[str, Any]]: 每个步骤的总耗时及各分类耗时（秒），按执行顺序
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        summaries: Dict[int, Dict[str, Any]] = {}
+        for span in spans:
+            if span.category == CATEGORY_STEP and span.step_index is not None:
+                summaries[span.step_index] = {
+                    "step": span.step_index,
+                    "instruction": span.name,
+                    "success": span.args.get("success"),
+                    "wall": span.duration,
+                    CATEGORY_LOCATOR: 0.0,
+                    CATEGORY_DRIVER: 0.0,
+                    CATEGORY_SLEEP: 0.0,
+                }
+
+        for span in spans:
+            summary = summaries.get(span.step_index)
+            if summary is not None and span.category in summary:
+                if span.category != CATEGORY_STEP:
+                    summary[span.category] += span.duration
+
+        result = []
+        for index in sorted(summaries):
+            summary = summaries[index]
+            accounted = (
+                summary[CATEGORY_LOCATOR]
+                + summary[CATEGORY_DRIVER]
+                + summary[CATEGORY_SLEEP]
+            )
+            summary["other"] = max(summary["wall"] - accounted, 0.0)
+            result.append(summary)
+        return result
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """转换为Chrome Trace事件格式，每条轨道对应一个线程（tid），并发的耗时不会重叠在一起"""
+        with self._lock:
+            spans = list(self.spans)
+            origin = self._origin
+
+        pid = os.getpid()
+        tids: Dict[str, int] = {DEFAULT_TRACK: 1}
+        for span in spans:
+            tids.setdefault(span.track, len(tids) + 1)
+
+        events: List[Dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": track},
+            }
+            for track, tid in tids.items()
+        ]
+        for span in spans:
+            args = dict(span.args)
+            if span.step_index is not None:
+                args["step"] = span.step_index + 1
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((span.start - origin) * 1_000_000, 3),
+                    "dur": round(span.duration * 1_000_000, 3),
+                    "pid": pid,
+                    "tid": tids[span.track],
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        """导出Chrome Trace JSON文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+
+    def format_summary(self, limit: int = 10) -> str:
+        """
+        生成最慢步骤汇总表
+
+        Args:
+            limit: 显示的步骤数量
+
+        Returns:
+            str: 文本表格
+        """
+        summaries = self.step_summaries()
+        total = sum(s["wall"] for s in summaries)
+        slowest = sorted(summaries, key=lambda s: s["wall"], reverse=True)[:limit]
+
+        lines = [
+            f"共 {len(summaries)} 个步骤，总耗时 {total:.3f}s，最慢的 {len(slowest)} 个步骤:",
+            f"{'步骤':>4}  {'指令':<16}{'总耗时':>9}{'定位等待':>9}"
+            f"{'驱动调用':>9}{'休眠':>9}{'其他':>9}",
+        ]
+        for s in slowest:
+            lines.append(
+                f"{s['step'] + 1:>4}  {s['instruction']:<16}"
+                f"{s['wall']:>9.3f}{s[CATEGORY_LOCATOR]:>9.3f}"
+                f"{s[CATEGORY_DRIVER]:>9.3f}{s[CATEGORY_SLEEP]:>9.3f}{s['other']:>9.3f}"
+            )
+        return "\n".join(lines)
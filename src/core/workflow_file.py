@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作流文件读写
+"""
+
+import json
+from typing import Any, Dict, List
+
+from .dag import build_workflow_graph, is_dag_workflow
+
+
+def load_workflow(path: str) -> List[Dict[str, Any]]:
+    """
+    读取工作流文件
+
+    文件为JSON格式，可以是步骤列表，也可以是带 "steps" 字段的对象
+
+    Args:
+        path: 工作流文件路径
+
+    Returns:
+        List[Dict[str, Any]]: 工作流步骤列表
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    steps = data.get("steps") if isinstance(data, dict) else data
+    if not isinstance(steps, list):
+        raise ValueError("工作流文件必须是步骤列表或包含 steps 字段的对象")
+
+    for i, step in enumerate(steps):
+        if not isinstance(step, dict) or not step.get("type"):
+            raise ValueError(f"步骤 {i+1} 缺少指令类型")
+
+    # 依赖图工作流提前校验依赖关系
+    if is_dag_workflow(steps):
+        build_workflow_graph(steps)
+
+    return steps
+
+
+def save_workflow(path: str, workflow: List[Dict[str, Any]]):
+    """保存工作流到文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"steps": workflow}, f, ensure_ascii=False, indent=2)
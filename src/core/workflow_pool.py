@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发工作流执行器
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .engine import AutomationEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowRun:
+    """单次工作流执行记录"""
+
+    run_id: str
+    workflow: List[Dict[str, Any]]
+    status: str = "pending"  # pending, running, success, failed, cancelled
+    success: Optional[bool] = None
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=1000))
+    variables: Dict[str, Any] = field(default_factory=dict)
+    engine: Optional[AutomationEngine] = None
+    # 已请求停止；执行中的工作流在引擎清理完成后才记为cancelled
+    stop_requested: bool = False
+
+    @property
+    def is_finished(self) -> bool:
+        """是否已结束"""
+        return self.status in ("success", "failed", "cancelled")
+
+
+class WorkflowPoolExecutor:
+    """
+    并发工作流执行器
+
+    每个执行拥有独立的AutomationEngine和ExecutionContext，浏览器从
+    共享的WebDriverPool中租用，同时执行的工作流数量受max_workers限制。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        driver_pool=None,
+        status_callback: Optional[Callable[[str, str], None]] = None,
+        log_callback: Optional[Callable[[str, str], None]] = None,
+    ):
+        if max_workers < 1:
+            raise ValueError("并发数必须大于0")
+
+        self.max_workers = max_workers
+        self.driver_pool = driver_pool
+        self.status_callback = status_callback
+        self.log_callback = log_callback
+        self.runs: Dict[str, WorkflowRun] = {}
+
+        # 每个工作流同一时刻最多占用一个阻塞调用，预留余量给浏览器创建
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=max_workers * 2, thread_name_prefix="rpa-worker"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._run_counter = itertools.count(1)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """在当前事件循环中延迟创建信号量"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    def _create_engine(self, run: WorkflowRun) -> AutomationEngine:
+        """为单次执行创建独立引擎，状态和日志按执行ID分流"""
+        engine = AutomationEngine()
+        engine.context.driver_pool = self.driver_pool
+        engine.context.executor = self._thread_pool
+        engine.set_status_callback(lambda status: self._on_status(run, status))
+        engine.set_log_callback(lambda message: self._on_log(run, message))
+        return engine
+
+    def _on_status(self, run: WorkflowRun, status: str):
+        """转发单次执行的状态"""
+        if self.status_callback:
+            self.status_callback(run.run_id, status)
+
+    def _on_log(self, run: WorkflowRun, message: str):
+        """记录并转发单次执行的日志"""
+        run.logs.append(message)
+        if self.log_callback:
+            self.log_callback(run.run_id, message)
+
+    def _set_run_status(self, run: WorkflowRun, status: str):
+        """更新执行状态"""
+        run.status = status
+        self._on_status(run, status)
+
+    def create_run(
+        self, workflow: List[Dict[str, Any]], run_id: Optional[str] = None
+    ) -> WorkflowRun:
+        """登记一次待执行的工作流"""
+        if run_id is None:
+            run_id = f"run-{next(self._run_counter)}"
+        if run_id in self.runs and not self.runs[run_id].is_finished:
+            raise ValueError(f"执行ID已存在: {run_id}")
+
+        run = WorkflowRun(run_id=run_id, workflow=workflow)
+        self.runs[run_id] = run
+        return run
+
+    async def execute(
+        self, workflow: List[Dict[str, Any]], run_id: Optional[str] = None
+    ) -> WorkflowRun:
+        """
+        执行单个工作流，并发数达到上限时排队等待
+
+        Args:
+            workflow: 工作流步骤列表
+            run_id: 执行ID，默认自动生成
+
+        Returns:
+            WorkflowRun: 执行记录
+        """
+        run = self.create_run(workflow, run_id)
+        return await self._execute_run(run)
+
+    async def _execute_run(self, run: WorkflowRun) -> WorkflowRun:
+        """执行已登记的工作流"""
+        async with self._get_semaphore():
+            if run.stop_requested:
+                if not run.is_finished:
+                    self._set_run_status(run, "cancelled")
+                return run
+
+            run.engine = self._create_engine(run)
+            self._set_run_status(run, "running")
+            status = "failed"
+            try:
+                run.success = await run.engine.execute_workflow(run.workflow)
+                run.variables = dict(run.engine.context.variables)
+                status = "success" if run.success else "failed"
+            except Exception as e:
+                logger.error(f"工作流 {run.run_id} 执行异常: {e}", exc_info=True)
+                run.success = False
+            finally:
+                await asyncio.get_running_loop().run_in_executor(
+                    self._thread_pool, run.engine.cleanup
+                )
+                # 浏览器归还之后才标记结束，结束的执行才能被移除或复用执行ID
+                self._set_run_status(run, "cancelled" if run.stop_requested else status)
+
+        return run
+
+    async def run_all(self, workflows: List[List[Dict[str, Any]]]) -> List[WorkflowRun]:
+        """
+        并发执行多个工作流
+
+        Args:
+            workflows: 工作流列表
+
+        Returns:
+            List[WorkflowRun]: 与输入顺序一致的执行记录
+        """
+        runs = [self.create_run(workflow) for workflow in workflows]
+        return list(await asyncio.gather(*(self._execute_run(run) for run in runs)))
+
+    def forget_run(self, run_id: str):
+        """移除已结束的执行记录，长时间批量执行时避免记录无限增长"""
+        run = self.runs.get(run_id)
+        if run and run.is_finished:
+            del self.runs[run_id]
+
+    def stop(self, run_id: str):
+        """
+        停止指定的执行
+
+        尚未开始的执行直接记为cancelled；执行中的工作流只请求停止，
+        引擎清理完成后由执行协程记为cancelled
+        """
+        run = self.runs.get(run_id)
+        if not run or run.is_finished or run.stop_requested:
+            return
+
+        run.stop_requested = True
+        if run.engine:
+            run.engine.stop_execution()
+        elif run.status == "pending":
+            self._set_run_status(run, "cancelled")
+
+    def stop_all(self):
+        """停止所有未结束的执行"""
+        for run_id in list(self.runs):
+            self.stop(run_id)
+
+    def shutdown(self):
+        """停止所有执行并释放线程池"""
+        self.stop_all()
+        self._thread_pool.shutdown(wait=False)
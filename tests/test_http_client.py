@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP客户端测试：登录Cookie只在同一执行上下文的一次运行内有效，连接池和响应缓存跨运行共享
+"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.core.context import ExecutionContext
+from src.automation.web.http_client import get_http_client, response_cache
+from src.automation.web.instructions import (
+    ExtractTextInstruction,
+    FetchPageInstruction,
+)
+
+PAGE_HTML = """<html><head><title>商品列表</title></head><body>
+<h1 id="heading">今日推荐</h1>
+<ul><li class="item"><b>苹果</b><a href="/p/1">详情</a></li>
+<li class="item"><b>香蕉</b><a href="/p/2">详情</a></li></ul>
+</body></html>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/login 设置会话Cookie，/whoami 返回请求携带的Cookie，/page 返回商品列表页"""
+
+    page_hits = 0
+
+    def do_GET(self):
+        body = b""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "session=abc; Path=/")
+        elif self.path == "/page":
+            type(self).page_hits += 1
+            body = PAGE_HTML.encode("utf-8")
+        else:
+            body = (self.headers.get("Cookie") or "").encode("utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    _Handler.page_hits = 0
+    response_cache.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    response_cache.clear()
+
+
+def _whoami(context, server_url):
+    return get_http_client(context).fetch(f"{server_url}/whoami").text
+
+
+def _login(context, server_url):
+    get_http_client(context).fetch(f"{server_url}/login")
+
+
+def test_cookie_kept_within_run(server_url):
+    context = ExecutionContext()
+    context.start_execution()
+    _login(context, server_url)
+    assert _whoami(context, server_url) == "session=abc"
+    assert get_http_client(context) is get_http_client(context)
+    context.cleanup()
+
+
+def test_new_run_starts_without_cookies(server_url):
+    context = ExecutionContext()
+    context.start_execution()
+    _login(context, server_url)
+    context.stop_execution()
+
+    context.start_execution()
+    assert _whoami(context, server_url) == ""
+    context.cleanup()
+
+
+def test_contexts_do_not_share_cookies(server_url):
+    context = ExecutionContext()
+    _login(context, server_url)
+    assert _whoami(context.fork(), server_url) == ""
+    assert _whoami(ExecutionContext(), server_url) == ""
+    context.cleanup()
+
+
+def test_cleanup_closes_client(server_url):
+    context = ExecutionContext()
+    client = get_http_client(context)
+    context.cleanup()
+    assert context.http_client is None
+    assert get_http_client(context) is not client
+
+
+def _fetch(context, url, **parameters):
+    return asyncio.run(
+        FetchPageInstruction().execute({"url": url, **parameters}, context)
+    )
+
+
+def _extract(context, **parameters):
+    return asyncio.run(ExtractTextInstruction().execute(parameters, context))
+
+
+def test_fetch_page_then_extract_text(server_url):
+    context = ExecutionContext()
+    context.start_execution()
+
+    result = _fetch(context, f"{server_url}/page")
+    assert result.success
+    assert result.data["title"] == "商品列表"
+    assert not result.data["from_cache"]
+
+    heading = _extract(context, selector="heading", variable_name="heading")
+    assert heading.success
+    assert context.get_variable("heading") == "今日推荐"
+
+    items = _extract(
+        context,
+        selector=["li.missing", "li.item"],
+        fields={"name": "b", "link": "a@href"},
+    )
+    assert items.success
+    assert items.data["selector"] == "li.item"
+    assert items.data["records"] == [
+        {"name": "苹果", "link": f"{server_url}/p/1"},
+        {"name": "香蕉", "link": f"{server_url}/p/2"},
+    ]
+    context.cleanup()
+
+
+def test_response_cache_survives_runs(server_url):
+    context = ExecutionContext()
+    context.start_execution()
+    assert not _fetch(context, f"{server_url}/page", cache_ttl=60).data["from_cache"]
+    assert _fetch(context, f"{server_url}/page", cache_ttl=60).data["from_cache"]
+    context.stop_execution()
+
+    context.start_execution()
+    result = _fetch(context, f"{server_url}/page", cache_ttl=60)
+    assert result.data["from_cache"]
+    assert _extract(context, selector="h1").data["text"] == "今日推荐"
+    context.cleanup()
+
+    assert _fetch(ExecutionContext(), f"{server_url}/page", cache_ttl=60).data[
+        "from_cache"
+    ]
+    assert _Handler.page_hits == 1
+
+
+def test_uncached_fetch_requests_again(server_url):
+    context = ExecutionContext()
+    _fetch(context, f"{server_url}/page")
+    _fetch(context, f"{server_url}/page")
+    assert _Handler.page_hits == 2
+    assert len(response_cache) == 0
+    context.cleanup()
+
+
+def test_contexts_share_connection_pool(server_url):
+    first, second = ExecutionContext(), ExecutionContext()
+    adapter = get_http_client(first).session.get_adapter(server_url)
+    first.cleanup()
+    assert get_http_client(first).session.get_adapter(server_url) is adapter
+    assert get_http_client(second).session.get_adapter(server_url) is adapter
+    second.cleanup()